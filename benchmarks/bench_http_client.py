@@ -0,0 +1,119 @@
+"""
+Benchmark: conexiones (handshakes) abiertas por llamada a una tool.
+
+Compara el patrón anterior (un ``httpx.AsyncClient`` nuevo por invocación)
+con el ``AzureDevOpsClient`` compartido. Levanta un servidor HTTP/1.1 local
+con keep-alive que cuenta cada conexión TCP aceptada; cada conexión
+equivale a un handshake TCP(+TLS) contra dev.azure.com.
+
+Uso:
+    python benchmarks/bench_http_client.py [--calls 200] [--concurrency 10]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+from core.http_client import AzureDevOpsClient  # noqa: E402
+
+BODY = b'{"count": 1, "value": [{"id": "1", "name": "demo"}]}'
+
+
+class CountingServer:
+    """Servidor HTTP mínimo que cuenta conexiones aceptadas."""
+
+    def __init__(self) -> None:
+        self.connections = 0
+        self.requests = 0
+        self._server = None
+
+    async def _handle(self, reader, writer) -> None:
+        self.connections += 1
+        try:
+            while True:
+                header = await reader.readuntil(b"\r\n\r\n")
+                if not header:
+                    break
+                self.requests += 1
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    b"Connection: keep-alive\r\n"
+                    + f"Content-Length: {len(BODY)}\r\n\r\n".encode()
+                    + BODY
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/_apis/projects"
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    def reset(self) -> None:
+        self.connections = 0
+        self.requests = 0
+
+
+async def per_call_client(url: str) -> None:
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url)
+        response.raise_for_status()
+        response.json()
+
+
+async def run(label, server, calls, concurrency, call) -> None:
+    server.reset()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            await call()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<28} calls={calls:<5} handshakes={server.connections:<5} "
+        f"requests={server.requests:<5} elapsed={elapsed * 1000:8.1f} ms"
+    )
+
+
+async def main(calls: int, concurrency: int) -> None:
+    server = CountingServer()
+    url = await server.start()
+    try:
+        await run("before: client per call", server, calls, concurrency,
+                  lambda: per_call_client(url))
+
+        async with AzureDevOpsClient(http2=False) as shared:
+            async def shared_call() -> None:
+                response = await shared.get(url)
+                response.raise_for_status()
+                response.json()
+
+            await run("after: shared pooled client", server, calls, concurrency,
+                      shared_call)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.concurrency))
@@ -0,0 +1,147 @@
+"""
+Benchmark: comportamiento del cliente frente al throttling de Azure DevOps.
+
+Levanta un stub HTTP local que imita el rate limiting por usuario (TSTU):
+un cubo de tokens que se rellena a ``--rate`` peticiones por segundo. Cada
+respuesta incluye ``X-RateLimit-Limit``/``X-RateLimit-Remaining``; cuando
+queda poco presupuesto añade ``X-RateLimit-Delay`` y, al agotarse, responde
+429 con ``Retry-After``. Además falla con 503 una fracción ``--error-rate``
+de las peticiones.
+
+Compara un cliente sin reintentos y con concurrencia fija con el
+``AzureDevOpsClient`` (reintentos con jitter + límite AIMD).
+
+Uso:
+    python benchmarks/bench_throttling.py [--calls 300] [--concurrency 50] [--rate 100]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "server"))
+
+from core.http_client import AzureDevOpsClient  # noqa: E402
+
+BODY = b'{"count": 1, "value": [{"id": "1", "name": "demo"}]}'
+
+
+class ThrottlingStub:
+    """Servidor HTTP mínimo con un cubo de tokens y cabeceras de rate limit."""
+
+    def __init__(self, rate: float, burst: int, error_rate: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.error_rate = error_rate
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.counts = {200: 0, 429: 0, 503: 0}
+        self._server = None
+
+    def _respond(self) -> tuple[int, dict]:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens < 1:
+            wait = (1 - self.tokens) / self.rate
+            return 429, {"Retry-After": f"{max(wait, 0.1):.2f}", "X-RateLimit-Remaining": "0"}
+        self.tokens -= 1
+        if random.random() < self.error_rate:
+            return 503, {}
+
+        headers = {
+            "X-RateLimit-Limit": str(self.burst),
+            "X-RateLimit-Remaining": str(int(self.tokens)),
+        }
+        if self.tokens < self.burst * 0.1:
+            headers["X-RateLimit-Delay"] = "0.5"
+        return 200, headers
+
+    async def _handle(self, reader, writer) -> None:
+        try:
+            while True:
+                await reader.readuntil(b"\r\n\r\n")
+                # Latencia simulada del servicio
+                await asyncio.sleep(0.01)
+                status, headers = self._respond()
+                self.counts[status] += 1
+                body = BODY if status == 200 else b""
+                reason = {200: "OK", 429: "Too Many Requests", 503: "Service Unavailable"}[status]
+                head = f"HTTP/1.1 {status} {reason}\r\nContent-Length: {len(body)}\r\n"
+                head += "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+                writer.write(head.encode() + b"\r\n" + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/_apis/projects"
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    def reset(self) -> None:
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.counts = {200: 0, 429: 0, 503: 0}
+
+
+async def run(label, stub, client, url, calls, concurrency) -> None:
+    stub.reset()
+    semaphore = asyncio.Semaphore(concurrency)
+    ok = failed = 0
+
+    async def one() -> None:
+        nonlocal ok, failed
+        async with semaphore:
+            response = await client.get(url)
+            if response.status_code == 200:
+                ok += 1
+            else:
+                failed += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<30} ok={ok:<5} failed={failed:<5} retries={client.retries:<5} "
+        f"upstream 429={stub.counts[429]:<5} 503={stub.counts[503]:<4} "
+        f"limit={client.limiter.limit:5.1f} elapsed={elapsed:6.2f} s"
+    )
+
+
+async def main(calls: int, concurrency: int, rate: float, error_rate: float) -> None:
+    stub = ThrottlingStub(rate=rate, burst=int(rate), error_rate=error_rate)
+    url = await stub.start()
+    try:
+        async with AzureDevOpsClient(
+            http2=False, max_retries=0,
+            min_concurrency=concurrency, max_concurrency=concurrency,
+        ) as naive:
+            await run("before: no retries, fixed", stub, naive, url, calls, concurrency)
+
+        async with AzureDevOpsClient(http2=False) as adaptive:
+            await run("after: retries + AIMD", stub, adaptive, url, calls, concurrency)
+    finally:
+        await stub.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=100)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.concurrency, args.rate, args.error_rate))
@@ -18,4 +18,151 @@ def get_auth_header() -> str:
 
 def get_base_url() -> str:
     """Retorna la URL base de la API de Azure DevOps."""
-    return f"https://dev.azure.com/{AZURE_DEVOPS_ORG}"
\ No newline at end of file
+    return f"https://dev.azure.com/{AZURE_DEVOPS_ORG}"
+
+# ===== Cliente HTTP compartido =====
+# Límites del pool de conexiones que reutilizan todas las tools.
+HTTP_MAX_CONNECTIONS = int(os.getenv("AZURE_DEVOPS_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("AZURE_DEVOPS_HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("AZURE_DEVOPS_HTTP_KEEPALIVE_EXPIRY", "90"))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("AZURE_DEVOPS_HTTP_MAX_PER_HOST", "20"))
+HTTP_TIMEOUT = float(os.getenv("AZURE_DEVOPS_HTTP_TIMEOUT", "30"))
+HTTP2_ENABLED = os.getenv("AZURE_DEVOPS_HTTP2", "true").lower() in ("1", "true", "yes")
+# Reintentos ante throttling (429) y errores transitorios
+HTTP_MAX_RETRIES = int(os.getenv("AZURE_DEVOPS_HTTP_MAX_RETRIES", "4"))
+HTTP_RETRY_BACKOFF_BASE = float(os.getenv("AZURE_DEVOPS_HTTP_RETRY_BACKOFF_BASE", "0.5"))
+HTTP_RETRY_BACKOFF_MAX = float(os.getenv("AZURE_DEVOPS_HTTP_RETRY_BACKOFF_MAX", "30"))
+# Retry-After más largo que esto no se espera: se devuelve el error
+HTTP_RETRY_MAX_WAIT = float(os.getenv("AZURE_DEVOPS_HTTP_RETRY_MAX_WAIT", "60"))
+# Rango del límite global adaptativo (AIMD) de peticiones simultáneas
+HTTP_ADAPTIVE_MIN_CONCURRENCY = int(os.getenv("AZURE_DEVOPS_HTTP_MIN_CONCURRENCY", "2"))
+HTTP_ADAPTIVE_MAX_CONCURRENCY = int(os.getenv("AZURE_DEVOPS_HTTP_MAX_CONCURRENCY", "64"))
+# Agrupa GETs idénticos concurrentes en una sola llamada
+HTTP_SINGLEFLIGHT = os.getenv("AZURE_DEVOPS_HTTP_SINGLEFLIGHT", "true").lower() in ("1", "true", "yes")
+# Caché de respuestas GET (ETag / Last-Modified); 0 bytes la desactiva
+HTTP_CACHE_MAX_BYTES = int(os.getenv("AZURE_DEVOPS_HTTP_CACHE_MAX_BYTES", str(64 * 1024 ** 2)))
+# "regex_ruta=segundos;..." — endpoints cacheables y su frescura (0 = revalidar siempre)
+HTTP_CACHE_POLICIES = os.getenv(
+    "AZURE_DEVOPS_HTTP_CACHE_POLICIES",
+    "/_apis/projects$=300;"
+    "/_apis/git/repositories$=60;"
+    "/_apis/pipelines$=60;"
+    "/_apis/policy/configurations$=0;"
+    "/_apis/policy/types$=3600;"
+    "/_apis/securitynamespaces=3600",
+)
+
+# ===== Caché de resolución nombre -> ID =====
+RESOLVER_CACHE_TTL = float(os.getenv("AZURE_DEVOPS_RESOLVER_TTL", "300"))
+RESOLVER_NEGATIVE_TTL = float(os.getenv("AZURE_DEVOPS_RESOLVER_NEGATIVE_TTL", "30"))
+RESOLVER_CACHE_SIZE = int(os.getenv("AZURE_DEVOPS_RESOLVER_CACHE_SIZE", "2048"))
+
+# ===== Caché persistente de metadatos de la organización =====
+CACHE_DIR = os.path.expanduser(os.getenv("AZURE_DEVOPS_CACHE_DIR", "~/.cache/mcp-ado"))
+METADATA_TTL = float(os.getenv("AZURE_DEVOPS_METADATA_TTL", str(24 * 3600)))
+METADATA_REFRESH_INTERVAL = float(os.getenv("AZURE_DEVOPS_METADATA_REFRESH_INTERVAL", "3600"))
+
+# ===== Caché de identidades (email -> descriptor) =====
+IDENTITY_CACHE_TTL = float(os.getenv("AZURE_DEVOPS_IDENTITY_TTL", "3600"))
+IDENTITY_NEGATIVE_TTL = float(os.getenv("AZURE_DEVOPS_IDENTITY_NEGATIVE_TTL", "60"))
+IDENTITY_CACHE_SIZE = int(os.getenv("AZURE_DEVOPS_IDENTITY_CACHE_SIZE", "4096"))
+
+# ===== Work items =====
+# Peticiones concurrentes al obtener detalles de work items por lotes
+WORK_ITEMS_FETCH_CONCURRENCY = int(os.getenv("AZURE_DEVOPS_WORK_ITEMS_CONCURRENCY", "4"))
+# Peticiones $batch concurrentes al crear work items en bloque
+WORK_ITEMS_WRITE_CONCURRENCY = int(os.getenv("AZURE_DEVOPS_WORK_ITEMS_WRITE_CONCURRENCY", "2"))
+
+# ===== Espejo local de work items (opcional) =====
+# Lista separada por comas de proyectos a sincronizar; vacío = desactivado.
+MIRROR_PROJECTS = [
+    p.strip() for p in os.getenv("AZURE_DEVOPS_MIRROR_PROJECTS", "").split(",") if p.strip()
+]
+MIRROR_DB_PATH = os.path.expanduser(
+    os.getenv("AZURE_DEVOPS_MIRROR_DB", os.path.join(CACHE_DIR, f"work-items-{AZURE_DEVOPS_ORG}.sqlite3"))
+)
+MIRROR_SYNC_INTERVAL = float(os.getenv("AZURE_DEVOPS_MIRROR_SYNC_INTERVAL", "300"))
+# Antigüedad máxima (segundos) para responder desde el espejo
+MIRROR_MAX_AGE = float(os.getenv("AZURE_DEVOPS_MIRROR_MAX_AGE", "900"))
+
+# ===== Operaciones en bloque sobre repositorios =====
+# Repositorios procesados en paralelo (permisos, políticas)
+REPOSITORY_BULK_CONCURRENCY = int(os.getenv("AZURE_DEVOPS_REPOSITORY_BULK_CONCURRENCY", "4"))
+
+# ===== Pipelines =====
+# Peticiones concurrentes al consultar la última ejecución de varios pipelines
+PIPELINE_REPORT_CONCURRENCY = int(os.getenv("AZURE_DEVOPS_PIPELINE_REPORT_CONCURRENCY", "4"))
+# Ejecuciones encoladas en paralelo por create_and_run_pipeline (una por rama)
+PIPELINE_RUN_CONCURRENCY = int(os.getenv("AZURE_DEVOPS_PIPELINE_RUN_CONCURRENCY", "4"))
+# Segundos que se reutiliza el índice de pipelines (nombre/carpeta -> ID) de un proyecto
+PIPELINE_INDEX_TTL = float(os.getenv("AZURE_DEVOPS_PIPELINE_INDEX_TTL", "300"))
+# Ruta del YAML usada al crear pipelines si no se indica otra
+PIPELINE_YAML_PATH = os.getenv("AZURE_DEVOPS_PIPELINE_YAML_PATH", ".azure-pipelines/ci.yml")
+# Caché local de ejecuciones para analítica (las completadas no cambian)
+RUN_STORE_DB_PATH = os.path.expanduser(
+    os.getenv("AZURE_DEVOPS_RUN_STORE_DB", os.path.join(CACHE_DIR, f"pipeline-runs-{AZURE_DEVOPS_ORG}.sqlite3"))
+)
+# Segundos que se reutilizan las ejecuciones en curso antes de volver a consultarlas
+RUN_STORE_IN_PROGRESS_TTL = float(os.getenv("AZURE_DEVOPS_RUN_STORE_IN_PROGRESS_TTL", "60"))
+# Historial descargado la primera vez que se analiza un proyecto
+RUN_STORE_HISTORY_DAYS = int(os.getenv("AZURE_DEVOPS_RUN_STORE_HISTORY_DAYS", "90"))
+# Intervalo de sondeo de watch_pipeline_run: crece de MIN a MAX mientras no hay cambios
+WATCH_MIN_INTERVAL = float(os.getenv("AZURE_DEVOPS_WATCH_MIN_INTERVAL", "2"))
+WATCH_MAX_INTERVAL = float(os.getenv("AZURE_DEVOPS_WATCH_MAX_INTERVAL", "30"))
+# Logs de ejecuciones completadas guardados comprimidos en disco
+LOG_CACHE_DIR = os.path.expanduser(os.getenv("AZURE_DEVOPS_LOG_CACHE_DIR", os.path.join(CACHE_DIR, "logs")))
+# Tamaño máximo (bytes) de la caché de logs; se eliminan primero los más antiguos
+LOG_CACHE_MAX_BYTES = int(os.getenv("AZURE_DEVOPS_LOG_CACHE_MAX_BYTES", str(1024 ** 3)))
+
+# ===== Jobs en segundo plano =====
+# Segundos que se conserva el estado de un job terminado
+JOB_RETENTION = float(os.getenv("AZURE_DEVOPS_JOB_RETENTION", "86400"))
+# Intervalo de consulta del estado de una importación (crece de MIN a MAX)
+IMPORT_POLL_MIN_INTERVAL = float(os.getenv("AZURE_DEVOPS_IMPORT_POLL_MIN_INTERVAL", "5"))
+IMPORT_POLL_MAX_INTERVAL = float(os.getenv("AZURE_DEVOPS_IMPORT_POLL_MAX_INTERVAL", "60"))
+# Espera máxima (segundos) de una importación antes de dar el job por fallido; 0 = sin límite
+IMPORT_MAX_WAIT = float(os.getenv("AZURE_DEVOPS_IMPORT_MAX_WAIT", str(6 * 3600)))
+# Importaciones simultáneas al importar varios repositorios a la vez
+REPOSITORY_IMPORT_CONCURRENCY = int(os.getenv("AZURE_DEVOPS_REPOSITORY_IMPORT_CONCURRENCY", "2"))
+
+# ===== Plazos de las tools =====
+# Plazo total (segundos) de cada llamada a una tool, repartido entre sus
+# peticiones a Azure DevOps; 0 lo desactiva
+TOOL_DEADLINE = float(os.getenv("AZURE_DEVOPS_TOOL_DEADLINE", "120"))
+# Plazos por tool: "tool=segundos;tool=segundos" (0 = sin plazo)
+TOOL_DEADLINES = os.getenv(
+    "AZURE_DEVOPS_TOOL_DEADLINES",
+    "get_pipeline_analytics=300;get_pipeline_logs=300;"
+    "assign_reviewers_policies_rollout=600;assign_contribute_permission_bulk=300;"
+    "create_work_items_bulk=300;watch_pipeline_run=630",
+)
+# Margen sobre el ``timeout_seconds`` propio de una tool (watch_pipeline_run)
+TOOL_DEADLINE_GRACE = float(os.getenv("AZURE_DEVOPS_TOOL_DEADLINE_GRACE", "30"))
+# Holgura del timeout de cada petición sobre el plazo restante, para que
+# sea el plazo de la tool (y no la petición) el que venza primero
+TOOL_DEADLINE_REQUEST_SLACK = float(os.getenv("AZURE_DEVOPS_TOOL_DEADLINE_REQUEST_SLACK", "0.5"))
+
+# ===== Formato de salida de las tools =====
+# Formato por defecto: compact (JSON mínimo, recomendado para agentes), json o text
+OUTPUT_FORMAT = os.getenv("AZURE_DEVOPS_OUTPUT_FORMAT", "compact").lower()
+# Tamaño máximo (caracteres) de la salida de una tool antes de recortarla
+OUTPUT_MAX_CHARS = int(os.getenv("AZURE_DEVOPS_OUTPUT_MAX_CHARS", "20000"))
+
+# ===== Métricas =====
+# Expone /metrics (formato Prometheus) en el servidor HTTP
+METRICS_ENABLED = os.getenv("AZURE_DEVOPS_METRICS", "true").lower() in ("1", "true", "yes")
+
+# ===== Trazas =====
+# Exportador de trazas de las llamadas a tools: vacío (desactivadas), jsonl u otlp
+TRACING_EXPORTER = os.getenv("AZURE_DEVOPS_TRACING", "").lower()
+# Fracción de llamadas a tools que se trazan (muestreo al iniciar la llamada)
+TRACING_SAMPLE_RATE = float(os.getenv("AZURE_DEVOPS_TRACING_SAMPLE_RATE", "1.0"))
+# Fichero del exportador jsonl (un span por línea)
+TRACING_FILE = os.path.expanduser(os.getenv("AZURE_DEVOPS_TRACING_FILE", os.path.join(CACHE_DIR, "traces.jsonl")))
+# Endpoint OTLP/HTTP (JSON) y cabeceras adicionales "clave=valor,clave=valor"
+TRACING_OTLP_ENDPOINT = os.getenv("AZURE_DEVOPS_TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACING_OTLP_HEADERS = os.getenv("AZURE_DEVOPS_TRACING_OTLP_HEADERS", "")
+TRACING_SERVICE_NAME = os.getenv("AZURE_DEVOPS_TRACING_SERVICE_NAME", "mcp-ado")
+# Segundos entre envíos al exportador y máximo de spans pendientes (se descartan los nuevos)
+TRACING_FLUSH_INTERVAL = float(os.getenv("AZURE_DEVOPS_TRACING_FLUSH_INTERVAL", "5"))
+TRACING_MAX_QUEUE = int(os.getenv("AZURE_DEVOPS_TRACING_MAX_QUEUE", "10000"))
@@ -0,0 +1,167 @@
+"""
+Plazo total de cada llamada a una tool.
+
+Una tool encadena varias peticiones a Azure DevOps; un timeout fijo por
+petición no acota cuánto tarda la tool completa. ``DeadlineMiddleware``
+(ver ``core.middleware``) abre un ``Deadline`` al empezar la llamada y lo
+deja en un ``ContextVar``: ``AzureDevOpsClient`` limita el timeout de cada
+petición al presupuesto que queda y registra qué petición está en curso,
+de modo que al agotarse el plazo se puede indicar qué paso fue el lento.
+
+Las tools pueden nombrar sus fases con ``step("crear pipeline")``; las
+peticiones hechas dentro quedan asociadas a esa fase.
+
+Las tareas en segundo plano (jobs, sondeos compartidos) heredan el
+contexto de quien las crea y deben llamar a ``detach()`` para no quedar
+sujetas al plazo de la tool que las arrancó.
+"""
+
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator, Optional
+
+from azure_devops_config import TOOL_DEADLINE, TOOL_DEADLINES, TOOL_DEADLINE_GRACE
+
+_current: ContextVar[Optional["Deadline"]] = ContextVar("azure_devops_deadline", default=None)
+_ids = itertools.count()
+
+
+def parse_deadlines(spec: str) -> dict[str, float]:
+    """``"tool=segundos;tool=segundos"`` -> {tool: segundos}."""
+    deadlines = {}
+    for item in spec.split(";"):
+        tool, _, seconds = item.strip().partition("=")
+        if tool and seconds:
+            deadlines[tool.strip()] = float(seconds)
+    return deadlines
+
+
+_overrides = parse_deadlines(TOOL_DEADLINES)
+
+
+def budget_for(tool: str, arguments: dict) -> Optional[float]:
+    """
+    Plazo en segundos de una llamada, o ``None`` si no tiene.
+
+    Una tool con su propio ``timeout_seconds`` (``watch_pipeline_run``)
+    recibe al menos ese tiempo más ``TOOL_DEADLINE_GRACE``.
+    """
+    budget = _overrides.get(tool, TOOL_DEADLINE)
+    if not budget or budget <= 0:
+        return None
+    timeout = arguments.get("timeout_seconds")
+    if isinstance(timeout, (int, float)) and timeout > 0:
+        budget = max(budget, timeout + TOOL_DEADLINE_GRACE)
+    return budget
+
+
+class Deadline:
+    """Presupuesto de tiempo de una llamada y peticiones en curso."""
+
+    def __init__(self, tool: str, budget: float) -> None:
+        self.tool = tool
+        self.budget = budget
+        self.started = time.monotonic()
+        self.expires_at = self.started + budget
+        # Fase nombrada por la tool con ``step``
+        self.phase: Optional[str] = None
+        # id -> (petición, fase, inicio)
+        self._calls: dict[int, tuple[str, Optional[str], float]] = {}
+        # Última petición terminada: (petición, fase, duración)
+        self._last: Optional[tuple[str, Optional[str], float]] = None
+        # Paso lento capturado al vencer, antes de que la cancelación
+        # retire las peticiones en curso
+        self._expired: Optional[dict] = None
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @contextmanager
+    def call(self, label: str) -> Iterator[None]:
+        """Registra una petición a Azure DevOps mientras está en curso."""
+        call_id = next(_ids)
+        phase = self.phase
+        started = time.monotonic()
+        self._calls[call_id] = (label, phase, started)
+        try:
+            yield
+        finally:
+            if self._expired is None and self.remaining() <= 0:
+                self._expired = self.slow_step()
+            del self._calls[call_id]
+            self._last = (label, phase, time.monotonic() - started)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def slow_step(self) -> dict:
+        """
+        Paso responsable de agotar el plazo: la petición en curso más
+        antigua; si no hay ninguna, la última terminada o la fase actual.
+        """
+        if self._expired is not None:
+            return self._expired
+        now = time.monotonic()
+        if self._calls:
+            label, phase, started = min(self._calls.values(), key=lambda c: c[2])
+            return {"step": label, "phase": phase, "seconds": round(now - started, 2), "in_flight": True}
+        if self._last is not None:
+            label, phase, duration = self._last
+            return {"step": label, "phase": phase, "seconds": round(duration, 2), "in_flight": False}
+        return {"step": self.phase or "procesamiento local", "phase": self.phase, "seconds": None, "in_flight": False}
+
+
+def current() -> Optional[Deadline]:
+    return _current.get()
+
+
+def remaining() -> Optional[float]:
+    """Segundos que quedan del plazo de la llamada actual, o ``None``."""
+    deadline = _current.get()
+    return deadline.remaining() if deadline is not None else None
+
+
+def activate(deadline: Deadline) -> Token:
+    return _current.set(deadline)
+
+
+def reset(token: Token) -> None:
+    _current.reset(token)
+
+
+def detach() -> None:
+    """Saca la tarea actual del plazo heredado (tareas en segundo plano)."""
+    _current.set(None)
+
+
+@contextmanager
+def step(name: str) -> Iterator[None]:
+    """Nombra la fase en curso de la tool para el informe de timeout."""
+    deadline = _current.get()
+    if deadline is None:
+        yield
+        return
+    previous = deadline.phase
+    deadline.phase = name
+    try:
+        yield
+    finally:
+        deadline.phase = previous
+
+
+@contextmanager
+def upstream_call(label: str) -> Iterator[None]:
+    """Registra una petición en el plazo actual, si lo hay."""
+    deadline = _current.get()
+    if deadline is None:
+        yield
+        return
+    with deadline.call(label):
+        yield
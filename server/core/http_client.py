@@ -0,0 +1,418 @@
+"""
+Cliente HTTP compartido para todas las tools de Azure DevOps.
+
+Mantiene un único pool de conexiones (keep-alive y HTTP/2 cuando está
+disponible) para dev.azure.com y vssps.dev.azure.com, de modo que cada
+llamada a una tool reutiliza conexiones ya establecidas en lugar de pagar
+un nuevo handshake TCP+TLS.
+
+Todas las peticiones pasan por ``request``/``stream``, que reintentan ante
+throttling (429, respetando ``Retry-After``) y errores transitorios con
+espera exponencial con jitter, y comparten un límite de concurrencia
+adaptativo (ver ``core.ratelimit``). Los GETs idénticos que coinciden en
+el tiempo se agrupan en una sola llamada, y los de endpoints de listado
+pasan por una caché con revalidación ETag (ver ``core.response_cache``).
+
+Dentro de una tool con plazo (ver ``core.deadlines``) el timeout de cada
+petición es como máximo el presupuesto que le queda a la tool, y no se
+reintenta si la espera no cabe en él.
+
+Cada intento se registra en las métricas (``core.metrics``) por plantilla
+de endpoint, código de estado y latencia hasta recibir las cabeceras, y
+como span de la traza de la tool si se está trazando (``core.tracing``).
+"""
+
+import asyncio
+import importlib.util
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from azure_devops_config import (
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS_PER_HOST,
+    HTTP_TIMEOUT,
+    HTTP2_ENABLED,
+    HTTP_MAX_RETRIES,
+    HTTP_RETRY_BACKOFF_BASE,
+    HTTP_RETRY_BACKOFF_MAX,
+    HTTP_RETRY_MAX_WAIT,
+    HTTP_ADAPTIVE_MIN_CONCURRENCY,
+    HTTP_ADAPTIVE_MAX_CONCURRENCY,
+    HTTP_SINGLEFLIGHT,
+    HTTP_CACHE_MAX_BYTES,
+    TOOL_DEADLINE_REQUEST_SLACK,
+)
+from core import deadlines, metrics, tracing
+from core.ratelimit import AdaptiveLimiter, retry_after
+from core.response_cache import ResponseCache
+
+# Métodos que se pueden repetir sin efectos adicionales
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# Respuestas transitorias que se reintentan (además de 429)
+RETRY_STATUSES = {500, 502, 503, 504}
+
+
+class _LeaderCancelled(Exception):
+    """La petición compartida se canceló antes de completarse."""
+
+
+def _call_label(method: str, url: str) -> str:
+    """``GET /org/proyecto/_apis/build/builds`` (sin query) para los informes de timeout."""
+    return f"{method} {httpx.URL(url).path}"
+
+
+def _share_json(response: httpx.Response) -> None:
+    """Memoriza ``response.json()`` para que los GETs agrupados lo parseen una vez."""
+    original = response.json
+    parsed = []
+
+    def json(**kwargs):
+        if kwargs:
+            return original(**kwargs)
+        if not parsed:
+            parsed.append(original())
+        return parsed[0]
+
+    response.json = json
+
+
+class AzureDevOpsClient:
+    """
+    Envoltorio de un ``httpx.AsyncClient`` de larga vida.
+
+    El ciclo de vida lo gestiona el lifespan del servidor FastMCP
+    (``async with client:``). Si una tool se invoca antes de que el
+    lifespan haya arrancado, el pool se crea de forma perezosa.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY,
+        max_connections_per_host: int = HTTP_MAX_CONNECTIONS_PER_HOST,
+        timeout: float = HTTP_TIMEOUT,
+        http2: bool = HTTP2_ENABLED,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        max_retries: int = HTTP_MAX_RETRIES,
+        retry_backoff_base: float = HTTP_RETRY_BACKOFF_BASE,
+        retry_backoff_max: float = HTTP_RETRY_BACKOFF_MAX,
+        retry_max_wait: float = HTTP_RETRY_MAX_WAIT,
+        min_concurrency: int = HTTP_ADAPTIVE_MIN_CONCURRENCY,
+        max_concurrency: int = HTTP_ADAPTIVE_MAX_CONCURRENCY,
+        singleflight: bool = HTTP_SINGLEFLIGHT,
+        cache_max_bytes: int = HTTP_CACHE_MAX_BYTES,
+    ) -> None:
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        # HTTP/2 requiere el paquete opcional ``h2``; sin él se usa HTTP/1.1.
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+        self.max_retries = max_retries
+        self.retry_backoff_base = retry_backoff_base
+        self.retry_backoff_max = retry_backoff_max
+        self.retry_max_wait = retry_max_wait
+        self.retries = 0
+        self.singleflight = singleflight
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        # GETs atendidos por una llamada ya en curso en lugar de una propia
+        self.coalesced = 0
+        # Caché de respuestas GET con revalidación (None si está desactivada)
+        self.cache = ResponseCache(max_bytes=cache_max_bytes) if cache_max_bytes > 0 else None
+        # Límite global de peticiones simultáneas, ajustado según el throttling
+        self.limiter = AdaptiveLimiter(
+            initial=max_connections_per_host,
+            minimum=min_concurrency,
+            maximum=max_concurrency,
+        )
+
+    async def __aenter__(self) -> "AzureDevOpsClient":
+        self._ensure_client()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Cierra el pool de conexiones."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=self.limits,
+                timeout=self.timeout,
+                transport=self._transport,
+            )
+        return self._client
+
+    def pool_stats(self) -> dict[str, int]:
+        """
+        Conexiones del pool por estado (``active``/``idle``). Vacío si el
+        transporte no es el pool de httpcore (p. ej. transportes de prueba).
+        """
+        transport = self._client._transport if self._client is not None else None
+        pool = getattr(transport, "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return {}
+        idle = sum(1 for c in connections if c.is_idle())
+        return {"active": len(connections) - idle, "idle": idle}
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = httpx.URL(url).host
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_connections_per_host)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    # ===== Reintentos =====
+
+    def _backoff(self, attempt: int) -> float:
+        """Espera exponencial con jitter completo."""
+        return random.uniform(0, min(self.retry_backoff_max, self.retry_backoff_base * 2 ** attempt))
+
+    def _retry_delay(self, method: str, attempt: int, response: Optional[httpx.Response] = None,
+                     error: Optional[Exception] = None) -> Optional[float]:
+        """
+        Segundos a esperar antes de reintentar, o ``None`` si no se reintenta.
+
+        Un 429 y los errores de conexión significan que la petición no llegó
+        a procesarse, así que se reintentan con cualquier método; los 5xx
+        transitorios y los timeouts de lectura solo en métodos idempotentes.
+        """
+        if attempt >= self.max_retries:
+            return None
+        delay = None
+        if error is not None:
+            if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+                delay = self._backoff(attempt)
+            elif method in IDEMPOTENT_METHODS and isinstance(error, httpx.TransportError):
+                delay = self._backoff(attempt)
+        elif response.status_code == 429 or (
+            method in IDEMPOTENT_METHODS and response.status_code in RETRY_STATUSES
+        ):
+            wait = retry_after(response)
+            if wait is None:
+                delay = self._backoff(attempt)
+            elif wait <= self.retry_max_wait:
+                delay = wait + random.uniform(0, 0.5)
+            # Un Retry-After más largo que el máximo se devuelve al llamador
+
+        # Una espera que agota el plazo de la tool no sirve de nada
+        remaining = deadlines.remaining()
+        if delay is not None and remaining is not None and delay >= remaining:
+            return None
+        return delay
+
+    def _apply_deadline(self, kwargs: dict) -> dict:
+        """Limita el timeout de la petición al plazo restante de la tool."""
+        remaining = deadlines.remaining()
+        if remaining is None or "timeout" in kwargs:
+            return kwargs
+        return {**kwargs, "timeout": min(self.timeout, remaining + TOOL_DEADLINE_REQUEST_SLACK)}
+
+    # ===== Agrupación de GETs idénticos (singleflight) =====
+
+    def _flight_key(self, url: str, kwargs: dict) -> Optional[tuple]:
+        """
+        Clave de agrupación: URL final (con query) y cabeceras, que incluyen
+        las credenciales. Solo para GETs sin cuerpo.
+        """
+        if any(k in kwargs for k in ("content", "data", "json", "files")):
+            return None
+        request = self._build_get(url, kwargs)
+        return (str(request.url), tuple(sorted(request.headers.multi_items())))
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Ejecuta una petición respetando el límite de conexiones por host y
+        el límite adaptativo global, con reintentos ante throttling y
+        errores transitorios.
+
+        Los GETs idénticos concurrentes (misma URL y credenciales) comparten
+        una sola llamada: todos reciben la misma respuesta y ``json()`` se
+        parsea una vez. El resultado parseado es compartido y no debe
+        modificarse.
+        """
+        method = method.upper()
+        if method != "GET":
+            response = await self._send(method, url, **kwargs)
+            if self.cache is not None and response.is_success:
+                self.cache.invalidate_for_write(method, url)
+            return response
+
+        key = self._flight_key(url, kwargs)
+        if key is None:
+            return await self._send(method, url, **kwargs)
+        if not self.singleflight:
+            return await self._get(key, url, kwargs)
+
+        leader = self._inflight.get(key)
+        if leader is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(leader)
+            except _LeaderCancelled:
+                # Quien hacía la llamada fue cancelado: se repite por cuenta propia
+                return await self._get(key, url, kwargs)
+
+        future = asyncio.get_running_loop().create_future()
+        # Evita el aviso de excepción no recuperada cuando nadie más espera
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            response = await self._get(key, url, kwargs)
+            future.set_result(response)
+            return response
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def _get(self, key: tuple, url: str, kwargs: dict) -> httpx.Response:
+        """GET a través de la caché de respuestas, si el endpoint tiene política."""
+        ttl = self.cache.ttl_for(url) if self.cache is not None else None
+        if ttl is None:
+            response = await self._send("GET", url, **kwargs)
+            _share_json(response)
+            return response
+
+        entry = self.cache.get(key)
+        if entry is not None and entry.fresh:
+            self.cache.hit(entry)
+            return entry.response(self._build_get(url, kwargs))
+
+        if entry is not None and entry.validators():
+            conditional = dict(kwargs)
+            conditional["headers"] = {**(kwargs.get("headers") or {}), **entry.validators()}
+            response = await self._send("GET", url, **conditional)
+            if response.status_code == 304:
+                self.cache.refresh(entry, response, ttl)
+                return entry.response(self._build_get(url, kwargs))
+        else:
+            response = await self._send("GET", url, **kwargs)
+
+        self.cache.store(key, response, ttl)
+        _share_json(response)
+        return response
+
+    def _build_get(self, url: str, kwargs: dict) -> httpx.Request:
+        return self._ensure_client().build_request(
+            "GET", url, params=kwargs.get("params"), headers=kwargs.get("headers")
+        )
+
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        client = self._ensure_client()
+        attempt = 0
+        while True:
+            span = None
+            try:
+                with deadlines.upstream_call(_call_label(method, url)):
+                    async with self.limiter, self._host_semaphore(url):
+                        started = time.perf_counter()
+                        span = tracing.start_upstream(method, url)
+                        response = await client.request(method, url, **self._apply_deadline(kwargs))
+                        metrics.observe_upstream(method, url, response.status_code, started)
+                        tracing.end_upstream(span, response)
+            except httpx.TransportError as e:
+                metrics.observe_upstream(method, url, "error", started)
+                tracing.end_upstream(span, error=e)
+                delay = self._retry_delay(method, attempt, error=e)
+                if delay is None:
+                    raise
+            else:
+                await self.limiter.observe(response)
+                delay = self._retry_delay(method, attempt, response)
+                if delay is None:
+                    return response
+                await response.aclose()
+
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """
+        Como ``request`` pero sin leer el cuerpo: se consume con
+        ``aiter_bytes``/``aiter_lines`` dentro del bloque ``async with``.
+        Los reintentos solo ocurren antes de entregar la respuesta.
+        """
+        client = self._ensure_client()
+        method = method.upper()
+        attempt = 0
+        delivered = False
+        while True:
+            response = None
+            span = None
+            try:
+                with deadlines.upstream_call(_call_label(method, url)):
+                    async with self.limiter, self._host_semaphore(url):
+                        started = time.perf_counter()
+                        span = tracing.start_upstream(method, url)
+                        async with client.stream(method, url, **self._apply_deadline(kwargs)) as response:
+                            metrics.observe_upstream(method, url, response.status_code, started)
+                            await self.limiter.observe(response)
+                            delay = self._retry_delay(method, attempt, response)
+                            if delay is None:
+                                delivered = True
+                                # El span cubre también la lectura del cuerpo
+                                try:
+                                    yield response
+                                except httpx.TransportError as e:
+                                    tracing.end_upstream(span, error=e)
+                                    raise
+                                finally:
+                                    tracing.end_upstream(span, response)
+                                return
+                        tracing.end_upstream(span, response)
+            except httpx.TransportError as e:
+                if response is None:
+                    metrics.observe_upstream(method, url, "error", started)
+                tracing.end_upstream(span, error=e)
+                # Un error al leer el cuerpo ya entregado no se puede reintentar
+                delay = None if delivered else self._retry_delay(method, attempt, error=e)
+                if delay is None:
+                    raise
+
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
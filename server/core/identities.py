@@ -0,0 +1,79 @@
+"""
+Resolución de identidades (email -> descriptor) contra vssps.dev.azure.com.
+
+La búsqueda de identidades es el paso más lento al asignar permisos y se
+repite para las mismas personas en muchos repositorios. Los resultados se
+guardan con TTL, los "no encontrado" con un TTL corto, y las búsquedas
+concurrentes del mismo email comparten una sola consulta.
+"""
+
+from typing import Optional
+from urllib.parse import quote
+
+from azure_devops_config import (
+    get_auth_header,
+    AZURE_DEVOPS_ORG,
+    AZURE_DEVOPS_API_VERSION,
+    IDENTITY_CACHE_TTL,
+    IDENTITY_NEGATIVE_TTL,
+    IDENTITY_CACHE_SIZE,
+)
+from core.cache import TTLCache
+from core.http_client import AzureDevOpsClient
+
+
+class IdentityResolver:
+    """Caché compartida de identidades por email."""
+
+    def __init__(
+        self,
+        client: AzureDevOpsClient,
+        maxsize: int = IDENTITY_CACHE_SIZE,
+        ttl: float = IDENTITY_CACHE_TTL,
+        negative_ttl: float = IDENTITY_NEGATIVE_TTL,
+    ) -> None:
+        self.client = client
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl, negative_ttl=negative_ttl)
+
+    async def lookup(self, email: str) -> Optional[list[dict]]:
+        """
+        Retorna las identidades asociadas al email como una lista de
+        ``{"descriptor", "providerDisplayName"}``, o ``None`` si no hay
+        ninguna.
+        """
+        key = email.strip().lower()
+        return await self.cache.get_or_load(key, lambda: self._fetch(key))
+
+    async def _fetch(self, email: str) -> Optional[list[dict]]:
+        url = (
+            f"https://vssps.dev.azure.com/{AZURE_DEVOPS_ORG}/_apis/identities"
+            f"?searchFilter=General&filterValue={quote(email)}&queryMembership=None"
+            f"&api-version={AZURE_DEVOPS_API_VERSION}"
+        )
+        response = await self.client.get(url, headers={"Authorization": get_auth_header()})
+        response.raise_for_status()
+
+        identities = [
+            {
+                "descriptor": u["descriptor"],
+                "providerDisplayName": u.get("providerDisplayName"),
+            }
+            for u in response.json().get("value", [])
+            if u.get("descriptor")
+        ]
+        # None se guarda con el TTL negativo de la caché
+        return identities or None
+
+    async def descriptor(self, email: str, display_name: Optional[str] = None) -> Optional[str]:
+        """
+        Retorna el descriptor del usuario. Si se indica ``display_name``,
+        solo se acepta la identidad cuyo nombre coincide.
+        """
+        identities = await self.lookup(email)
+        if not identities:
+            return None
+        return next(
+            (i["descriptor"] for i in identities
+             if display_name is None or i["providerDisplayName"] == display_name),
+            None
+        )
@@ -0,0 +1,147 @@
+"""
+Importación de repositorios Git externos en Azure Repos.
+
+``importRequests`` solo encola la importación; ``wait_for_import`` consulta
+su estado con un intervalo creciente (de ``IMPORT_POLL_MIN_INTERVAL`` a
+``IMPORT_POLL_MAX_INTERVAL``) hasta que termina, informando cada cambio de
+paso a través de ``on_update``. Los errores transitorios de la consulta
+(red, 5xx) no cortan la espera: se reintenta en el siguiente sondeo. Si no
+termina en ``IMPORT_MAX_WAIT`` segundos (p. ej. atascada en ``queued``) se
+abandona la espera con ``ImportTimeout``.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Callable, Optional
+
+import httpx
+
+from azure_devops_config import (
+    get_base_url,
+    get_auth_header,
+    AZURE_DEVOPS_API_VERSION,
+    IMPORT_POLL_MIN_INTERVAL,
+    IMPORT_POLL_MAX_INTERVAL,
+    IMPORT_MAX_WAIT,
+)
+from core.http_client import AzureDevOpsClient
+
+logger = logging.getLogger(__name__)
+
+# Estados finales de una importación
+FINAL_STATUSES = ("completed", "failed", "abandoned")
+BACKOFF_FACTOR = 1.5
+
+
+class ImportFailed(Exception):
+    """La importación terminó en ``failed`` o ``abandoned``."""
+
+
+class ImportTimeout(ImportFailed):
+    """La importación no terminó dentro de la espera máxima."""
+
+
+async def create_repository(client: AzureDevOpsClient, project: str, repository: str) -> dict:
+    """Crea un repositorio vacío y retorna su representación."""
+    response = await client.post(
+        f"{get_base_url()}/{project}/_apis/git/repositories?api-version={AZURE_DEVOPS_API_VERSION}",
+        headers={"Authorization": get_auth_header(), "Content-Type": "application/json"},
+        json={"name": repository},
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+async def start_import(client: AzureDevOpsClient, project: str, repository_id: str, source_url: str) -> dict:
+    """Encola la importación de ``source_url`` y retorna el import request."""
+    response = await client.post(
+        f"{get_base_url()}/{project}/_apis/git/repositories/{repository_id}/importRequests"
+        f"?api-version={AZURE_DEVOPS_API_VERSION}",
+        headers={"Authorization": get_auth_header(), "Content-Type": "application/json"},
+        json={
+            "parameters": {
+                "deleteServiceEndpointAfterImport": True,
+                "gitSource": {"url": source_url},
+            }
+        },
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def describe_import(import_request: dict) -> str:
+    """Estado legible: ``inProgress (paso 3/5: Cloning)``."""
+    status = import_request.get("status", "unknown")
+    detailed = import_request.get("detailedStatus") or {}
+    steps = detailed.get("allSteps") or []
+    current = detailed.get("currentStep")
+    if steps and current:
+        return f"{status} (paso {current}/{len(steps)}: {steps[min(current, len(steps)) - 1]})"
+    return status
+
+
+async def wait_for_import(
+    client: AzureDevOpsClient,
+    project: str,
+    repository_id: str,
+    import_request_id: int,
+    on_update: Optional[Callable[[dict], None]] = None,
+    min_interval: float = IMPORT_POLL_MIN_INTERVAL,
+    max_interval: float = IMPORT_POLL_MAX_INTERVAL,
+    max_wait: float = IMPORT_MAX_WAIT,
+) -> dict:
+    """
+    Espera a que la importación termine y retorna el import request final.
+
+    Lanza ``ImportFailed`` si termina en ``failed`` o ``abandoned``, e
+    ``ImportTimeout`` si sigue sin terminar tras ``max_wait`` segundos
+    (0 = sin límite). Un 401, 403 o 404 al consultar el estado se propaga;
+    los demás errores se reintentan con el intervalo creciente.
+    """
+    url = (
+        f"{get_base_url()}/{project}/_apis/git/repositories/{repository_id}"
+        f"/importRequests/{import_request_id}"
+    )
+    headers = {"Authorization": get_auth_header()}
+    interval = min_interval
+    last = None
+    expires_at = time.monotonic() + max_wait if max_wait > 0 else None
+
+    while True:
+        try:
+            response = await client.get(url, headers=headers, params={"api-version": AZURE_DEVOPS_API_VERSION})
+            response.raise_for_status()
+        except (httpx.TransportError, httpx.HTTPStatusError) as e:
+            if isinstance(e, httpx.HTTPStatusError) and e.response.status_code in (401, 403, 404):
+                raise
+            # Error transitorio: se reintenta en el siguiente sondeo
+            logger.warning("Fallo al consultar la importación %s: %s", import_request_id, e)
+            interval = min(interval * BACKOFF_FACTOR, max_interval)
+        else:
+            import_request = response.json()
+
+            state = describe_import(import_request)
+            if state != last:
+                last = state
+                interval = min_interval
+                if on_update is not None:
+                    on_update(import_request)
+            else:
+                interval = min(interval * BACKOFF_FACTOR, max_interval)
+
+            status = import_request.get("status")
+            if status in FINAL_STATUSES:
+                if status != "completed":
+                    error = (import_request.get("detailedStatus") or {}).get("errorMessage")
+                    raise ImportFailed(error or f"Importación {status}")
+                return import_request
+
+        if expires_at is not None:
+            remaining = expires_at - time.monotonic()
+            if remaining <= 0:
+                raise ImportTimeout(
+                    f"La importación sigue en '{last or 'unknown'}' tras {max_wait:g} s; se deja de esperar"
+                )
+            interval = min(interval, remaining)
+        await asyncio.sleep(interval)
@@ -0,0 +1,134 @@
+"""
+Registro de tareas en segundo plano del servidor.
+
+Las operaciones largas (p. ej. importar un repositorio de varios GB) se
+ejecutan como tareas asyncio registradas con un ID de job. La tool que las
+inicia retorna ese ID de inmediato y ``get_job_status`` consulta el estado
+guardado, sin que el agente tenga que repetir llamadas a Azure DevOps.
+
+Los jobs viven en memoria: al reiniciar el servidor se pierden. Los
+terminados se descartan tras ``JOB_RETENTION`` segundos.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from azure_devops_config import JOB_RETENTION
+from core import deadlines, tracing
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    description: str
+    status: str = PENDING
+    # Paso o estado intermedio más reciente (p. ej. el de la importación)
+    detail: Optional[str] = None
+    result: dict = field(default_factory=dict)
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED, CANCELLED)
+
+    def update(self, detail: Optional[str] = None, **result) -> None:
+        if detail is not None:
+            self.detail = detail
+        self.result.update(result)
+        self.updated_at = time.time()
+
+
+class JobRegistry:
+    """Jobs en ejecución y terminados recientemente."""
+
+    def __init__(self, retention: float = JOB_RETENTION) -> None:
+        self.retention = retention
+        self._jobs: dict[str, Job] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def submit(
+        self,
+        kind: str,
+        description: str,
+        fn: Callable[[Job], Awaitable[None]],
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> Job:
+        """
+        Registra un job y lo ejecuta en segundo plano.
+
+        ``fn`` recibe el job para ir actualizando ``detail``/``result``; si
+        termina sin excepción el job queda ``succeeded``, si lanza una
+        excepción, ``failed`` con su mensaje. Con ``semaphore`` el job espera
+        en ``pending`` hasta obtener un hueco.
+        """
+        self._prune()
+        job = Job(id=uuid.uuid4().hex[:12], kind=kind, description=description)
+        self._jobs[job.id] = job
+
+        async def run() -> None:
+            # El job sigue aunque venza el plazo de la tool que lo inició, y
+            # sus peticiones no se cuelgan de la traza de esa llamada
+            deadlines.detach()
+            tracing.detach()
+            try:
+                if semaphore is not None:
+                    async with semaphore:
+                        job.status = RUNNING
+                        job.update()
+                        await fn(job)
+                else:
+                    job.status = RUNNING
+                    job.update()
+                    await fn(job)
+                job.status = SUCCEEDED
+            except asyncio.CancelledError:
+                job.status = CANCELLED
+                raise
+            except Exception as e:
+                logger.warning("Job %s (%s) falló: %s", job.id, kind, e)
+                job.status = FAILED
+                job.error = str(e)
+            finally:
+                job.update()
+                self._tasks.pop(job.id, None)
+
+        self._tasks[job.id] = asyncio.create_task(run())
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list(self, kind: Optional[str] = None) -> list[Job]:
+        """Jobs registrados, del más reciente al más antiguo."""
+        self._prune()
+        jobs = [j for j in self._jobs.values() if kind is None or j.kind == kind]
+        return sorted(jobs, key=lambda j: j.created_at, reverse=True)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.updated_at < cutoff]:
+            del self._jobs[job_id]
+
+    async def __aenter__(self) -> "JobRegistry":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,300 @@
+"""
+Lectura de logs de ejecuciones de pipelines sin cargarlos completos en memoria.
+
+Los logs de una ejecución completada ya no cambian: la primera vez que se
+leen se descargan en streaming a ``LOG_CACHE_DIR`` comprimidos con gzip y
+después se recorren desde disco. Los de una ejecución en curso se piden a
+la API por rango de líneas (``startLine``/``endLine``) y no se guardan.
+
+Cada modo de lectura (rango, cola, errores) procesa las líneas una a una y
+solo conserva lo que va a devolver, así que la memoria no depende del
+tamaño del log.
+"""
+
+import asyncio
+import contextlib
+import gzip
+import os
+from collections import deque
+from typing import AsyncIterator, Iterable, Optional
+from urllib.parse import quote
+
+from azure_devops_config import (
+    get_base_url,
+    get_auth_header,
+    AZURE_DEVOPS_ORG,
+    AZURE_DEVOPS_API_VERSION,
+    LOG_CACHE_DIR,
+    LOG_CACHE_MAX_BYTES,
+)
+from core.http_client import AzureDevOpsClient
+
+ERROR_MARKER = "##[error]"
+
+
+# ===== Selección de líneas =====
+# Cada selector recibe (número, línea) en orden y decide qué conservar.
+
+class RangeSelector:
+    """Líneas ``start``..``end`` (inclusive), como máximo ``limit``."""
+
+    def __init__(self, start: int, end: Optional[int], limit: int) -> None:
+        self.start = max(start, 1)
+        self.end = end
+        self.limit = limit
+        self.lines: list[tuple[int, str]] = []
+        self.next_line: Optional[int] = None
+
+    def feed(self, number: int, line: str) -> bool:
+        """Retorna ``False`` cuando ya no necesita más líneas."""
+        if number < self.start:
+            return True
+        if self.end is not None and number > self.end:
+            return False
+        if len(self.lines) >= self.limit:
+            self.next_line = number
+            return False
+        self.lines.append((number, line))
+        return True
+
+
+class TailSelector:
+    """Las últimas ``count`` líneas."""
+
+    def __init__(self, count: int) -> None:
+        self.buffer: deque = deque(maxlen=max(count, 1))
+
+    def feed(self, number: int, line: str) -> bool:
+        self.buffer.append((number, line))
+        return True
+
+    @property
+    def lines(self) -> list[tuple[int, str]]:
+        return list(self.buffer)
+
+
+class ErrorSelector:
+    """
+    Líneas con ``##[error]`` y ``context`` líneas antes y después.
+
+    Los bloques solapados se unen; ``None`` en ``lines`` separa bloques.
+    Al llegar a ``limit`` líneas se sigue contando errores sin guardarlos.
+    """
+
+    def __init__(self, context: int, limit: int) -> None:
+        self.context = max(context, 0)
+        self.before: deque = deque(maxlen=max(self.context, 1))
+        self.limit = limit
+        self.lines: list[Optional[tuple[int, str]]] = []
+        self.errors = 0
+        self.truncated = False
+        self._after = 0
+        self._last: Optional[int] = None
+
+    def _emit(self, number: int, line: str) -> None:
+        if len(self.lines) >= self.limit:
+            self.truncated = True
+            return
+        if self._last is not None and number > self._last + 1:
+            self.lines.append(None)
+        self.lines.append((number, line))
+        self._last = number
+
+    def feed(self, number: int, line: str) -> bool:
+        if ERROR_MARKER in line:
+            self.errors += 1
+            for entry in self.before:
+                self._emit(*entry)
+            self.before.clear()
+            self._emit(number, line)
+            self._after = self.context
+        elif self._after:
+            self._after -= 1
+            self._emit(number, line)
+        elif self.context:
+            self.before.append((number, line))
+        return True
+
+
+def _scan_file(path: str, selector, start: int = 1) -> None:
+    """Recorre un log comprimido pasando cada línea al selector (en un hilo)."""
+    with gzip.open(path, "rt", encoding="utf-8", errors="replace", newline="") as f:
+        for number, line in enumerate(f, 1):
+            if number < start:
+                continue
+            if not selector.feed(number, line.rstrip("\r\n")):
+                return
+
+
+def _prune(cache_dir: str, max_bytes: int) -> None:
+    """Elimina los logs menos recientes hasta quedar por debajo de ``max_bytes``."""
+    files = []
+    for root, _, names in os.walk(cache_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            return
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+class PipelineLogs:
+    """Acceso a los logs de una ejecución con caché comprimida en disco."""
+
+    def __init__(
+        self,
+        client: AzureDevOpsClient,
+        cache_dir: str = LOG_CACHE_DIR,
+        max_bytes: int = LOG_CACHE_MAX_BYTES,
+    ) -> None:
+        self.client = client
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._downloads: dict[str, asyncio.Lock] = {}
+
+    def _base_url(self, project: str, run_id: int) -> str:
+        return f"{get_base_url()}/{project}/_apis/build/builds/{run_id}"
+
+    async def describe(self, project: str, run_id: int) -> tuple[dict, list[dict]]:
+        """
+        Retorna el build y sus logs; cada log incluye ``name`` y ``result``
+        de la tarea del timeline que lo generó, si se conoce.
+        """
+        base = self._base_url(project, run_id)
+        headers = {"Authorization": get_auth_header()}
+        params = {"api-version": AZURE_DEVOPS_API_VERSION}
+        build_res, logs_res, timeline_res = await asyncio.gather(
+            self.client.get(base, headers=headers, params=params),
+            self.client.get(f"{base}/logs", headers=headers, params=params),
+            self.client.get(f"{base}/timeline", headers=headers, params=params),
+        )
+        build_res.raise_for_status()
+        logs_res.raise_for_status()
+
+        records = {}
+        if timeline_res.status_code == 200 and timeline_res.content:
+            for record in timeline_res.json().get("records") or []:
+                if record.get("log"):
+                    records[record["log"]["id"]] = record
+
+        logs = []
+        for log in logs_res.json().get("value", []):
+            record = records.get(log["id"], {})
+            logs.append({
+                "id": log["id"],
+                "lineCount": log.get("lineCount"),
+                "name": record.get("name"),
+                "type": record.get("type"),
+                "result": record.get("result"),
+            })
+        return build_res.json(), logs
+
+    def _cache_path(self, project: str, run_id: int, log_id: int) -> str:
+        return os.path.join(
+            self.cache_dir,
+            quote(AZURE_DEVOPS_ORG or "", safe=""),
+            quote(project.lower(), safe=""),
+            str(run_id),
+            f"{log_id}.log.gz",
+        )
+
+    async def _download(self, project: str, run_id: int, log_id: int) -> str:
+        """Descarga el log completo a la caché en streaming y retorna su ruta."""
+        path = self._cache_path(project, run_id, log_id)
+        lock = self._downloads.setdefault(path, asyncio.Lock())
+        try:
+            async with lock:
+                if os.path.exists(path):
+                    os.utime(path)
+                    return path
+
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                try:
+                    async with self.client.stream(
+                        "GET",
+                        f"{self._base_url(project, run_id)}/logs/{log_id}",
+                        headers={"Authorization": get_auth_header(), "Accept": "text/plain"},
+                        params={"api-version": AZURE_DEVOPS_API_VERSION},
+                    ) as response:
+                        response.raise_for_status()
+                        with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+                            async for chunk in response.aiter_bytes():
+                                f.write(chunk)
+                    os.replace(tmp_path, path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+        finally:
+            # También si la descarga falla o ya estaba en caché
+            self._downloads.pop(path, None)
+        await asyncio.to_thread(_prune, self.cache_dir, self.max_bytes)
+        return path
+
+    async def _stream_lines(
+        self,
+        project: str,
+        run_id: int,
+        log_id: int,
+        start: int = 1,
+        end: Optional[int] = None,
+    ) -> AsyncIterator[tuple[int, str]]:
+        params: dict = {"api-version": AZURE_DEVOPS_API_VERSION}
+        if start > 1:
+            params["startLine"] = start
+        if end is not None:
+            params["endLine"] = end
+        async with self.client.stream(
+            "GET",
+            f"{self._base_url(project, run_id)}/logs/{log_id}",
+            headers={"Authorization": get_auth_header(), "Accept": "text/plain"},
+            params=params,
+        ) as response:
+            response.raise_for_status()
+            number = start
+            async for line in response.aiter_lines():
+                yield number, line.rstrip("\r\n")
+                number += 1
+
+    async def scan(
+        self,
+        project: str,
+        run_id: int,
+        log_id: int,
+        selector,
+        completed: bool,
+        start: int = 1,
+        end: Optional[int] = None,
+    ) -> None:
+        """
+        Pasa las líneas del log al selector. Si la ejecución terminó, se
+        leen de la caché en disco (descargándola si hace falta); si no, de
+        la API limitando el rango a ``start``..``end``.
+        """
+        if completed:
+            path = await self._download(project, run_id, log_id)
+            await asyncio.to_thread(_scan_file, path, selector, start)
+            return
+
+        # aclosing cierra la respuesta en streaming al salir antes de tiempo
+        async with contextlib.aclosing(
+            self._stream_lines(project, run_id, log_id, start, end)
+        ) as lines:
+            async for number, line in lines:
+                if not selector.feed(number, line):
+                    return
+
+
+def format_lines(lines: Iterable[Optional[tuple[int, str]]]) -> list[str]:
+    """Numera las líneas; ``None`` se muestra como separador de bloques."""
+    return ["--" if entry is None else f"{entry[0]:>6}: {entry[1]}" for entry in lines]
@@ -0,0 +1,209 @@
+"""
+Caché persistente de metadatos de la organización.
+
+El catálogo de ``_apis/securitynamespaces`` y los tipos de política
+(``_apis/policy/types``) prácticamente no cambian, pero son costosos de
+descargar. Se guardan en un JSON bajo ``CACHE_DIR`` que se carga al
+arrancar y se refresca en segundo plano cuando supera ``METADATA_TTL``,
+así un proceso recién iniciado no vuelve a descargarlos.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from azure_devops_config import (
+    get_base_url,
+    get_auth_header,
+    AZURE_DEVOPS_ORG,
+    AZURE_DEVOPS_API_VERSION,
+    CACHE_DIR,
+    METADATA_TTL,
+    METADATA_REFRESH_INTERVAL,
+)
+from core.cache import LeaderCancelled
+from core.http_client import AzureDevOpsClient
+
+logger = logging.getLogger(__name__)
+
+GIT_NAMESPACE_KEY = "securitynamespaces:git"
+
+
+class MetadataCache:
+    """Metadatos de la organización persistidos en disco con TTL largo."""
+
+    def __init__(
+        self,
+        client: AzureDevOpsClient,
+        cache_dir: str = CACHE_DIR,
+        ttl: float = METADATA_TTL,
+        refresh_interval: float = METADATA_REFRESH_INTERVAL,
+    ) -> None:
+        self.client = client
+        self.path = os.path.join(cache_dir, f"metadata-{AZURE_DEVOPS_ORG}.json")
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "MetadataCache":
+        self.load()
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    # ===== Persistencia =====
+
+    def load(self) -> None:
+        """Carga las entradas guardadas en disco, si existen."""
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                self._entries = json.load(fh)
+        except FileNotFoundError:
+            self._entries = {}
+        except (OSError, ValueError) as e:
+            logger.warning("No se pudo leer la caché de metadatos %s: %s", self.path, e)
+            self._entries = {}
+
+    def _save(self) -> None:
+        """Guarda las entradas en disco; si falla, se siguen sirviendo de memoria."""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump(self._entries, fh)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("No se pudo guardar la caché de metadatos %s: %s", self.path, e)
+
+    # ===== Acceso =====
+
+    async def _get(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        # Una entrada expirada se sigue sirviendo: la refresca el bucle de fondo.
+        entry = self._entries.get(key)
+        if entry is not None and entry["value"] is not None:
+            return entry["value"]
+        return await self._fetch(key, fetch)
+
+    async def _fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except LeaderCancelled:
+                # Quien consultaba fue cancelado: se repite por cuenta propia
+                return await self._fetch(key, fetch)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            future.set_exception(LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()
+            raise
+        else:
+            # Los que esperan reciben el valor aunque falle el guardado en disco
+            future.set_result(value)
+            # Un "no encontrado" no se guarda: la siguiente llamada vuelve a consultar
+            if value is not None:
+                self._entries[key] = {"fetched_at": time.time(), "value": value}
+                self._save()
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def _fetcher(self, key: str) -> Optional[Callable[[], Awaitable[Any]]]:
+        if key == GIT_NAMESPACE_KEY:
+            return self._fetch_git_namespace
+        if key.startswith("policytypes:"):
+            project = key.split(":", 1)[1]
+            return lambda: self._fetch_policy_types(project)
+        return None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            now = time.time()
+            for key, entry in list(self._entries.items()):
+                fetch = self._fetcher(key)
+                if fetch is None or now - entry["fetched_at"] < self.ttl:
+                    continue
+                try:
+                    await self._fetch(key, fetch)
+                except Exception as e:
+                    logger.warning("No se pudo refrescar el metadato '%s': %s", key, e)
+            await asyncio.sleep(self.refresh_interval)
+
+    # ===== Security namespaces =====
+
+    async def _fetch_git_namespace(self) -> Optional[dict]:
+        url = f"{get_base_url()}/_apis/securitynamespaces?api-version={AZURE_DEVOPS_API_VERSION}"
+        response = await self.client.get(url, headers={"Authorization": get_auth_header()})
+        response.raise_for_status()
+
+        namespace = next(
+            (n for n in response.json().get("value", []) if n["displayName"] == "Git Repositories"),
+            None
+        )
+        if namespace is None:
+            return None
+
+        # Solo se persiste lo necesario, no el catálogo completo
+        return {
+            "namespaceId": namespace["namespaceId"],
+            "actions": [
+                {"name": a.get("name"), "displayName": a["displayName"], "bit": a["bit"]}
+                for a in namespace.get("actions", [])
+            ],
+        }
+
+    async def git_repositories_namespace(self) -> Optional[dict]:
+        """Retorna ``{"namespaceId", "actions"}`` del namespace 'Git Repositories'."""
+        return await self._get(GIT_NAMESPACE_KEY, self._fetch_git_namespace)
+
+    async def git_permission_bit(self, display_name: str) -> tuple[Optional[str], Optional[int]]:
+        """Retorna ``(namespace_id, bit)`` de un permiso de Git Repositories."""
+        namespace = await self.git_repositories_namespace()
+        if namespace is None:
+            return None, None
+        bit = next(
+            (a["bit"] for a in namespace["actions"] if a["displayName"] == display_name),
+            None
+        )
+        return namespace["namespaceId"], bit
+
+    # ===== Tipos de política =====
+
+    async def _fetch_policy_types(self, project: str) -> list[dict]:
+        url = f"{get_base_url()}/{project}/_apis/policy/types?api-version={AZURE_DEVOPS_API_VERSION}"
+        response = await self.client.get(url, headers={"Authorization": get_auth_header()})
+        response.raise_for_status()
+        return [
+            {"id": t["id"], "displayName": t["displayName"]}
+            for t in response.json().get("value", [])
+        ]
+
+    async def policy_type_id(self, project: str, display_name: str) -> Optional[str]:
+        """Retorna el ID del tipo de política con el nombre indicado."""
+        key = f"policytypes:{project.lower()}"
+        policy_types = await self._get(key, lambda: self._fetch_policy_types(project))
+        return next(
+            (t["id"] for t in policy_types if t["displayName"] == display_name),
+            None
+        )
@@ -0,0 +1,328 @@
+"""
+Métricas del servidor en formato de exposición de Prometheus.
+
+Implementación mínima sin dependencias: contadores e histogramas guardados
+en diccionarios indexados por la tupla de etiquetas. Registrar un valor es
+una búsqueda en el diccionario y, en los histogramas, una bisección sobre
+los límites de los buckets; los acumulados, la suma de buckets y el texto
+solo se calculan al servir ``/metrics``.
+
+Los valores que ya mantienen otros componentes (reintentos, caché de
+respuestas, límite adaptativo, pool de conexiones) no se duplican: se leen
+al exportar mediante callbacks (``collect_client``).
+
+Métricas de las tools (``MetricsMiddleware`` en ``core.middleware``):
+
+- ``mcp_tool_calls_total{tool,outcome}`` con outcome ``ok``, ``error`` o ``timeout``
+- ``mcp_tool_duration_seconds{tool}``
+- ``mcp_tools_in_flight``
+- ``mcp_tool_errors_total{tool,status}``: llamadas con error por el último
+  código HTTP de error recibido de Azure DevOps (``none`` si no lo hubo)
+
+Peticiones a Azure DevOps (``AzureDevOpsClient``), por plantilla de endpoint
+(``/{org}/{project}/_apis/build/builds/{id}``):
+
+- ``azure_devops_requests_total{method,endpoint,status}``
+- ``azure_devops_request_duration_seconds{method,endpoint}``
+"""
+
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from bisect import bisect_left as _bisect
+from typing import Callable, Iterable, Iterator, Optional
+
+_perf_counter = time.perf_counter
+
+# Límites (segundos) de los buckets de latencia
+TOOL_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+UPSTREAM_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Segmentos variables de una ruta: números, GUIDs y descriptores de identidad
+_ID_SEGMENT = re.compile(
+    r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[a-z]{3,5}\.[A-Za-z0-9_=-]{8,})$"
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Contador monótono con etiquetas."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    """Valor que sube y baja."""
+
+    kind = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, labels: tuple, value: float) -> None:
+        self._values[labels] = value
+
+
+class Histogram:
+    """Histograma de latencias con buckets fijos."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = UPSTREAM_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.bounds = tuple(sorted(buckets))
+        # etiquetas -> [cuenta por bucket..., cuenta +Inf, suma]
+        self._series: dict[tuple, list] = {}
+
+    def series(self, labels: tuple) -> list:
+        """Lista mutable de la serie (se puede guardar para registrar sin buscarla)."""
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.bounds) + 2)
+        return series
+
+    def observe(self, labels: tuple, value: float) -> None:
+        series = self._series.get(labels) or self.series(labels)
+        series[_bisect(self.bounds, value)] += 1
+        series[-1] += value
+
+    def samples(self) -> Iterable[str]:
+        for labels, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip((*self.bounds, float("inf")), series):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {_number(series[-1])}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}"
+
+
+class _Callback:
+    """Métrica cuyo valor se lee al exportar: ``fn()`` -> [(etiquetas, valor)]."""
+
+    def __init__(self, kind: str, name: str, help: str, labels: tuple,
+                 fn: Callable[[], Iterable[tuple[tuple, float]]]) -> None:
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.fn = fn
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.fn():
+            yield f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, object] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: tuple = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: tuple = ()) -> Gauge:
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: tuple = (), buckets: tuple = UPSTREAM_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def callback(self, kind: str, name: str, help: str, fn, labels: tuple = ()) -> None:
+        self.register(_Callback(kind, name, help, labels, fn))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+TOOL_CALLS = REGISTRY.counter("mcp_tool_calls_total", "Llamadas a tools por resultado", ("tool", "outcome"))
+TOOL_DURATION = REGISTRY.histogram(
+    "mcp_tool_duration_seconds", "Duración de las llamadas a tools", ("tool",), TOOL_BUCKETS
+)
+TOOLS_IN_FLIGHT = REGISTRY.gauge("mcp_tools_in_flight", "Llamadas a tools en curso")
+TOOL_ERRORS = REGISTRY.counter(
+    "mcp_tool_errors_total",
+    "Llamadas a tools con error por último código HTTP de error de Azure DevOps",
+    ("tool", "status"),
+)
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "azure_devops_requests_total",
+    "Peticiones a Azure DevOps por endpoint y código de estado (error = fallo de transporte)",
+    ("method", "endpoint", "status"),
+)
+UPSTREAM_DURATION = REGISTRY.histogram(
+    "azure_devops_request_duration_seconds",
+    "Duración de las peticiones a Azure DevOps (cada intento por separado)",
+    ("method", "endpoint"),
+)
+
+
+# Último código de error de Azure DevOps de la tool en curso: [estado]
+_tool_status: ContextVar[Optional[list]] = ContextVar("azure_devops_tool_status", default=None)
+
+
+@contextmanager
+def tool_status() -> Iterator[list]:
+    """Registra el último error HTTP de la llamada actual en ``[estado]``."""
+    cell = [None]
+    token = _tool_status.set(cell)
+    try:
+        yield cell
+    finally:
+        _tool_status.reset(token)
+
+
+def endpoint_template(path: str) -> str:
+    """
+    Plantilla de baja cardinalidad de una ruta de la API:
+    ``/acme/Web/_apis/build/builds/42/logs/3`` -> ``/{org}/{project}/_apis/build/builds/{id}/logs/{id}``.
+    """
+    segments = path.strip("/").split("/")
+    try:
+        apis = segments.index("_apis")
+    except ValueError:
+        apis = len(segments)
+    prefix = ["{org}", "{project}"][:apis] + ["{scope}"] * max(apis - 2, 0)
+    rest = ["{id}" if _ID_SEGMENT.match(s) else s for s in segments[apis:]]
+    return "/" + "/".join(prefix + rest)
+
+
+# (método, URL sin query, estado) -> (serie del histograma, etiquetas del
+# contador); se vacía al llenarse
+_upstream_series: dict[tuple, tuple[list, tuple]] = {}
+_UPSTREAM_SERIES_MAX = 4096
+_UPSTREAM_BOUNDS = UPSTREAM_DURATION.bounds
+_upstream_counts = UPSTREAM_REQUESTS._values
+
+
+def _upstream_slot(key: tuple) -> tuple[list, tuple]:
+    if len(_upstream_series) >= _UPSTREAM_SERIES_MAX:
+        _upstream_series.clear()
+    method, url, status = key
+    # "https://host/ruta" -> "ruta"
+    labels = (method, endpoint_template(url.split("/", 3)[-1]))
+    slot = _upstream_series[key] = (UPSTREAM_DURATION.series(labels), (*labels, status))
+    return slot
+
+
+def observe_upstream(method: str, url: str, status, started: float) -> None:
+    """
+    Registra un intento de petición a Azure DevOps iniciado en ``started``
+    (``perf_counter``). ``status`` es el código HTTP o ``"error"``; ``url``
+    puede ser ``str`` o ``httpx.URL``.
+
+    Es el camino caliente: una búsqueda en caché lleva directamente a la
+    serie del histograma y a las etiquetas del contador.
+    """
+    elapsed = _perf_counter() - started
+    if url.__class__ is not str:
+        url = str(url)  # httpx.URL
+    key = (method, url.partition("?")[0], status)
+    series, counter = _upstream_series.get(key) or _upstream_slot(key)
+    series[_bisect(_UPSTREAM_BOUNDS, elapsed)] += 1
+    series[-1] += elapsed
+    _upstream_counts[counter] = _upstream_counts.get(counter, 0) + 1
+    if status.__class__ is str or status >= 400:
+        cell = _tool_status.get()
+        if cell is not None:
+            cell[0] = status
+
+
+def collect_client(client) -> None:
+    """Expone los contadores que ya mantienen el cliente HTTP y sus componentes."""
+    REGISTRY.callback(
+        "counter", "azure_devops_retries_total", "Reintentos de peticiones a Azure DevOps",
+        lambda: [((), client.retries)],
+    )
+    REGISTRY.callback(
+        "counter", "azure_devops_coalesced_total", "GETs atendidos por una petición idéntica en curso",
+        lambda: [((), client.coalesced)],
+    )
+    REGISTRY.callback(
+        "counter", "azure_devops_throttled_total", "Respuestas 429/503 recibidas",
+        lambda: [((), client.limiter.throttled)],
+    )
+    REGISTRY.callback(
+        "gauge", "azure_devops_requests_in_flight", "Peticiones a Azure DevOps en curso",
+        lambda: [((), client.limiter.in_flight)],
+    )
+    REGISTRY.callback(
+        "gauge", "azure_devops_concurrency_limit", "Límite adaptativo de peticiones simultáneas",
+        lambda: [((), client.limiter.limit)],
+    )
+    REGISTRY.callback(
+        "gauge", "azure_devops_pool_connections", "Conexiones del pool HTTP por estado",
+        lambda: [((state,), count) for state, count in client.pool_stats().items()],
+        labels=("state",),
+    )
+    REGISTRY.callback(
+        "gauge", "azure_devops_pool_max_connections", "Máximo de conexiones del pool HTTP",
+        lambda: [((), client.limits.max_connections)],
+    )
+    if client.cache is not None:
+        cache = client.cache
+        REGISTRY.callback(
+            "counter", "azure_devops_cache_requests_total", "GETs con política de caché por resultado",
+            lambda: [
+                (("hit",), cache.hits), (("revalidated",), cache.revalidated), (("miss",), cache.misses)
+            ],
+            labels=("result",),
+        )
+        REGISTRY.callback(
+            "gauge", "azure_devops_cache_hit_ratio",
+            "Proporción de GETs con política servidos sin descargar el cuerpo (frescos o 304)",
+            lambda: [((), (cache.hits + cache.revalidated) / max(cache.hits + cache.revalidated + cache.misses, 1))],
+        )
+        REGISTRY.callback(
+            "gauge", "azure_devops_cache_bytes", "Bytes ocupados por la caché de respuestas",
+            lambda: [((), cache.bytes)],
+        )
+        REGISTRY.callback(
+            "gauge", "azure_devops_cache_entries", "Entradas en la caché de respuestas",
+            lambda: [((), cache.stats()["entries"])],
+        )
+        REGISTRY.callback(
+            "counter", "azure_devops_cache_evictions_total", "Entradas expulsadas de la caché por tamaño",
+            lambda: [((), cache.evictions)],
+        )
@@ -0,0 +1,147 @@
+"""
+Middleware FastMCP comunes a todas las tools.
+
+``DeadlineMiddleware`` aplica el plazo total de cada llamada (ver
+``core.deadlines``). Al vencer, cancela la tool, y con ella las peticiones
+a Azure DevOps que tuviera en curso, y responde con un timeout
+estructurado que indica el paso lento en lugar de dejar la petición MCP
+abierta indefinidamente.
+
+``MetricsMiddleware`` registra cuántas llamadas hay en curso, su duración
+y su resultado (ver ``core.metrics``), y ``TracingMiddleware`` abre el
+span raíz de las llamadas muestreadas (ver ``core.tracing``). Ambos deben
+añadirse antes que ``DeadlineMiddleware`` para incluir los timeouts.
+"""
+
+import asyncio
+import logging
+import time
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+from mcp.types import TextContent
+
+from core import deadlines, metrics, tracing
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineMiddleware(Middleware):
+    """Cancela las tools que superan su plazo y retorna un timeout estructurado."""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        tool = context.message.name
+        budget = deadlines.budget_for(tool, context.message.arguments or {})
+        if budget is None:
+            return await call_next(context)
+
+        deadline = deadlines.Deadline(tool, budget)
+        token = deadlines.activate(deadline)
+        try:
+            async with asyncio.timeout(budget) as scope:
+                return await call_next(context)
+        except TimeoutError:
+            if not scope.expired():
+                raise
+            return await self._timeout_result(context, deadline)
+        finally:
+            deadlines.reset(token)
+
+    async def _timeout_result(self, context: MiddlewareContext, deadline: deadlines.Deadline) -> ToolResult:
+        slow = deadline.slow_step()
+        timeout = {
+            "error": "timeout",
+            "tool": deadline.tool,
+            "deadline_seconds": deadline.budget,
+            "elapsed_seconds": round(deadline.elapsed, 2),
+            **slow,
+        }
+        logger.warning("Tool %s superó su plazo de %ss: %s", deadline.tool, deadline.budget, slow)
+
+        step = slow["step"]
+        if slow["phase"] and slow["phase"] != step:
+            step = f"{slow['phase']} ({step})"
+        duration = f" tras {slow['seconds']} s" if slow["seconds"] is not None else ""
+        state = "seguía en curso" if slow["in_flight"] else "fue el último paso completado"
+        text = (
+            f"⏱️ {deadline.tool} superó su plazo de {deadline.budget:g} s y se canceló.\n"
+            f"Paso lento: {step}{duration} ({state})."
+        )
+
+        # El contenido estructurado debe respetar el output schema de la tool:
+        # las que retornan texto lo envuelven en {"result": ...}; el detalle
+        # del timeout va siempre en ``_meta``
+        structured = timeout
+        if context.fastmcp_context is not None:
+            tool = await context.fastmcp_context.fastmcp.get_tool(deadline.tool)
+            schema = tool.output_schema or {}
+            if schema.get("x-fastmcp-wrap-result"):
+                structured = {"result": text}
+            elif not schema:
+                structured = None
+        return ToolResult(
+            content=[TextContent(type="text", text=text)],
+            structured_content=structured,
+            meta={"timeout": timeout},
+        )
+
+
+def _outcome(result) -> str:
+    """``ok``, ``error`` (mensaje "❌ ...") o ``timeout``."""
+    if isinstance(result, ToolResult):
+        if result.meta and "timeout" in result.meta:
+            return "timeout"
+        content = result.content
+        if content and isinstance(content[0], TextContent) and content[0].text.startswith("❌"):
+            return "error"
+    return "ok"
+
+
+class MetricsMiddleware(Middleware):
+    """Cuenta las llamadas a tools por resultado y mide su duración."""
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        tool = context.message.name
+        metrics.TOOLS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        outcome = "error"
+        with metrics.tool_status() as status:
+            try:
+                result = await call_next(context)
+                outcome = _outcome(result)
+                return result
+            finally:
+                metrics.TOOL_DURATION.observe((tool,), time.perf_counter() - started)
+                metrics.TOOL_CALLS.inc((tool, outcome))
+                if outcome == "error":
+                    metrics.TOOL_ERRORS.inc((tool, status[0] or "none"))
+                metrics.TOOLS_IN_FLIGHT.dec()
+
+
+class TracingMiddleware(Middleware):
+    """Traza las llamadas muestreadas: span raíz de la tool y, dentro, sus peticiones."""
+
+    def __init__(self, tracer: tracing.Tracer) -> None:
+        self.tracer = tracer
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        tool = context.message.name
+        root = self.tracer.start_trace(f"tools/call {tool}", {"mcp.tool.name": tool})
+        if root is None:
+            return await call_next(context)
+
+        token = tracing.activate(root)
+        outcome, error = "error", None
+        try:
+            result = await call_next(context)
+            outcome = _outcome(result)
+            if outcome != "ok":
+                error = result.content[0].text.splitlines()[0]
+            return result
+        except BaseException as e:
+            error = str(e) or type(e).__name__
+            raise
+        finally:
+            tracing.reset(token)
+            root.attributes["mcp.tool.outcome"] = outcome
+            self.tracer.finish_trace(root, error)
@@ -0,0 +1,472 @@
+"""
+Espejo local de work items en SQLite.
+
+Sincroniza de forma incremental los work items de los proyectos
+configurados en ``AZURE_DEVOPS_MIRROR_PROJECTS`` usando ``System.ChangedDate``
+como marca de agua, en segundo plano cada ``MIRROR_SYNC_INTERVAL`` segundos.
+Mientras la última sincronización de un proyecto tenga menos de
+``MIRROR_MAX_AGE`` segundos, ``get_work_items`` responde desde los índices
+locales sin llamar a Azure DevOps.
+
+Si SQLite incluye FTS5, títulos, descripciones y etiquetas se indexan
+además en ``work_items_fts`` (mantenido por triggers en cada sincronización)
+para la búsqueda de texto completo de ``search_work_items``.
+
+Los work items eliminados o movidos a otro proyecto no se detectan con la
+marca de agua y permanecen en el espejo hasta que se borra la base.
+"""
+
+import asyncio
+import html
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from azure_devops_config import (
+    MIRROR_PROJECTS,
+    MIRROR_DB_PATH,
+    MIRROR_SYNC_INTERVAL,
+    MIRROR_MAX_AGE,
+)
+from core.http_client import AzureDevOpsClient
+from core.wiql import WiqlQuery, run_wiql
+from core.work_items import fetch_work_items
+
+logger = logging.getLogger(__name__)
+
+# IDs por consulta WIQL durante la sincronización (la API admite hasta 20000)
+SYNC_BATCH_SIZE = 5000
+
+MIRROR_FIELDS = [
+    "System.Id",
+    "System.WorkItemType",
+    "System.Title",
+    "System.State",
+    "System.AssignedTo",
+    "System.AreaPath",
+    "System.IterationPath",
+    "System.Tags",
+    "System.Description",
+    "System.ChangedDate",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS work_items (
+    id INTEGER PRIMARY KEY,
+    project TEXT NOT NULL,
+    type TEXT,
+    title TEXT,
+    state TEXT,
+    assigned_to TEXT,
+    assigned_to_email TEXT,
+    area_path TEXT,
+    iteration_path TEXT,
+    tags TEXT,
+    description TEXT,
+    description_text TEXT,
+    changed_date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_work_items_changed ON work_items (project, changed_date DESC);
+CREATE INDEX IF NOT EXISTS ix_work_items_state ON work_items (project, state, changed_date DESC);
+CREATE INDEX IF NOT EXISTS ix_work_items_type ON work_items (project, type, changed_date DESC);
+CREATE INDEX IF NOT EXISTS ix_work_items_assigned ON work_items (project, assigned_to_email);
+CREATE TABLE IF NOT EXISTS sync_state (
+    project TEXT PRIMARY KEY,
+    watermark TEXT,
+    synced_at REAL
+);
+"""
+
+# Índice de texto completo con contenido externo: los triggers lo mantienen
+# al día con cada inserción/actualización de work_items.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS work_items_fts USING fts5(
+    title, description_text, tags,
+    content='work_items', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS work_items_fts_ai AFTER INSERT ON work_items BEGIN
+    INSERT INTO work_items_fts (rowid, title, description_text, tags)
+    VALUES (new.id, new.title, new.description_text, new.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS work_items_fts_ad AFTER DELETE ON work_items BEGIN
+    INSERT INTO work_items_fts (work_items_fts, rowid, title, description_text, tags)
+    VALUES ('delete', old.id, old.title, old.description_text, old.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS work_items_fts_au AFTER UPDATE ON work_items BEGIN
+    INSERT INTO work_items_fts (work_items_fts, rowid, title, description_text, tags)
+    VALUES ('delete', old.id, old.title, old.description_text, old.tags);
+    INSERT INTO work_items_fts (rowid, title, description_text, tags)
+    VALUES (new.id, new.title, new.description_text, new.tags);
+END;
+"""
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _html_to_text(value: Optional[str]) -> Optional[str]:
+    """Las descripciones son HTML: se indexa solo el texto."""
+    if not value:
+        return value
+    return " ".join(html.unescape(_TAG_RE.sub(" ", value)).split())
+
+
+def _fts_query(text: str) -> Optional[str]:
+    """
+    Convierte texto libre en una consulta FTS5 segura: cada palabra entre
+    comillas (sin operadores) y la última como prefijo.
+    """
+    terms = _TERM_RE.findall(text)
+    if not terms:
+        return None
+    quoted = [f'"{t}"' for t in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _row_from_item(project: str, item: dict) -> tuple:
+    fields = item.get("fields", {})
+    assigned = fields.get("System.AssignedTo") or {}
+    return (
+        item["id"],
+        project,
+        fields.get("System.WorkItemType"),
+        fields.get("System.Title"),
+        fields.get("System.State"),
+        assigned.get("displayName"),
+        (assigned.get("uniqueName") or "").lower() or None,
+        fields.get("System.AreaPath"),
+        fields.get("System.IterationPath"),
+        fields.get("System.Tags"),
+        fields.get("System.Description"),
+        _html_to_text(fields.get("System.Description")),
+        fields.get("System.ChangedDate"),
+    )
+
+
+def _item_from_row(row: sqlite3.Row) -> dict:
+    # Misma forma que los work items de la API para reutilizar el formateo
+    fields = {
+        "System.WorkItemType": row["type"],
+        "System.Title": row["title"],
+        "System.State": row["state"],
+        "System.AreaPath": row["area_path"],
+        "System.IterationPath": row["iteration_path"],
+        "System.Tags": row["tags"],
+        "System.ChangedDate": row["changed_date"],
+    }
+    fields = {name: value for name, value in fields.items() if value is not None}
+    if row["assigned_to"]:
+        fields["System.AssignedTo"] = {
+            "displayName": row["assigned_to"],
+            "uniqueName": row["assigned_to_email"],
+        }
+    return {"id": row["id"], "fields": fields}
+
+
+class WorkItemMirror:
+    """Espejo SQLite de work items con sincronización incremental."""
+
+    def __init__(
+        self,
+        client: AzureDevOpsClient,
+        projects: list[str] = MIRROR_PROJECTS,
+        db_path: str = MIRROR_DB_PATH,
+        sync_interval: float = MIRROR_SYNC_INTERVAL,
+        max_age: float = MIRROR_MAX_AGE,
+    ) -> None:
+        self.client = client
+        self.projects = {p.lower(): p for p in projects}
+        self.db_path = db_path
+        self.sync_interval = sync_interval
+        self.max_age = max_age
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._sync_locks: dict[str, asyncio.Lock] = {}
+        self._sync_task: Optional[asyncio.Task] = None
+        self.search_available = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.projects)
+
+    async def __aenter__(self) -> "WorkItemMirror":
+        if self.enabled:
+            self._open()
+            self._sync_task = asyncio.create_task(self._sync_loop())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    # ===== Base de datos =====
+
+    def _open(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            db = sqlite3.connect(self.db_path, check_same_thread=False)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+            self._migrate(db)
+            self._db = db
+        return self._db
+
+    def _migrate(self, db: sqlite3.Connection) -> None:
+        columns = {row["name"] for row in db.execute("PRAGMA table_info(work_items)")}
+        if "description_text" not in columns:
+            db.execute("ALTER TABLE work_items ADD COLUMN description_text TEXT")
+
+        fts_exists = db.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'work_items_fts'"
+        ).fetchone() is not None
+        try:
+            db.executescript(FTS_SCHEMA)
+        except sqlite3.OperationalError as e:
+            # SQLite compilado sin FTS5: el espejo funciona sin búsqueda
+            logger.warning("Búsqueda de texto completo no disponible: %s", e)
+            return
+        if not fts_exists:
+            # Indexa las filas sincronizadas antes de existir el índice
+            db.executemany(
+                "UPDATE work_items SET description_text = ? WHERE id = ?",
+                [
+                    (_html_to_text(row["description"]), row["id"])
+                    for row in db.execute("SELECT id, description FROM work_items WHERE description IS NOT NULL")
+                ],
+            )
+            db.execute("INSERT INTO work_items_fts (work_items_fts) VALUES ('rebuild')")
+            db.commit()
+        self.search_available = True
+
+    async def _run(self, fn, *args):
+        """Ejecuta una operación SQLite en un hilo, serializada por el lock."""
+        def call():
+            with self._db_lock:
+                return fn(self._open(), *args)
+        return await asyncio.to_thread(call)
+
+    # ===== Sincronización =====
+
+    async def _sync_loop(self) -> None:
+        while True:
+            for project in self.projects.values():
+                try:
+                    await self.sync(project)
+                except Exception as e:
+                    logger.warning("Fallo al sincronizar el espejo de '%s': %s", project, e)
+            await asyncio.sleep(self.sync_interval)
+
+    async def sync(self, project: str) -> int:
+        """
+        Trae los work items modificados desde la última marca de agua.
+
+        Retorna el número de work items actualizados.
+        """
+        key = project.lower()
+        lock = self._sync_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            state = await self._run(_get_sync_state, key)
+            watermark = state["watermark"] if state else None
+            started_at = time.time()
+            updated = 0
+            # Último id leído mientras se paginan empates en la marca de agua
+            tie_id = None
+            inclusive = True
+
+            while True:
+                query = WiqlQuery().project(project)
+                if tie_id is not None:
+                    query.changed_at(watermark).where("System.Id", ">", tie_id)
+                    query.order_by("System.Id")
+                else:
+                    if watermark:
+                        query.changed_since(watermark, inclusive)
+                    query.order_by("System.ChangedDate").order_by("System.Id")
+
+                ids = await run_wiql(self.client, project, query, top=SYNC_BATCH_SIZE)
+                items = await fetch_work_items(self.client, project, ids, fields=MIRROR_FIELDS)
+                rows = [_row_from_item(key, item) for item in items]
+                if rows:
+                    await self._run(_upsert_rows, rows)
+                    updated += len(rows)
+
+                if tie_id is not None:
+                    if len(ids) < SYNC_BATCH_SIZE:
+                        # Empates agotados: se sigue con lo posterior a la marca de agua
+                        tie_id = None
+                        inclusive = False
+                    else:
+                        tie_id = max(ids)
+                    continue
+
+                last_changed = max((r[-1] for r in rows if r[-1]), default=watermark)
+                # Un lote incompleto indica que no quedan más cambios
+                if len(ids) < SYNC_BATCH_SIZE:
+                    watermark = last_changed
+                    break
+                if last_changed == watermark:
+                    # Lote completo con la misma fecha: se paginan los empates por
+                    # id en lugar de repetir el mismo lote
+                    tie_id = max(ids)
+                    continue
+                watermark = last_changed
+                inclusive = True
+
+            await self._run(_set_sync_state, key, watermark, started_at)
+            return updated
+
+    async def age(self, project: str) -> Optional[float]:
+        """Segundos desde la última sincronización, o ``None`` si nunca se hizo."""
+        if project.lower() not in self.projects:
+            return None
+        state = await self._run(_get_sync_state, project.lower())
+        if not state or state["synced_at"] is None:
+            return None
+        return time.time() - state["synced_at"]
+
+    async def fresh_age(self, project: str) -> Optional[float]:
+        """Retorna la antigüedad del espejo si es utilizable, si no ``None``."""
+        if not self.enabled:
+            return None
+        age = await self.age(project)
+        if age is None or age > self.max_age:
+            return None
+        return age
+
+    # ===== Consultas =====
+
+    async def query(
+        self,
+        project: str,
+        work_item_type: Optional[str] = None,
+        state: Optional[str] = None,
+        assigned_to: Optional[str] = None,
+        area_path: Optional[str] = None,
+        iteration_path: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+        changed_since: Optional[str] = None,
+        limit: int = 50,
+    ) -> list[dict]:
+        """Filtra work items en el espejo, del más al menos recientemente modificado."""
+        sql = ["SELECT * FROM work_items WHERE project = ?"]
+        params: list = [project.lower()]
+
+        if work_item_type:
+            sql.append("AND type = ? COLLATE NOCASE")
+            params.append(work_item_type)
+        if state:
+            sql.append("AND state = ? COLLATE NOCASE")
+            params.append(state)
+        if assigned_to:
+            sql.append("AND (assigned_to_email = ? OR assigned_to = ? COLLATE NOCASE)")
+            params.extend([assigned_to.lower(), assigned_to])
+        for column, path in (("area_path", area_path), ("iteration_path", iteration_path)):
+            if path:
+                # Equivalente a UNDER: la ruta exacta o cualquier sub-ruta
+                sql.append(f"AND ({column} = ? COLLATE NOCASE OR {column} LIKE ? ESCAPE '!')")
+                escaped = path.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+                params.extend([path, escaped + "\\%"])
+        for tag in tags or []:
+            # Azure DevOps guarda las etiquetas como "a; b; c"
+            sql.append("AND ('; ' || tags || ';') LIKE ? ESCAPE '!'")
+            escaped = tag.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+            params.append(f"%; {escaped};%")
+        if changed_since:
+            sql.append("AND changed_date >= ?")
+            params.append(changed_since)
+
+        sql.append("ORDER BY changed_date DESC LIMIT ?")
+        params.append(limit)
+
+        rows = await self._run(_select, " ".join(sql), params)
+        return [_item_from_row(row) for row in rows]
+
+    async def search(
+        self,
+        text: str,
+        project: Optional[str] = None,
+        limit: int = 20,
+    ) -> list[dict]:
+        """
+        Búsqueda de texto completo sobre título, descripción y etiquetas.
+
+        Retorna work items ordenados por relevancia (BM25, con más peso para
+        el título y las etiquetas), cada uno con un fragmento de contexto.
+        """
+        match = _fts_query(text)
+        if match is None:
+            return []
+
+        sql = [
+            "SELECT w.*, snippet(work_items_fts, 1, '[', ']', '…', 12) AS snippet,",
+            "bm25(work_items_fts, 10.0, 1.0, 5.0) AS score",
+            "FROM work_items_fts JOIN work_items w ON w.id = work_items_fts.rowid",
+            "WHERE work_items_fts MATCH ?",
+        ]
+        params: list = [match]
+        if project:
+            sql.append("AND w.project = ?")
+            params.append(project.lower())
+        sql.append("ORDER BY score LIMIT ?")
+        params.append(limit)
+
+        rows = await self._run(_select, " ".join(sql), params)
+        results = []
+        for row in rows:
+            item = _item_from_row(row)
+            item["project"] = row["project"]
+            item["snippet"] = row["snippet"]
+            results.append(item)
+        return results
+
+
+def _get_sync_state(db: sqlite3.Connection, project: str) -> Optional[sqlite3.Row]:
+    return db.execute(
+        "SELECT watermark, synced_at FROM sync_state WHERE project = ?", (project,)
+    ).fetchone()
+
+
+def _set_sync_state(db: sqlite3.Connection, project: str, watermark: Optional[str], synced_at: float) -> None:
+    with db:
+        db.execute(
+            "INSERT INTO sync_state (project, watermark, synced_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(project) DO UPDATE SET watermark = excluded.watermark, "
+            "synced_at = excluded.synced_at",
+            (project, watermark, synced_at),
+        )
+
+
+def _upsert_rows(db: sqlite3.Connection, rows: list[tuple]) -> None:
+    with db:
+        db.executemany(
+            "INSERT INTO work_items (id, project, type, title, state, assigned_to, "
+            "assigned_to_email, area_path, iteration_path, tags, description, "
+            "description_text, changed_date) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            # UPSERT (y no REPLACE) para que se disparen los triggers de FTS
+            "ON CONFLICT(id) DO UPDATE SET project = excluded.project, type = excluded.type, "
+            "title = excluded.title, state = excluded.state, assigned_to = excluded.assigned_to, "
+            "assigned_to_email = excluded.assigned_to_email, area_path = excluded.area_path, "
+            "iteration_path = excluded.iteration_path, tags = excluded.tags, "
+            "description = excluded.description, description_text = excluded.description_text, "
+            "changed_date = excluded.changed_date",
+            rows,
+        )
+
+
+def _select(db: sqlite3.Connection, sql: str, params: list) -> list[sqlite3.Row]:
+    return db.execute(sql, params).fetchall()
@@ -0,0 +1,222 @@
+"""
+Formato de salida de las tools.
+
+Las tools construyen su resultado como un dict y lo presentan con
+``render`` según el parámetro ``output_format``:
+
+- ``compact`` (por defecto, recomendado para agentes): JSON sin espacios
+  y sin campos nulos.
+- ``json``: JSON indentado.
+- ``text``: el informe legible con emojis.
+
+``fields`` proyecta cada registro (los dicts de las listas del resultado,
+o el propio resultado si no tiene ninguna lista) a los campos indicados; admite
+rutas con punto (``result.status``). Solo se aplica a los formatos JSON.
+
+Si la salida supera ``OUTPUT_MAX_CHARS`` se recorta: en JSON se descartan
+los últimos registros de la lista más grande y se indica en ``truncated``;
+en texto se cortan las últimas líneas. Los mensajes de error se mantienen
+como texto breve en todos los formatos.
+
+Los listados paginados sin ``page_size`` usan ``OutputBudget`` para dejar
+de pedir páginas cuando ya no caben y retornar un ``next_cursor`` desde el
+que continuar, en lugar de descargarlo todo y recortar el final. Si ya la
+primera página no cabe, retornan los registros que caben y el cursor del
+primero que se queda fuera.
+"""
+
+import json
+from typing import Any, Callable, Literal, Optional
+
+from azure_devops_config import OUTPUT_FORMAT, OUTPUT_MAX_CHARS
+
+OutputFormat = Literal["compact", "json", "text"]
+OUTPUT_FORMATS = ("compact", "json", "text")
+
+
+def _lookup(record: dict, path: str) -> Any:
+    value: Any = record
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def _project_record(record: dict, fields: list[str]) -> dict:
+    projected: dict = {}
+    for path in fields:
+        value = _lookup(record, path)
+        if value is None:
+            continue
+        # Se conserva la estructura anidada: "result.status" -> {"result": {"status": ...}}
+        target = projected
+        *parents, leaf = path.split(".")
+        for key in parents:
+            target = target.setdefault(key, {})
+        target[leaf] = value
+    return projected
+
+
+def project(data: dict, fields: list[str]) -> dict:
+    """
+    Reduce los registros del resultado a ``fields``.
+
+    Toda lista del resultado (aunque esté vacía) se trata como lista de
+    registros y el resto de claves se conserva; solo un resultado sin
+    ninguna lista se proyecta entero.
+    """
+    if not any(isinstance(value, list) for value in data.values()):
+        return _project_record(data, fields)
+    return {
+        key: [_project_record(r, fields) if isinstance(r, dict) else r for r in value]
+        if isinstance(value, list) else value
+        for key, value in data.items()
+    }
+
+
+def _prune(value: Any) -> Any:
+    """Quita recursivamente los campos ``None`` o vacíos (las listas vacías se conservan)."""
+    if isinstance(value, dict):
+        pruned = {k: _prune(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if v is not None and v != "" and v != {}}
+    if isinstance(value, list):
+        return [_prune(v) for v in value]
+    return value
+
+
+def _dump(data: Any, output_format: str) -> str:
+    if output_format == "json":
+        return json.dumps(data, ensure_ascii=False, indent=2, default=str)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+# Margen para las claves del resultado fuera de los registros (cursor, totales)
+_ENVELOPE_CHARS = 256
+
+
+def record_size(record: Any) -> int:
+    """Tamaño aproximado de un registro en la salida compacta."""
+    return len(json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str)) + 1
+
+
+class OutputBudget:
+    """Caracteres de salida que quedan para los registros de un listado."""
+
+    def __init__(self, max_chars: int = OUTPUT_MAX_CHARS) -> None:
+        self.remaining = max_chars
+        self.used = False
+        # Registros iniciales de la primera página que caben, si no cabe entera
+        self.fitting: Optional[int] = None
+
+    def take(self, records: list) -> bool:
+        """
+        Reserva el espacio de ``records``. Retorna ``False`` si no caben
+        (la primera página se acepta siempre y, si no cabe entera, se anota
+        en ``fitting`` cuántos de sus registros caben).
+        """
+        sizes = [record_size(r) for r in records]
+        size = sum(sizes)
+        if self.used and size > self.remaining:
+            return False
+        if not self.used and size > self.remaining:
+            room = self.remaining - _ENVELOPE_CHARS
+            self.fitting = 0
+            for record in sizes:
+                if record > room:
+                    break
+                room -= record
+                self.fitting += 1
+        self.remaining -= size
+        self.used = True
+        return True
+
+    @property
+    def overflowed(self) -> bool:
+        """La primera página ya no cabía: el listado debe retornar sus
+        ``fitting`` primeros registros y continuar desde el siguiente."""
+        return self.remaining < 0
+
+
+_TRUNCATED_HINT = "salida recortada: usa page_size y cursor, filtros o fields para obtener el resto"
+
+
+def _truncated(key: str, returned: int, total: int) -> dict:
+    return {key: {"returned": returned, "total": total}, "hint": _TRUNCATED_HINT}
+
+
+def _truncate_json(data: dict, output_format: str, max_chars: int) -> str:
+    text = _dump(data, output_format)
+    if len(text) <= max_chars:
+        return text
+
+    lists = [key for key, value in data.items() if isinstance(value, list) and value]
+    if lists:
+        key = max(lists, key=lambda k: len(_dump(data[k], output_format)))
+        items = data[key]
+        # Búsqueda binaria del máximo de registros que caben
+        low, high = 0, len(items)
+        while low < high:
+            mid = (low + high + 1) // 2
+            candidate = {**data, key: items[:mid], "truncated": _truncated(key, mid, len(items))}
+            if len(_dump(candidate, output_format)) <= max_chars:
+                low = mid
+            else:
+                high = mid - 1
+        candidate = {**data, key: items[:low], "truncated": _truncated(key, low, len(items))}
+        text = _dump(candidate, output_format)
+        if len(text) <= max_chars:
+            return text
+
+    # Sin listas que recortar (o ni vacías caben): se entrega un extracto
+    return _dump({"truncated": {"chars": len(text)}, "preview": text[: max_chars // 2]}, output_format)
+
+
+def _truncate_text(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    lines = text.splitlines()
+    kept, size = [], 0
+    for line in lines:
+        if size + len(line) + 1 > max_chars:
+            break
+        kept.append(line)
+        size += len(line) + 1
+    omitted = len(text) - size
+    kept.append(f"… (salida truncada: {omitted} caracteres omitidos; usa filtros, fields o paginación)")
+    return "\n".join(kept)
+
+
+def check_format(output_format: Optional[str]) -> Optional[str]:
+    """Mensaje de error si ``output_format`` no es válido, o ``None``."""
+    if output_format is not None and output_format.lower() not in OUTPUT_FORMATS:
+        return f"❌ output_format no soportado: '{output_format}'. Usa compact, json o text."
+    return None
+
+
+def render(
+    data: dict,
+    text: Callable[[dict], str],
+    output_format: Optional[str] = None,
+    fields: Optional[list[str]] = None,
+    max_chars: int = OUTPUT_MAX_CHARS,
+) -> str:
+    """
+    Presenta ``data`` en el formato pedido (``OUTPUT_FORMAT`` si se omite).
+
+    ``text`` construye el informe legible a partir de ``data`` y solo se
+    invoca en formato ``text``.
+    """
+    error = check_format(output_format)
+    if error:
+        return error
+    output_format = (output_format or OUTPUT_FORMAT).lower()
+
+    if output_format == "text":
+        return _truncate_text(text(data), max_chars)
+
+    if fields:
+        data = project(data, fields)
+    if output_format == "compact":
+        data = _prune(data)
+    return _truncate_json(data, output_format, max_chars)
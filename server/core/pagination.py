@@ -0,0 +1,95 @@
+"""
+Paginación por continuation token de las APIs de listado de Azure DevOps.
+
+Azure DevOps pagina con ``$top`` y devuelve el token de la página siguiente
+en la cabecera ``x-ms-continuationtoken``; se envía de vuelta como
+``continuationToken``. Los endpoints que no paginan simplemente devuelven
+todo en una única página sin token.
+"""
+
+import contextlib
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from core.http_client import AzureDevOpsClient
+
+# Tamaño de página usado al recorrer un listado completo
+DEFAULT_PAGE_SIZE = 500
+
+
+@dataclass
+class Page:
+    items: list[dict]
+    continuation_token: Optional[str]
+
+
+async def iter_pages(
+    client: AzureDevOpsClient,
+    url: str,
+    headers: dict,
+    page_size: Optional[int] = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> AsyncIterator[Page]:
+    """
+    Recorre las páginas de un listado hasta agotarlo.
+
+    Cada página se entrega en cuanto llega, sin acumular las anteriores.
+    El llamador puede detenerse tras la primera si solo quiere una página.
+    """
+    # httpx reemplaza la query de la URL cuando se pasa ``params``: se
+    # conservan sus parámetros (p. ej. api-version) y se añaden los de paginación
+    url = httpx.URL(url)
+    base_params = dict(url.params)
+    url = url.copy_with(query=None)
+
+    while True:
+        params = dict(base_params)
+        if page_size:
+            params["$top"] = page_size
+        if cursor:
+            params["continuationToken"] = cursor
+
+        response = await client.get(url, headers=headers, params=params)
+        response.raise_for_status()
+
+        cursor = response.headers.get("x-ms-continuationtoken") or None
+        yield Page(response.json().get("value", []), cursor)
+
+        if not cursor:
+            return
+
+
+async def iter_items(
+    client: AzureDevOpsClient,
+    url: str,
+    headers: dict,
+    page_size: Optional[int] = DEFAULT_PAGE_SIZE,
+) -> AsyncIterator[dict]:
+    """Recorre todos los elementos de un listado, página a página."""
+    async for page in iter_pages(client, url, headers, page_size=page_size):
+        for item in page.items:
+            yield item
+
+
+async def cursor_after(
+    client: AzureDevOpsClient,
+    url: str,
+    headers: dict,
+    count: int,
+    cursor: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Cursor que continúa tras los ``count`` primeros elementos desde ``cursor``.
+
+    Los continuation tokens son opacos: la única forma de obtenerlo es pedir
+    esa página con ``$top=count``. Retorna ``None`` si el listado se acaba
+    antes o el endpoint no pagina.
+    """
+    async with contextlib.aclosing(
+        iter_pages(client, url, headers, page_size=count, cursor=cursor)
+    ) as pages:
+        async for page in pages:
+            return page.continuation_token
+    return None
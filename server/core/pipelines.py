@@ -0,0 +1,163 @@
+"""
+Consultas de pipelines y de su última ejecución.
+
+La API de Pipelines no permite limitar el listado de runs, así que la
+última ejecución de cada pipeline se obtiene de la API de Build (el ID de
+un pipeline YAML coincide con el de su definición de build) pidiendo solo
+``maxBuildsPerDefinition=1``. Las definiciones se consultan en grupos, en
+paralelo y con un límite de concurrencia; la respuesta del listado ya trae
+todos los datos del run, por lo que no se vuelve a pedir su detalle.
+
+``PipelineIndex`` guarda en caché, por proyecto, los pipelines indexados por
+carpeta y nombre.
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+from azure_devops_config import (
+    get_base_url,
+    get_auth_header,
+    AZURE_DEVOPS_API_VERSION,
+    PIPELINE_REPORT_CONCURRENCY,
+    PIPELINE_INDEX_TTL,
+)
+from core.cache import TTLCache
+from core.http_client import AzureDevOpsClient
+from core.pagination import iter_items
+
+# Definiciones por petición (mantiene la URL en un tamaño razonable)
+DEFINITIONS_PER_REQUEST = 50
+
+
+async def list_pipelines(client: AzureDevOpsClient, project: str) -> list[dict]:
+    """Todos los pipelines del proyecto."""
+    url = f"{get_base_url()}/{project}/_apis/pipelines?api-version={AZURE_DEVOPS_API_VERSION}"
+    return [
+        pipeline
+        async for pipeline in iter_items(client, url, headers={"Authorization": get_auth_header()})
+    ]
+
+
+def normalize_folder(folder: Optional[str]) -> str:
+    """Carpeta en el formato de la API: ``\\`` para la raíz, ``\\a\\b`` para subcarpetas."""
+    parts = [p for p in (folder or "").replace("/", "\\").split("\\") if p]
+    return "\\" + "\\".join(parts)
+
+
+class PipelineIndex:
+    """
+    Índice en caché de los pipelines de cada proyecto por (carpeta, nombre).
+
+    Evita listar los pipelines en cada llamada y permite reutilizar un
+    pipeline existente en lugar de crear un duplicado con el mismo nombre.
+    """
+
+    def __init__(self, client: AzureDevOpsClient, ttl: float = PIPELINE_INDEX_TTL) -> None:
+        self.client = client
+        self.cache = TTLCache(maxsize=256, ttl=ttl)
+        self._locks: dict[tuple, asyncio.Lock] = {}
+
+    async def _index(self, project: str) -> dict[tuple[str, str], dict]:
+        async def load() -> dict[tuple[str, str], dict]:
+            return {
+                (normalize_folder(p.get("folder")).lower(), p["name"].lower()): p
+                for p in await list_pipelines(self.client, project)
+            }
+        return await self.cache.get_or_load(project.lower(), load)
+
+    async def pipelines(self, project: str) -> list[dict]:
+        return list((await self._index(project)).values())
+
+    async def find(self, project: str, name: str, folder: Optional[str] = None) -> Optional[dict]:
+        index = await self._index(project)
+        return index.get((normalize_folder(folder).lower(), name.lower()))
+
+    def remember(self, project: str, pipeline: dict) -> None:
+        index = self.cache.get(project.lower())
+        if isinstance(index, dict):
+            index[(normalize_folder(pipeline.get("folder")).lower(), pipeline["name"].lower())] = pipeline
+
+    def forget(self, project: str) -> None:
+        self.cache.invalidate(project.lower())
+
+    def lock(self, project: str, name: str, folder: Optional[str] = None) -> asyncio.Lock:
+        """Serializa la creación de un mismo pipeline entre llamadas concurrentes."""
+        key = (project.lower(), normalize_folder(folder).lower(), name.lower())
+        return self._locks.setdefault(key, asyncio.Lock())
+
+
+async def latest_builds(
+    client: AzureDevOpsClient,
+    project: str,
+    definition_ids: list[int],
+    concurrency: int = PIPELINE_REPORT_CONCURRENCY,
+) -> dict[int, dict]:
+    """Retorna ``{definition_id: build}`` con la ejecución más reciente de cada una."""
+    if not definition_ids:
+        return {}
+
+    url = f"{get_base_url()}/{project}/_apis/build/builds"
+    headers = {"Authorization": get_auth_header()}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_chunk(chunk: list[int]) -> list[dict]:
+        async with semaphore:
+            response = await client.get(
+                url,
+                headers=headers,
+                params={
+                    "definitions": ",".join(str(i) for i in chunk),
+                    "maxBuildsPerDefinition": 1,
+                    "queryOrder": "queueTimeDescending",
+                    "api-version": AZURE_DEVOPS_API_VERSION,
+                },
+            )
+            response.raise_for_status()
+            return response.json().get("value", [])
+
+    chunks = [
+        definition_ids[i:i + DEFINITIONS_PER_REQUEST]
+        for i in range(0, len(definition_ids), DEFINITIONS_PER_REQUEST)
+    ]
+    results = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+
+    latest: dict[int, dict] = {}
+    for build in (b for chunk in results for b in chunk):
+        definition_id = build.get("definition", {}).get("id")
+        # maxBuildsPerDefinition ya limita a una, pero se protege el orden
+        current = latest.get(definition_id)
+        if current is None or build.get("queueTime", "") > current.get("queueTime", ""):
+            latest[definition_id] = build
+    return latest
+
+
+def parse_date(value: Optional[str]) -> Optional[datetime]:
+    """Fecha ISO 8601 de la API (admite 7 decimales y sufijo Z)."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def build_duration(build: dict) -> Optional[float]:
+    """Duración en segundos (hasta ahora si sigue en curso)."""
+    start = parse_date(build.get("startTime"))
+    if start is None:
+        return None
+    finish = parse_date(build.get("finishTime")) or datetime.now(start.tzinfo)
+    return max((finish - start).total_seconds(), 0.0)
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
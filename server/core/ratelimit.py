@@ -0,0 +1,122 @@
+"""
+Control de concurrencia adaptativo frente al throttling de Azure DevOps.
+
+Azure DevOps limita el consumo por usuario (TSTU) y lo anuncia con las
+cabeceras ``X-RateLimit-Remaining``/``X-RateLimit-Limit`` y
+``X-RateLimit-Delay`` antes de empezar a responder 429. ``AdaptiveLimiter``
+ajusta el número de peticiones simultáneas con AIMD: sube de uno en uno
+mientras las respuestas llegan sin señales de throttling y se reduce a la
+mitad al recibir un 429/503 o cuando el presupuesto restante es bajo. Un
+``Retry-After`` pausa además todas las peticiones hasta que vence.
+"""
+
+import asyncio
+import email.utils
+import time
+from typing import Optional
+
+import httpx
+
+# Fracción del presupuesto restante por debajo de la cual se reduce la concurrencia
+LOW_REMAINING_RATIO = 0.1
+# Segundos mínimos entre dos reducciones (una ráfaga de 429 cuenta como una)
+DECREASE_COOLDOWN = 2.0
+
+
+def retry_after(response: httpx.Response) -> Optional[float]:
+    """Segundos indicados por ``Retry-After`` (número o fecha HTTP), o ``None``."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(when.timestamp() - time.time(), 0.0)
+
+
+def _float_header(response: httpx.Response, name: str) -> Optional[float]:
+    try:
+        return float(response.headers[name])
+    except (KeyError, ValueError):
+        return None
+
+
+class AdaptiveLimiter:
+    """Semáforo con límite variable (AIMD) compartido por todas las peticiones."""
+
+    def __init__(self, initial: int, minimum: int, maximum: int) -> None:
+        self.minimum = max(minimum, 1)
+        self.maximum = max(maximum, self.minimum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.in_flight = 0
+        self.throttled = 0
+        self._condition = asyncio.Condition()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+
+    async def __aenter__(self) -> "AdaptiveLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.release()
+
+    async def acquire(self) -> None:
+        while True:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            async with self._condition:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                await self._condition.wait()
+
+    async def release(self) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def pause(self, seconds: float) -> None:
+        """Detiene el envío de peticiones nuevas durante ``seconds``."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < DECREASE_COOLDOWN:
+            return
+        self._last_decrease = now
+        self.limit = max(self.limit / 2, float(self.minimum))
+
+    async def observe(self, response: httpx.Response) -> None:
+        """Ajusta el límite según el código y las cabeceras de rate limit."""
+        if response.status_code in (429, 503):
+            self.throttled += 1
+            self._decrease()
+            delay = retry_after(response)
+            if delay:
+                self.pause(delay)
+            return
+
+        remaining = _float_header(response, "X-RateLimit-Remaining")
+        total = _float_header(response, "X-RateLimit-Limit")
+        delay = _float_header(response, "X-RateLimit-Delay")
+        if (delay and delay > 0) or (
+            remaining is not None and total and remaining / total < LOW_REMAINING_RATIO
+        ):
+            self._decrease()
+            return
+
+        # Incremento aditivo: +1 por cada "ventana" completa de respuestas sanas
+        previous = int(self.limit)
+        self.limit = min(self.limit + 1 / self.limit, float(self.maximum))
+        if int(self.limit) > previous:
+            # Hay un hueco nuevo: se despierta a quien espera
+            async with self._condition:
+                self._condition.notify(int(self.limit) - previous)
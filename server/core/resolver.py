@@ -0,0 +1,94 @@
+"""
+Resolución de nombres de proyectos y repositorios a sus IDs.
+
+Las tools necesitan el GUID de un proyecto o repositorio a partir de su
+nombre. En lugar de descargar ``_apis/projects`` y ``_apis/git/repositories``
+en cada llamada, el resolver mantiene una caché TTL compartida. Las
+búsquedas no distinguen mayúsculas/minúsculas, igual que Azure DevOps.
+"""
+
+from typing import Optional
+
+from azure_devops_config import (
+    get_base_url,
+    get_auth_header,
+    AZURE_DEVOPS_API_VERSION,
+    RESOLVER_CACHE_TTL,
+    RESOLVER_NEGATIVE_TTL,
+    RESOLVER_CACHE_SIZE,
+)
+from core.cache import TTLCache
+from core.http_client import AzureDevOpsClient
+from core.pagination import iter_items
+
+
+class NameResolver:
+    """Caché compartida nombre -> ID para proyectos y repositorios."""
+
+    def __init__(
+        self,
+        client: AzureDevOpsClient,
+        maxsize: int = RESOLVER_CACHE_SIZE,
+        ttl: float = RESOLVER_CACHE_TTL,
+        negative_ttl: float = RESOLVER_NEGATIVE_TTL,
+    ) -> None:
+        self.client = client
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl, negative_ttl=negative_ttl)
+        # Sin TTL: solo agrupa los listados concurrentes de un mismo recurso
+        self._listings = TTLCache(maxsize=256, ttl=0, negative_ttl=0)
+
+    # ===== Proyectos =====
+
+    async def project_id(self, project: str) -> Optional[str]:
+        """Retorna el ID del proyecto o ``None`` si no existe."""
+        key = ("project", project.lower())
+        return await self.cache.get_or_load(key, lambda: self._load_project(key[1]))
+
+    async def _load_project(self, name: str) -> Optional[str]:
+        names = await self._listings.get_or_load(("projects",), self._list_projects)
+        return names.get(name)
+
+    async def _list_projects(self) -> dict[str, str]:
+        # Listar proyectos es una única llamada: se aprovecha para poblar
+        # la caché con todos los nombres y no solo con el solicitado.
+        url = f"{get_base_url()}/_apis/projects?api-version={AZURE_DEVOPS_API_VERSION}"
+        names = {}
+        async for p in iter_items(self.client, url, {"Authorization": get_auth_header()}):
+            names[p["name"].lower()] = p["id"]
+            self.cache.set(("project", p["name"].lower()), p["id"])
+        return names
+
+    def remember_project(self, project: str, project_id: str) -> None:
+        self.cache.set(("project", project.lower()), project_id)
+
+    def forget_project(self, project: str) -> None:
+        self.cache.invalidate(("project", project.lower()))
+
+    # ===== Repositorios =====
+
+    async def repository_id(self, project: str, repository: str) -> Optional[str]:
+        """Retorna el ID del repositorio dentro del proyecto o ``None``."""
+        key = ("repository", project.lower(), repository.lower())
+        return await self.cache.get_or_load(
+            key, lambda: self._load_repository(project, key[2])
+        )
+
+    async def _load_repository(self, project: str, name: str) -> Optional[str]:
+        names = await self._listings.get_or_load(
+            ("repositories", project.lower()), lambda: self._list_repositories(project)
+        )
+        return names.get(name)
+
+    async def _list_repositories(self, project: str) -> dict[str, str]:
+        url = f"{get_base_url()}/{project}/_apis/git/repositories?api-version={AZURE_DEVOPS_API_VERSION}"
+        names = {}
+        async for r in iter_items(self.client, url, {"Authorization": get_auth_header()}):
+            names[r["name"].lower()] = r["id"]
+            self.cache.set(("repository", project.lower(), r["name"].lower()), r["id"])
+        return names
+
+    def remember_repository(self, project: str, repository: str, repository_id: str) -> None:
+        self.cache.set(("repository", project.lower(), repository.lower()), repository_id)
+
+    def forget_repository(self, project: str, repository: str) -> None:
+        self.cache.invalidate(("repository", project.lower(), repository.lower()))
@@ -0,0 +1,206 @@
+"""
+Caché HTTP de respuestas GET con revalidación condicional.
+
+Solo se guardan las respuestas 200 de los endpoints con una política de
+frescura (``HTTP_CACHE_POLICIES``: expresión regular sobre la ruta y
+segundos de frescura). Mientras una entrada está fresca se responde sin
+llamar a Azure DevOps; cuando caduca se revalida con ``If-None-Match`` /
+``If-Modified-Since`` y un 304 reutiliza el cuerpo guardado. Una frescura
+de 0 revalida siempre.
+
+La memoria se limita por bytes con expulsión LRU. Cualquier escritura con
+éxito (POST, PUT, PATCH, DELETE) invalida los listados de la colección
+afectada en toda la organización (``.../_apis/git/repositories`` tanto a
+nivel de proyecto como de organización), sin distinguir mayúsculas, para
+que no devuelvan datos anteriores al cambio. Los POST de solo lectura
+(consultas WIQL, lecturas en lote) no invalidan nada.
+
+Se guardan los bytes de la respuesta: cada llamador recibe una respuesta
+nueva y su propio ``json()``, así que modificar el resultado no altera la
+caché.
+"""
+
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+
+from azure_devops_config import HTTP_CACHE_MAX_BYTES, HTTP_CACHE_POLICIES
+from core.metrics import endpoint_template
+
+# Cabeceras que no se guardan: el cuerpo se almacena ya decodificado
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+# Coste fijo aproximado por entrada (claves, cabeceras, objetos)
+_ENTRY_OVERHEAD = 512
+# POST que solo consultan (colección tras ``_apis/``): no invalidan la caché
+READ_ONLY_POSTS = {"wit/wiql", "wit/workitemsbatch", "graph/subjectquery"}
+
+
+def parse_policies(spec: str) -> list[tuple[re.Pattern, float]]:
+    """``"patrón=segundos;patrón=segundos"`` -> lista de (regex, frescura)."""
+    policies = []
+    for item in spec.split(";"):
+        pattern, _, ttl = item.strip().rpartition("=")
+        if pattern and ttl:
+            policies.append((re.compile(pattern, re.IGNORECASE), float(ttl)))
+    return policies
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    path: str
+    headers: list[tuple[str, str]]
+    content: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fresh_until: float
+    size: int
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.fresh_until
+
+    def validators(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def response(self, request: httpx.Request) -> httpx.Response:
+        """Reconstruye la respuesta (con su propio ``json()``) a partir de los bytes guardados."""
+        return httpx.Response(200, headers=self.headers, content=self.content, request=request)
+
+
+def collection(path: str) -> str:
+    """
+    Recurso de una ruta tras ``_apis/``, sin mayúsculas y con los IDs como
+    ``{id}``: ``/Org/Web/_apis/git/Repositories/<guid>`` -> ``git/repositories/{id}``.
+    """
+    return endpoint_template(path.lower()).partition("/_apis/")[2]
+
+
+class ResponseCache:
+    """Caché LRU por bytes de respuestas GET."""
+
+    def __init__(
+        self,
+        max_bytes: int = HTTP_CACHE_MAX_BYTES,
+        policies: str = HTTP_CACHE_POLICIES,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.policies = parse_policies(policies)
+        self._entries: "OrderedDict[tuple, CacheEntry]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+
+    def ttl_for(self, url: str) -> Optional[float]:
+        """Frescura de la primera política que coincide, o ``None`` si no se cachea."""
+        path = httpx.URL(url).path
+        for pattern, ttl in self.policies:
+            if pattern.search(path):
+                return ttl
+        return None
+
+    def get(self, key: tuple) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def hit(self, entry: CacheEntry) -> None:
+        self.hits += 1
+
+    def refresh(self, entry: CacheEntry, response: httpx.Response, ttl: float) -> None:
+        """Un 304 confirma la entrada: se renueva su frescura."""
+        self.revalidated += 1
+        entry.fresh_until = time.monotonic() + ttl
+        entry.etag = response.headers.get("ETag") or entry.etag
+        entry.last_modified = response.headers.get("Last-Modified") or entry.last_modified
+
+    def store(self, key: tuple, response: httpx.Response, ttl: float) -> None:
+        self.misses += 1
+        cache_control = response.headers.get("Cache-Control", "").lower()
+        if response.status_code != 200 or "no-store" in cache_control:
+            return
+
+        content = response.content
+        size = len(content) + _ENTRY_OVERHEAD
+        # Una respuesta enorme expulsaría toda la caché: no se guarda
+        if size > self.max_bytes // 4:
+            return
+
+        self.invalidate(key)
+        url = str(response.request.url) if response.request else ""
+        entry = CacheEntry(
+            url=url,
+            path=collection(httpx.URL(url).path),
+            headers=[(k, v) for k, v in response.headers.multi_items() if k.lower() not in _DROPPED_HEADERS],
+            content=content,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            fresh_until=time.monotonic() + ttl,
+            size=size,
+        )
+        self._entries[key] = entry
+        self.bytes += size
+        while self.bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= evicted.size
+            self.evictions += 1
+
+    def invalidate(self, key: tuple) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
+
+    def invalidate_for_write(self, method: str, url: str) -> None:
+        """
+        Invalida los listados afectados por una escritura con éxito:
+
+        - los de su colección y sus subrecursos (un PUT a
+          ``policy/configurations/5`` invalida ``policy/configurations``);
+        - el listado que contiene el elemento modificado (una importación en
+          ``git/repositories/{id}/importrequests`` invalida ``git/repositories``).
+
+        Se comparan solo las rutas tras ``_apis/``, así que se invalidan los
+        listados de cualquier proyecto y los de nivel organización.
+        """
+        written = collection(httpx.URL(url).path).rstrip("/")
+        if method.upper() == "POST" and written in READ_ONLY_POSTS:
+            return
+        # Las escrituras sobre un elemento (``.../{id}``) afectan a su colección
+        while written.endswith("/{id}"):
+            written = written[: -len("/{id}")]
+
+        def affected(cached: str) -> bool:
+            return (
+                cached == written
+                or cached.startswith(written + "/")
+                or written.startswith(cached + "/{id}/")
+            )
+
+        for key in [k for k, e in self._entries.items() if affected(e.path)]:
+            self.invalidate(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,328 @@
+"""
+Caché local en SQLite de ejecuciones de pipelines y su analítica.
+
+Una ejecución completada ya no cambia, así que se guarda de forma
+permanente y solo se descargan las que terminaron después de la marca de
+agua (``minTime``). Las ejecuciones en curso se reemplazan en cada
+sincronización, que se reutiliza durante ``RUN_STORE_IN_PROGRESS_TTL``
+segundos. La primera sincronización de un proyecto descarga los últimos
+``RUN_STORE_HISTORY_DAYS`` días.
+
+Las estadísticas se calculan en SQLite con una sola consulta (funciones
+de ventana para las últimas N ejecuciones, los cambios de resultado y los
+percentiles por rango más cercano); Python solo recibe una fila por
+pipeline y rama.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from urllib.parse import urlencode
+
+from azure_devops_config import (
+    get_base_url,
+    get_auth_header,
+    AZURE_DEVOPS_API_VERSION,
+    RUN_STORE_DB_PATH,
+    RUN_STORE_IN_PROGRESS_TTL,
+    RUN_STORE_HISTORY_DAYS,
+)
+from core.http_client import AzureDevOpsClient
+from core.pagination import iter_items
+from core.pipelines import parse_date
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    project TEXT NOT NULL,
+    definition_id INTEGER NOT NULL,
+    definition_name TEXT,
+    branch TEXT,
+    status TEXT NOT NULL,
+    result TEXT,
+    queue_time REAL,
+    start_time REAL,
+    finish_time REAL
+);
+CREATE INDEX IF NOT EXISTS ix_runs_definition ON runs (project, definition_id, branch, finish_time DESC);
+CREATE TABLE IF NOT EXISTS sync_state (
+    project TEXT PRIMARY KEY,
+    watermark TEXT,
+    synced_at REAL
+);
+"""
+
+
+def _epoch(value: Optional[str]) -> Optional[float]:
+    parsed = parse_date(value)
+    return parsed.timestamp() if parsed else None
+
+
+def _row_from_build(project: str, build: dict) -> tuple:
+    definition = build.get("definition") or {}
+    return (
+        build["id"],
+        project,
+        definition.get("id"),
+        definition.get("name"),
+        (build.get("sourceBranch") or "").removeprefix("refs/heads/") or None,
+        build.get("status") or "unknown",
+        build.get("result"),
+        _epoch(build.get("queueTime")),
+        _epoch(build.get("startTime")),
+        _epoch(build.get("finishTime")),
+    )
+
+
+@dataclass
+class RunStats:
+    """Estadísticas de las últimas ejecuciones de un pipeline en una rama."""
+
+    definition_id: int
+    pipeline: str
+    branch: str
+    runs: int
+    success_rate: float
+    duration_p50: Optional[float]
+    duration_p95: Optional[float]
+    queue_p50: Optional[float]
+    queue_p95: Optional[float]
+    # Proporción de ejecuciones cuyo resultado difiere del anterior
+    flakiness: float
+
+
+def _stats(row: sqlite3.Row) -> RunStats:
+    runs = row["runs"]
+    return RunStats(
+        definition_id=row["definition_id"],
+        pipeline=row["definition_name"] or str(row["definition_id"]),
+        branch=row["branch"] or "-",
+        runs=runs,
+        success_rate=row["succeeded"] / runs,
+        duration_p50=row["duration_p50"],
+        duration_p95=row["duration_p95"],
+        queue_p50=row["queue_p50"],
+        queue_p95=row["queue_p95"],
+        flakiness=row["flips"] / (runs - 1) if runs > 1 else 0.0,
+    )
+
+
+class RunStore:
+    """Caché de ejecuciones de pipelines con sincronización incremental."""
+
+    def __init__(
+        self,
+        client: AzureDevOpsClient,
+        db_path: str = RUN_STORE_DB_PATH,
+        in_progress_ttl: float = RUN_STORE_IN_PROGRESS_TTL,
+        history_days: int = RUN_STORE_HISTORY_DAYS,
+    ) -> None:
+        self.client = client
+        self.db_path = db_path
+        self.in_progress_ttl = in_progress_ttl
+        self.history_days = history_days
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._sync_locks: dict[str, asyncio.Lock] = {}
+
+    async def __aenter__(self) -> "RunStore":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    # ===== Base de datos =====
+
+    def _open(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            db = sqlite3.connect(self.db_path, check_same_thread=False)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+            self._db = db
+        return self._db
+
+    async def _run(self, fn, *args):
+        """Ejecuta una operación SQLite en un hilo, serializada por el lock."""
+        def call():
+            with self._db_lock:
+                return fn(self._open(), *args)
+        return await asyncio.to_thread(call)
+
+    # ===== Sincronización =====
+
+    def _builds_url(self, project: str, **params) -> str:
+        params["api-version"] = AZURE_DEVOPS_API_VERSION
+        return f"{get_base_url()}/{project}/_apis/build/builds?{urlencode(params)}"
+
+    async def sync(self, project: str, force: bool = False) -> int:
+        """
+        Descarga las ejecuciones completadas desde la marca de agua y
+        reemplaza las que siguen en curso.
+
+        No hace nada si la última sincronización tiene menos de
+        ``in_progress_ttl`` segundos (salvo ``force``). Retorna el número de
+        ejecuciones completadas nuevas.
+        """
+        key = project.lower()
+        lock = self._sync_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            state = await self._run(_get_sync_state, key)
+            if (
+                not force
+                and state
+                and state["synced_at"] is not None
+                and time.time() - state["synced_at"] < self.in_progress_ttl
+            ):
+                return 0
+
+            started_at = time.time()
+            watermark = state["watermark"] if state else None
+            if not watermark:
+                since = datetime.now(timezone.utc) - timedelta(days=self.history_days)
+                watermark = since.strftime("%Y-%m-%dT%H:%M:%SZ")
+            headers = {"Authorization": get_auth_header()}
+
+            # minTime filtra por fecha de fin: solo llegan las terminadas después
+            completed = [
+                _row_from_build(key, build)
+                async for build in iter_items(
+                    self.client,
+                    self._builds_url(
+                        project,
+                        statusFilter="completed",
+                        queryOrder="finishTimeAscending",
+                        minTime=watermark,
+                    ),
+                    headers=headers,
+                )
+            ]
+            running = [
+                _row_from_build(key, build)
+                async for build in iter_items(
+                    self.client,
+                    self._builds_url(project, statusFilter="inProgress,notStarted,cancelling"),
+                    headers=headers,
+                )
+            ]
+
+            # minTime es inclusivo: la última ejecución se vuelve a recibir y se reemplaza
+            finish_times = [r[-1] for r in completed if r[-1] is not None]
+            if finish_times:
+                watermark = datetime.fromtimestamp(max(finish_times), timezone.utc).strftime(
+                    "%Y-%m-%dT%H:%M:%S.%fZ"
+                )
+            await self._run(_store_runs, key, completed, running, watermark, started_at)
+            return len(completed)
+
+    # ===== Analítica =====
+
+    async def analytics(
+        self,
+        project: str,
+        definition_ids: Optional[list[int]] = None,
+        branch: Optional[str] = None,
+        last_runs: int = 50,
+    ) -> list[RunStats]:
+        """
+        Estadísticas por pipeline y rama sobre las últimas ``last_runs``
+        ejecuciones completadas (las canceladas no cuentan).
+        """
+        await self.sync(project)
+        rows = await self._run(_select_stats, project.lower(), definition_ids, branch, last_runs)
+        return [_stats(row) for row in rows]
+
+
+def _get_sync_state(db: sqlite3.Connection, project: str) -> Optional[sqlite3.Row]:
+    return db.execute(
+        "SELECT watermark, synced_at FROM sync_state WHERE project = ?", (project,)
+    ).fetchone()
+
+
+def _store_runs(
+    db: sqlite3.Connection,
+    project: str,
+    completed: list[tuple],
+    running: list[tuple],
+    watermark: Optional[str],
+    synced_at: float,
+) -> None:
+    with db:
+        # Las ejecuciones en curso caducan en cada sincronización
+        db.execute("DELETE FROM runs WHERE project = ? AND status <> 'completed'", (project,))
+        db.executemany("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", completed)
+        # Una ejecución ya guardada como completada no se sobrescribe
+        db.executemany("INSERT OR IGNORE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", running)
+        db.execute(
+            "INSERT OR REPLACE INTO sync_state (project, watermark, synced_at) VALUES (?, ?, ?)",
+            (project, watermark, synced_at),
+        )
+
+
+def _percentile_sql(column: str, p: int) -> str:
+    """Percentil por rango más cercano: el valor de rango ceil(p * n / 100)."""
+    return (
+        f"MAX(CASE WHEN {column} IS NOT NULL "
+        f"AND {column}_rank = MAX(({p} * {column}_count + 99) / 100, 1) THEN {column} END)"
+    )
+
+
+def _select_stats(
+    db: sqlite3.Connection,
+    project: str,
+    definition_ids: Optional[list[int]],
+    branch: Optional[str],
+    last_runs: int,
+) -> list[sqlite3.Row]:
+    """Una fila de agregados por (pipeline, rama) sobre sus últimas ``last_runs`` ejecuciones."""
+    filters = ["project = ? AND status = 'completed' AND result <> 'canceled'"]
+    params: list = [project]
+    if definition_ids is not None:
+        filters.append(f"definition_id IN ({', '.join('?' * len(definition_ids))})")
+        params.extend(definition_ids)
+    if branch:
+        filters.append("branch = ? COLLATE NOCASE")
+        params.append(branch.removeprefix("refs/heads/"))
+    params.append(last_runs)
+
+    group = "PARTITION BY definition_id, branch"
+    sql = f"""
+        WITH recent AS (
+            SELECT definition_id, definition_name, branch, finish_time,
+                   result = 'succeeded' AS ok,
+                   finish_time - start_time AS duration,
+                   start_time - queue_time AS queued,
+                   ROW_NUMBER() OVER ({group} ORDER BY finish_time DESC) AS n
+            FROM runs WHERE {" AND ".join(filters)}
+        ),
+        ranked AS (
+            SELECT *,
+                   LAG(ok) OVER ({group} ORDER BY finish_time) AS previous_ok,
+                   ROW_NUMBER() OVER ({group} ORDER BY duration IS NULL, duration) AS duration_rank,
+                   COUNT(duration) OVER ({group}) AS duration_count,
+                   ROW_NUMBER() OVER ({group} ORDER BY queued IS NULL, queued) AS queued_rank,
+                   COUNT(queued) OVER ({group}) AS queued_count
+            FROM recent WHERE n <= ?
+        )
+        SELECT definition_id, branch,
+               MAX(definition_name) AS definition_name,
+               COUNT(*) AS runs,
+               SUM(ok) AS succeeded,
+               SUM(previous_ok IS NOT NULL AND ok <> previous_ok) AS flips,
+               {_percentile_sql("duration", 50)} AS duration_p50,
+               {_percentile_sql("duration", 95)} AS duration_p95,
+               {_percentile_sql("queued", 50)} AS queue_p50,
+               {_percentile_sql("queued", 95)} AS queue_p95
+        FROM ranked
+        GROUP BY definition_id, branch
+        ORDER BY definition_id, branch
+    """
+    return db.execute(sql, params).fetchall()
@@ -0,0 +1,224 @@
+"""
+Seguimiento de ejecuciones de pipelines con un único sondeo por ejecución.
+
+Cada ejecución observada tiene un solo ``_RunPoller`` que consulta el build
+y su timeline, con un intervalo que empieza en ``WATCH_MIN_INTERVAL`` y
+crece con la antigüedad de la ejecución y mientras no haya cambios, hasta
+``WATCH_MAX_INTERVAL``. Los cambios de
+estado o de stage se publican a todas las suscripciones de esa ejecución;
+el sondeo termina cuando la ejecución se completa o cuando ya no queda
+nadie suscrito.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from azure_devops_config import (
+    get_base_url,
+    get_auth_header,
+    AZURE_DEVOPS_API_VERSION,
+    WATCH_MIN_INTERVAL,
+    WATCH_MAX_INTERVAL,
+)
+from core import deadlines, tracing
+from core.http_client import AzureDevOpsClient
+
+logger = logging.getLogger(__name__)
+
+# Factor de crecimiento del intervalo tras un sondeo sin cambios
+BACKOFF_FACTOR = 1.5
+# Segundos de intervalo base añadidos por cada segundo de seguimiento
+AGE_FACTOR = 1 / 30
+
+
+@dataclass
+class Stage:
+    name: str
+    state: str
+    result: Optional[str]
+
+
+@dataclass
+class RunSnapshot:
+    """Estado de una ejecución en un instante del sondeo."""
+
+    run_id: int
+    pipeline: str
+    build_number: str
+    status: str
+    result: Optional[str]
+    stages: list[Stage] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def completed(self) -> bool:
+        return self.status == "completed" or self.error is not None
+
+    @property
+    def completed_stages(self) -> int:
+        return sum(1 for s in self.stages if s.state == "completed")
+
+    def key(self) -> tuple:
+        """Lo que se compara entre sondeos para detectar cambios."""
+        return (self.status, self.result, tuple((s.name, s.state, s.result) for s in self.stages))
+
+
+class _RunPoller:
+    def __init__(self, watcher: "RunWatcher", project: str, run_id: int) -> None:
+        self.watcher = watcher
+        self.project = project
+        self.run_id = run_id
+        self.subscribers: set[asyncio.Queue] = set()
+        self.latest: Optional[RunSnapshot] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def publish(self, snapshot: RunSnapshot) -> None:
+        self.latest = snapshot
+        for queue in self.subscribers:
+            queue.put_nowait(snapshot)
+
+    async def run(self) -> None:
+        # El sondeo es compartido: no depende del plazo ni de la traza de
+        # quien lo arrancó
+        deadlines.detach()
+        tracing.detach()
+        started = time.monotonic()
+        interval = self.watcher.min_interval
+        try:
+            while True:
+                # El intervalo base crece con la antigüedad de la ejecución
+                base = min(
+                    self.watcher.min_interval + (time.monotonic() - started) * AGE_FACTOR,
+                    self.watcher.max_interval,
+                )
+                try:
+                    snapshot = await self.watcher.fetch(self.project, self.run_id)
+                except Exception as e:
+                    if isinstance(e, httpx.HTTPStatusError) and e.response.status_code in (401, 403, 404):
+                        raise
+                    # Error transitorio: se reintenta en el siguiente sondeo
+                    logger.warning("Fallo al consultar la ejecución %s: %s", self.run_id, e)
+                    interval = min(max(interval, base) * BACKOFF_FACTOR, self.watcher.max_interval)
+                    await asyncio.sleep(interval)
+                    continue
+
+                if self.latest is None or snapshot.key() != self.latest.key():
+                    self.publish(snapshot)
+                    interval = base
+                else:
+                    interval = min(max(interval, base) * BACKOFF_FACTOR, self.watcher.max_interval)
+
+                if snapshot.completed:
+                    return
+                await asyncio.sleep(interval)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                error = f"No se encontró la ejecución {self.run_id}"
+            else:
+                error = f"Error HTTP {e.response.status_code}: {e.response.text}"
+            self.publish(RunSnapshot(self.run_id, "", "", "unknown", None, error=error))
+        except Exception as e:
+            self.publish(RunSnapshot(self.run_id, "", "", "unknown", None, error=str(e)))
+        finally:
+            self.watcher._discard(self)
+
+
+class RunWatcher:
+    """Registro de sondeos compartidos por ejecución de pipeline."""
+
+    def __init__(
+        self,
+        client: AzureDevOpsClient,
+        min_interval: float = WATCH_MIN_INTERVAL,
+        max_interval: float = WATCH_MAX_INTERVAL,
+    ) -> None:
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._pollers: dict[tuple[str, int], _RunPoller] = {}
+
+    async def fetch(self, project: str, run_id: int) -> RunSnapshot:
+        """Consulta el build y su timeline (en paralelo)."""
+        base = f"{get_base_url()}/{project}/_apis/build/builds/{run_id}"
+        headers = {"Authorization": get_auth_header()}
+        params = {"api-version": AZURE_DEVOPS_API_VERSION}
+
+        build_res, timeline_res = await asyncio.gather(
+            self.client.get(base, headers=headers, params=params),
+            self.client.get(f"{base}/timeline", headers=headers, params=params),
+        )
+        build_res.raise_for_status()
+        build = build_res.json()
+
+        records = []
+        # Antes de que arranque el primer job el timeline puede no existir (204/404)
+        if timeline_res.status_code == 200 and timeline_res.content:
+            records = timeline_res.json().get("records") or []
+        stages = [
+            Stage(r.get("name", ""), r.get("state") or "pending", r.get("result"))
+            for r in sorted(
+                (r for r in records if r.get("type") == "Stage"),
+                key=lambda r: r.get("order") or 0,
+            )
+        ]
+        return RunSnapshot(
+            run_id=run_id,
+            pipeline=(build.get("definition") or {}).get("name", ""),
+            build_number=build.get("buildNumber") or str(run_id),
+            status=build.get("status") or "unknown",
+            result=build.get("result"),
+            stages=stages,
+        )
+
+    async def watch(self, project: str, run_id: int) -> AsyncIterator[RunSnapshot]:
+        """
+        Entrega el estado actual y después cada cambio, hasta que la
+        ejecución se completa. Las suscripciones a la misma ejecución
+        comparten un solo sondeo.
+        """
+        key = (project.lower(), run_id)
+        poller = self._pollers.get(key)
+        if poller is None:
+            poller = self._pollers[key] = _RunPoller(self, project, run_id)
+            poller.task = asyncio.create_task(poller.run())
+
+        queue: asyncio.Queue = asyncio.Queue()
+        if poller.latest is not None:
+            queue.put_nowait(poller.latest)
+        poller.subscribers.add(queue)
+        try:
+            while True:
+                snapshot = await queue.get()
+                yield snapshot
+                if snapshot.completed:
+                    return
+        finally:
+            poller.subscribers.discard(queue)
+            if not poller.subscribers:
+                # Sin suscriptores: se detiene el sondeo y se retira del registro
+                # para que una suscripción nueva arranque uno propio
+                self._discard(poller)
+                if poller.task is not None and not poller.task.done():
+                    poller.task.cancel()
+
+    def _discard(self, poller: _RunPoller) -> None:
+        key = (poller.project.lower(), poller.run_id)
+        if self._pollers.get(key) is poller:
+            del self._pollers[key]
+
+    async def aclose(self) -> None:
+        for poller in list(self._pollers.values()):
+            if poller.task is not None:
+                poller.task.cancel()
+        self._pollers.clear()
+
+    async def __aenter__(self) -> "RunWatcher":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
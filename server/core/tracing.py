@@ -0,0 +1,346 @@
+"""
+Trazas de las llamadas a tools.
+
+Cada llamada muestreada es una traza: un span raíz para la tool
+(``TracingMiddleware`` en ``core.middleware``) y un span hijo por cada
+intento de petición a Azure DevOps (``AzureDevOpsClient``) con la
+plantilla del endpoint, el código de estado, los bytes y la duración. Así
+se ve cuál de los pasos secuenciales de una tool fue el lento.
+
+El muestreo se decide al empezar la llamada (``TRACING_SAMPLE_RATE``): una
+llamada no muestreada no crea ningún span. Con ``AZURE_DEVOPS_TRACING``
+vacío (por defecto) el middleware no se registra y el cliente HTTP solo
+consulta un ``ContextVar`` que siempre está vacío.
+
+Las trazas completas se acumulan y un bucle en segundo plano las entrega
+al exportador cada ``TRACING_FLUSH_INTERVAL`` segundos, fuera del camino
+de la tool. Exportadores incluidos (``EXPORTERS``):
+
+- ``jsonl``: un span por línea en ``TRACING_FILE``.
+- ``otlp``: OTLP/HTTP con codificación JSON (collector de OpenTelemetry,
+  Jaeger, Tempo...).
+
+Como con los plazos, las tareas en segundo plano deben llamar a
+``detach()`` para no colgar sus peticiones de la traza que las arrancó.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Optional, Protocol
+
+import httpx
+
+from azure_devops_config import (
+    TRACING_EXPORTER,
+    TRACING_SAMPLE_RATE,
+    TRACING_FILE,
+    TRACING_OTLP_ENDPOINT,
+    TRACING_OTLP_HEADERS,
+    TRACING_SERVICE_NAME,
+    TRACING_FLUSH_INTERVAL,
+    TRACING_MAX_QUEUE,
+)
+from core import deadlines
+from core.metrics import endpoint_template
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["Span"]] = ContextVar("azure_devops_span", default=None)
+
+# Tipos de span (mismos valores que OTLP)
+INTERNAL = 1
+SERVER = 2
+CLIENT = 3
+
+
+class Span:
+    """Operación con inicio, fin, atributos y estado dentro de una traza."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "attributes",
+                 "start_ns", "end_ns", "error", "trace")
+
+    def __init__(self, name: str, kind: int = INTERNAL, parent: Optional["Span"] = None,
+                 attributes: Optional[dict] = None) -> None:
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        # Mensaje de error, o None si terminó bien
+        self.error: Optional[str] = None
+        # Spans de la traza (compartida con la raíz)
+        self.trace: list[Span] = parent.trace if parent is not None else []
+        self.trace.append(self)
+
+    def end(self, error: Optional[str] = None) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.error = error
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": {INTERNAL: "internal", SERVER: "server", CLIENT: "client"}[self.kind],
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+# ===== Exportadores =====
+
+class SpanExporter(Protocol):
+    async def export(self, spans: list[Span]) -> None: ...
+
+    async def aclose(self) -> None: ...
+
+
+class JsonlExporter:
+    """Añade cada span como una línea JSON a un fichero local."""
+
+    def __init__(self, path: str = TRACING_FILE) -> None:
+        self.path = path
+
+    def _write(self, text: str) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(text)
+
+    async def export(self, spans: list[Span]) -> None:
+        text = "".join(json.dumps(s.to_dict(), ensure_ascii=False, default=str) + "\n" for s in spans)
+        await asyncio.to_thread(self._write, text)
+
+    async def aclose(self) -> None:
+        pass
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict) -> list[dict]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items() if v is not None]
+
+
+def parse_headers(spec: str) -> dict[str, str]:
+    """``"clave=valor,clave=valor"`` -> {clave: valor} (formato de OTEL_EXPORTER_OTLP_HEADERS)."""
+    headers = {}
+    for item in spec.split(","):
+        key, _, value = item.strip().partition("=")
+        if key and value:
+            headers[key.strip()] = value.strip()
+    return headers
+
+
+class OtlpExporter:
+    """Envía los spans a un endpoint OTLP/HTTP con codificación JSON."""
+
+    def __init__(
+        self,
+        endpoint: str = TRACING_OTLP_ENDPOINT,
+        headers: Optional[dict[str, str]] = None,
+        service_name: str = TRACING_SERVICE_NAME,
+        timeout: float = 10.0,
+    ) -> None:
+        self.endpoint = endpoint
+        self.headers = headers if headers is not None else parse_headers(TRACING_OTLP_HEADERS)
+        self.service_name = service_name
+        # Cliente propio: los envíos no pasan por las métricas ni los límites de Azure DevOps
+        self._client = httpx.AsyncClient(timeout=timeout)
+
+    def _span(self, span: Span) -> dict:
+        otlp = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": span.kind,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": _otlp_attributes(span.attributes),
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+        }
+        if span.parent_id:
+            otlp["parentSpanId"] = span.parent_id
+        return otlp
+
+    async def export(self, spans: list[Span]) -> None:
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": "mcp-ado"},
+                    "spans": [self._span(s) for s in spans],
+                }],
+            }]
+        }
+        response = await self._client.post(self.endpoint, json=payload, headers=self.headers)
+        response.raise_for_status()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+EXPORTERS: dict[str, Callable[[], SpanExporter]] = {
+    "jsonl": JsonlExporter,
+    "otlp": OtlpExporter,
+}
+
+
+def build_exporter(name: str) -> Optional[SpanExporter]:
+    """Exportador configurado, o ``None`` si las trazas están desactivadas."""
+    if not name or name in ("none", "off", "false", "0"):
+        return None
+    factory = EXPORTERS.get(name)
+    if factory is None:
+        logger.warning("Exportador de trazas desconocido: %s (opciones: %s)", name, ", ".join(EXPORTERS))
+        return None
+    return factory()
+
+
+# ===== Tracer =====
+
+class Tracer:
+    """Muestrea llamadas, acumula las trazas terminadas y las exporta por lotes."""
+
+    def __init__(
+        self,
+        exporter: Optional[SpanExporter] = None,
+        sample_rate: float = TRACING_SAMPLE_RATE,
+        flush_interval: float = TRACING_FLUSH_INTERVAL,
+        max_queue: int = TRACING_MAX_QUEUE,
+    ) -> None:
+        self.exporter = exporter if exporter is not None else build_exporter(TRACING_EXPORTER)
+        self.sample_rate = sample_rate
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self._pending: list[Span] = []
+        self._task: Optional[asyncio.Task] = None
+        # Spans descartados por cola llena o por fallo del exportador
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start_trace(self, name: str, attributes: Optional[dict] = None) -> Optional[Span]:
+        """Span raíz de una llamada, o ``None`` si no se muestrea."""
+        if not self.enabled or random.random() >= self.sample_rate:
+            return None
+        return Span(name, SERVER, attributes=attributes)
+
+    def finish_trace(self, root: Span, error: Optional[str] = None) -> None:
+        root.end(error)
+        # Peticiones que no llegaron a terminar (p. ej. canceladas al vencer el plazo)
+        for span in root.trace:
+            span.end("no terminó antes que la tool")
+        if len(self._pending) + len(root.trace) > self.max_queue:
+            self.dropped += len(root.trace)
+            return
+        self._pending.extend(root.trace)
+
+    async def flush(self) -> None:
+        if not self._pending or self.exporter is None:
+            return
+        batch, self._pending = self._pending, []
+        try:
+            await self.exporter.export(batch)
+        except Exception as e:
+            self.dropped += len(batch)
+            logger.warning("No se pudieron exportar %s spans: %s", len(batch), e)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def __aenter__(self) -> "Tracer":
+        if self.enabled:
+            self._task = asyncio.create_task(self._flush_loop())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        if self.exporter is not None:
+            await self.exporter.aclose()
+
+
+# ===== Contexto =====
+
+def current() -> Optional[Span]:
+    return _current.get()
+
+
+def activate(span: Span) -> Token:
+    return _current.set(span)
+
+
+def reset(token: Token) -> None:
+    _current.reset(token)
+
+
+def detach() -> None:
+    """Saca la tarea actual de la traza heredada (tareas en segundo plano)."""
+    _current.set(None)
+
+
+def start_upstream(method: str, url) -> Optional[Span]:
+    """Span de una petición a Azure DevOps, si la llamada actual se traza."""
+    parent = _current.get()
+    if parent is None:
+        return None
+    url = httpx.URL(url)
+    template = endpoint_template(url.path)
+    attributes = {
+        "http.request.method": method,
+        "url.template": template,
+        "server.address": url.host,
+    }
+    deadline = deadlines.current()
+    if deadline is not None and deadline.phase:
+        attributes["mcp.step"] = deadline.phase
+    return Span(f"{method} {template}", CLIENT, parent, attributes)
+
+
+def end_upstream(span: Optional[Span], response: Optional[httpx.Response] = None,
+                 error: Optional[BaseException] = None) -> None:
+    """Cierra el span de una petición con su estado y bytes transferidos."""
+    if span is None:
+        return
+    if response is not None:
+        span.attributes["http.response.status_code"] = response.status_code
+        # Bytes recibidos por la red; si el transporte no los cuenta, Content-Length
+        size = response.num_bytes_downloaded or response.headers.get("content-length")
+        if size:
+            span.attributes["http.response.body.size"] = int(size)
+        request_size = response.request.headers.get("content-length")
+        if request_size:
+            span.attributes["http.request.body.size"] = int(request_size)
+        span.end(f"HTTP {response.status_code}" if response.status_code >= 400 else None)
+    else:
+        kind = type(error).__name__ if error is not None else "error"
+        span.attributes["error.type"] = kind
+        span.end(str(error) or kind)
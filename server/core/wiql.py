@@ -0,0 +1,114 @@
+"""
+Constructor de consultas WIQL (Work Item Query Language).
+
+Escapa los valores interpolados, valida los nombres de campo y
+operadores, y ejecuta la consulta pasando ``$top`` al endpoint
+``_apis/wit/wiql`` para que el servidor solo retorne los IDs necesarios.
+"""
+
+import re
+from typing import Optional
+
+from azure_devops_config import (
+    get_base_url,
+    get_auth_header,
+    AZURE_DEVOPS_API_VERSION,
+)
+from core.http_client import AzureDevOpsClient
+
+_FIELD_RE = re.compile(r"^[A-Za-z][\w.]*$")
+_OPERATORS = {
+    "=", "<>", ">", "<", ">=", "<=",
+    "CONTAINS", "NOT CONTAINS", "CONTAINS WORDS",
+    "UNDER", "NOT UNDER", "IN", "NOT IN",
+}
+
+
+def quote(value) -> str:
+    """Convierte un valor en un literal WIQL, duplicando las comillas simples."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _field(name: str) -> str:
+    if not _FIELD_RE.match(name):
+        raise ValueError(f"Nombre de campo WIQL inválido: {name!r}")
+    return f"[{name}]"
+
+
+class WiqlQuery:
+    """Consulta WIQL sobre ``WorkItems`` construida de forma incremental."""
+
+    def __init__(self, fields: tuple[str, ...] = ("System.Id",)) -> None:
+        self.fields = [_field(f) for f in fields]
+        self.conditions: list[str] = []
+        self.order: list[str] = []
+        # Necesario si alguna fecha incluye hora (p. ej. 2025-01-31T10:00:00Z)
+        self.time_precision = False
+
+    def where(self, field: str, operator: str, value) -> "WiqlQuery":
+        operator = operator.upper()
+        if operator not in _OPERATORS:
+            raise ValueError(f"Operador WIQL no soportado: {operator!r}")
+        if operator in ("IN", "NOT IN"):
+            literal = "(" + ", ".join(quote(v) for v in value) + ")"
+        else:
+            literal = quote(value)
+        self.conditions.append(f"{_field(field)} {operator} {literal}")
+        return self
+
+    def project(self, project: str) -> "WiqlQuery":
+        return self.where("System.TeamProject", "=", project)
+
+    def under(self, field: str, path: str) -> "WiqlQuery":
+        return self.where(field, "UNDER", path)
+
+    def tags(self, tags: list[str]) -> "WiqlQuery":
+        for tag in tags:
+            self.where("System.Tags", "CONTAINS", tag)
+        return self
+
+    def changed_since(self, since: str, inclusive: bool = True) -> "WiqlQuery":
+        return self.changed_at(since, ">=" if inclusive else ">")
+
+    def changed_at(self, when: str, operator: str = "=") -> "WiqlQuery":
+        if "T" in when:
+            self.time_precision = True
+        return self.where("System.ChangedDate", operator, when)
+
+    def order_by(self, field: str, descending: bool = False) -> "WiqlQuery":
+        self.order.append(f"{_field(field)} {'DESC' if descending else 'ASC'}")
+        return self
+
+    def build(self) -> str:
+        query = f"SELECT {', '.join(self.fields)} FROM WorkItems"
+        if self.conditions:
+            query += " WHERE " + " AND ".join(self.conditions)
+        if self.order:
+            query += " ORDER BY " + ", ".join(self.order)
+        return query
+
+
+async def run_wiql(
+    client: AzureDevOpsClient,
+    project: str,
+    query: WiqlQuery,
+    top: Optional[int] = None,
+) -> list[int]:
+    """Ejecuta la consulta y retorna los IDs en el orden indicado por WIQL."""
+    params = {"api-version": AZURE_DEVOPS_API_VERSION}
+    if top:
+        params["$top"] = top
+    if query.time_precision:
+        params["timePrecision"] = "true"
+
+    response = await client.post(
+        f"{get_base_url()}/{project}/_apis/wit/wiql",
+        params=params,
+        headers={
+            "Authorization": get_auth_header(),
+            "Content-Type": "application/json"
+        },
+        json={"query": query.build()}
+    )
+    response.raise_for_status()
+    return [wi["id"] for wi in response.json().get("workItems", [])]
@@ -0,0 +1,220 @@
+"""
+Lectura y creación de work items por lotes.
+
+``_apis/wit/workitemsbatch`` acepta como máximo 200 IDs por petición; las
+listas más largas se dividen en lotes que se piden en paralelo con un
+límite de concurrencia. Solo se solicitan los campos indicados.
+
+La creación en bloque usa ``_apis/wit/$batch``, también con un máximo de
+200 operaciones por petición, y reporta el resultado de cada elemento.
+"""
+
+import asyncio
+import json
+from typing import Iterable, Optional
+from urllib.parse import quote
+
+from azure_devops_config import (
+    get_base_url,
+    get_auth_header,
+    AZURE_DEVOPS_API_VERSION,
+    WORK_ITEMS_FETCH_CONCURRENCY,
+    WORK_ITEMS_WRITE_CONCURRENCY,
+)
+from core.http_client import AzureDevOpsClient
+
+# Límite de IDs por petición impuesto por la API
+BATCH_SIZE = 200
+
+# Campos mostrados por las tools de work items
+SUMMARY_FIELDS = [
+    "System.Id",
+    "System.WorkItemType",
+    "System.Title",
+    "System.State",
+    "System.AssignedTo",
+]
+
+
+def work_item_web_url(project: str, work_item_id: int) -> str:
+    """URL web de un work item (workitemsbatch no retorna ``_links``)."""
+    return f"{get_base_url()}/{project}/_workitems/edit/{work_item_id}"
+
+
+async def fetch_work_items(
+    client: AzureDevOpsClient,
+    project: str,
+    ids: Iterable[int],
+    fields: list[str] = SUMMARY_FIELDS,
+    concurrency: int = WORK_ITEMS_FETCH_CONCURRENCY,
+) -> list[dict]:
+    """
+    Retorna los work items en el mismo orden que ``ids``.
+
+    Los IDs que ya no existen (o no son accesibles) se omiten.
+    """
+    ids = [int(i) for i in ids]
+    if not ids:
+        return []
+
+    url = f"{get_base_url()}/{project}/_apis/wit/workitemsbatch?api-version={AZURE_DEVOPS_API_VERSION}"
+    headers = {
+        "Authorization": get_auth_header(),
+        "Content-Type": "application/json"
+    }
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_chunk(chunk: list[int]) -> list[dict]:
+        async with semaphore:
+            response = await client.post(
+                url,
+                headers=headers,
+                json={"ids": chunk, "fields": fields, "errorPolicy": "Omit"}
+            )
+            response.raise_for_status()
+            return [item for item in response.json().get("value", []) if item]
+
+    chunks = [ids[i:i + BATCH_SIZE] for i in range(0, len(ids), BATCH_SIZE)]
+    results = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+
+    # La API no garantiza el orden dentro de un lote: se reordena por ID
+    by_id = {item["id"]: item for chunk in results for item in chunk}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+def build_work_item_patch(
+    title: str,
+    description: Optional[str] = None,
+    priority: Optional[int] = None,
+    parent_id: Optional[int] = None,
+) -> list[dict]:
+    """Documento JSON Patch para crear un work item."""
+    body = [{"op": "add", "path": "/fields/System.Title", "value": title}]
+    if description is not None:
+        body.append({"op": "add", "path": "/fields/System.Description", "value": description})
+    if priority is not None:
+        body.append({"op": "add", "path": "/fields/Microsoft.VSTS.Common.Priority", "value": priority})
+    if parent_id is not None:
+        body.append({
+            "op": "add",
+            "path": "/relations/-",
+            "value": {
+                "rel": "System.LinkTypes.Hierarchy-Reverse",
+                "url": f"{get_base_url()}/_apis/wit/workItems/{parent_id}",
+            },
+        })
+    return body
+
+
+def _batch_error(entry: dict) -> str:
+    try:
+        body = json.loads(entry.get("body") or "{}")
+    except ValueError:
+        return entry.get("body") or f"HTTP {entry.get('code')}"
+    message = body.get("value", {}).get("Message") if isinstance(body.get("value"), dict) else None
+    return message or body.get("message") or f"HTTP {entry.get('code')}"
+
+
+async def create_work_items_batch(
+    client: AzureDevOpsClient,
+    project: str,
+    specs: list[dict],
+    concurrency: int = WORK_ITEMS_WRITE_CONCURRENCY,
+) -> list[dict]:
+    """
+    Crea varios work items mediante ``$batch``.
+
+    Cada spec tiene ``type``, ``title`` y opcionalmente ``description``,
+    ``priority``, ``parent_id`` (work item existente) o ``parent_index``
+    (posición de otro elemento de ``specs``). Los elementos cuyo padre está
+    en la misma lista se crean en una oleada posterior, cuando ya se conoce
+    el ID real del padre.
+
+    Retorna, en el orden de ``specs``, ``{"index", "ok", "id", "error"}``.
+    Un fallo de un elemento no detiene al resto.
+    """
+    url = f"{get_base_url()}/_apis/wit/$batch?api-version={AZURE_DEVOPS_API_VERSION}"
+    headers = {
+        "Authorization": get_auth_header(),
+        "Content-Type": "application/json"
+    }
+    semaphore = asyncio.Semaphore(concurrency)
+    results: list[Optional[dict]] = [None] * len(specs)
+
+    def fail(index: int, error: str) -> None:
+        results[index] = {"index": index, "ok": False, "id": None, "error": error}
+
+    async def submit(indexes: list[int], parents: dict[int, int]) -> None:
+        operations = []
+        for i in indexes:
+            spec = specs[i]
+            operations.append({
+                "method": "PATCH",
+                "uri": (
+                    f"/{quote(project)}/_apis/wit/workitems/${quote(spec['type'])}"
+                    f"?api-version={AZURE_DEVOPS_API_VERSION}"
+                ),
+                "headers": {"Content-Type": "application/json-patch+json"},
+                "body": build_work_item_patch(
+                    spec["title"],
+                    spec.get("description"),
+                    spec.get("priority"),
+                    parents.get(i, spec.get("parent_id")),
+                ),
+            })
+
+        async with semaphore:
+            try:
+                response = await client.post(url, headers=headers, json=operations)
+                response.raise_for_status()
+                entries = response.json().get("value", [])
+            except Exception as e:
+                for i in indexes:
+                    fail(i, str(e))
+                return
+
+        for i, entry in zip(indexes, entries):
+            if 200 <= entry.get("code", 0) < 300:
+                created = json.loads(entry["body"])
+                results[i] = {"index": i, "ok": True, "id": created["id"], "error": None}
+            else:
+                fail(i, _batch_error(entry))
+        for i in indexes[len(entries):]:
+            fail(i, "Sin respuesta en el lote")
+
+    # ===== Oleadas: primero los elementos sin padre dentro de la lista =====
+    pending = set(range(len(specs)))
+    for i in pending.copy():
+        parent = specs[i].get("parent_index")
+        if parent is not None and (not 0 <= parent < len(specs) or parent == i):
+            fail(i, f"parent_index inválido: {parent}")
+            pending.discard(i)
+
+    while pending:
+        ready, parents, skipped = [], {}, False
+        for i in sorted(pending):
+            parent = specs[i].get("parent_index")
+            if parent is None:
+                ready.append(i)
+            elif results[parent] is not None:
+                if results[parent]["ok"]:
+                    ready.append(i)
+                    parents[i] = results[parent]["id"]
+                else:
+                    fail(i, f"No se creó el padre (elemento {parent})")
+                    pending.discard(i)
+                    skipped = True
+
+        if not ready and skipped:
+            continue
+        if not ready:
+            # Ciclos en parent_index: no se pueden crear
+            for i in pending:
+                fail(i, "Dependencia circular en parent_index")
+            break
+
+        chunks = [ready[i:i + BATCH_SIZE] for i in range(0, len(ready), BATCH_SIZE)]
+        await asyncio.gather(*(submit(chunk, parents) for chunk in chunks))
+        pending.difference_update(ready)
+
+    return results
@@ -3,25 +3,112 @@ Azure DevOps MCP Server
 Servidor principal que registra todas las herramientas MCP
 """
 
+from contextlib import asynccontextmanager
+
 from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
 
-from azure_devops_config import AZURE_DEVOPS_ORG, AZURE_DEVOPS_PAT
+from azure_devops_config import AZURE_DEVOPS_ORG, AZURE_DEVOPS_PAT, METRICS_ENABLED
+from core import metrics
+from core.http_client import AzureDevOpsClient
+from core.identities import IdentityResolver
+from core.jobs import JobRegistry
+from core.logs import PipelineLogs
+from core.metadata import MetadataCache
+from core.middleware import DeadlineMiddleware, MetricsMiddleware, TracingMiddleware
+from core.mirror import WorkItemMirror
+from core.pipelines import PipelineIndex
+from core.resolver import NameResolver
+from core.run_store import RunStore
+from core.run_watcher import RunWatcher
+from core.tracing import Tracer
 from tools.repositories import register_repository_tools
 from tools.work_items import register_work_item_tools
 from tools.projects import register_project_tools
 from tools.pipelines import register_pipeline_tools
+from tools.jobs import register_job_tools
+
+# Cliente HTTP compartido por todas las tools (pool keep-alive / HTTP/2)
+client = AzureDevOpsClient()
+
+# Caché compartida de resolución nombre -> ID de proyectos y repositorios
+resolver = NameResolver(client)
+
+# Metadatos de la organización persistidos en disco (namespaces, tipos de política)
+metadata = MetadataCache(client)
+
+# Caché de identidades email -> descriptor (con caché negativa)
+identities = IdentityResolver(client)
+
+# Espejo SQLite opcional de work items (AZURE_DEVOPS_MIRROR_PROJECTS)
+mirror = WorkItemMirror(client)
+
+# Caché SQLite de ejecuciones de pipelines para la analítica
+runs = RunStore(client)
+
+# Sondeos compartidos de ejecuciones en curso (watch_pipeline_run)
+watcher = RunWatcher(client)
+
+# Operaciones en segundo plano (importaciones) consultables con get_job_status
+jobs = JobRegistry()
+
+# Índice en caché de pipelines por nombre y carpeta
+pipeline_index = PipelineIndex(client)
+
+# Logs de ejecuciones (caché comprimida en disco para las completadas)
+logs = PipelineLogs(client)
+
+# Trazas de las llamadas a tools (AZURE_DEVOPS_TRACING, desactivadas por defecto)
+tracer = Tracer()
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """
+    Abre el pool de conexiones, carga la caché de metadatos y arranca la
+    sincronización del espejo de work items; los cierra al apagar (incluida
+    la caché de ejecuciones de pipelines) y envía las trazas pendientes.
+    """
+    async with client, metadata, mirror, runs, watcher, jobs, tracer:
+        yield
+
 
 # Crear servidor MCP
 mcp = FastMCP(
     name="Azure DevOps Server",
     on_duplicate_tools="error",
+    lifespan=lifespan,
 )
 
+# Métricas por tool; va primero para medir también los timeouts
+if METRICS_ENABLED:
+    mcp.add_middleware(MetricsMiddleware())
+
+# Span raíz de cada llamada muestreada; fuera del plazo para trazar los timeouts
+if tracer.enabled:
+    mcp.add_middleware(TracingMiddleware(tracer))
+
+# Plazo total por llamada a una tool (AZURE_DEVOPS_TOOL_DEADLINE[S])
+mcp.add_middleware(DeadlineMiddleware())
+
+if METRICS_ENABLED:
+    metrics.collect_client(client)
+
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def metrics_endpoint(request: Request) -> PlainTextResponse:
+        """Métricas en formato de exposición de Prometheus."""
+        return PlainTextResponse(
+            metrics.REGISTRY.render(),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
 # Registrar tools desde los módulos
-register_repository_tools(mcp)
-register_work_item_tools(mcp)
-register_project_tools(mcp)
-register_pipeline_tools(mcp)
+register_repository_tools(mcp, client, resolver, metadata, identities, jobs)
+register_work_item_tools(mcp, client, resolver, mirror)
+register_project_tools(mcp, client)
+register_pipeline_tools(mcp, client, resolver, runs, watcher, logs, pipeline_index)
+register_job_tools(mcp, jobs)
 
 if __name__ == "__main__":
     if not AZURE_DEVOPS_ORG or not AZURE_DEVOPS_PAT:
@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+# La configuración se lee del entorno al importar ``azure_devops_config``
+os.environ["AZURE_DEVOPS_ORGANIZATION"] = "org"
+os.environ["AZURE_DEVOPS_PAT"] = "pat"
+os.environ["AZURE_DEVOPS_CACHE_DIR"] = tempfile.mkdtemp(prefix="mcp-ado-tests-")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
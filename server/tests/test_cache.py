@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from core import cache
+from core.cache import MISSING, TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_ttl_and_none_uses_negative_ttl(clock):
+    ttl_cache = TTLCache(ttl=60, negative_ttl=5)
+    ttl_cache.set("found", "id-1")
+    ttl_cache.set("missing", None)
+
+    clock[0] += 10
+    assert ttl_cache.get("found") == "id-1"
+    assert ttl_cache.get("missing") is MISSING
+
+    clock[0] += 60
+    assert ttl_cache.get("found") is MISSING
+    assert len(ttl_cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    ttl_cache = TTLCache(maxsize=2)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    ttl_cache.get("a")
+    ttl_cache.set("c", 3)
+
+    assert ttl_cache.get("b") is MISSING
+    assert ttl_cache.get("a") == 1
+    assert ttl_cache.get("c") == 3
+
+
+def test_concurrent_loads_share_one_loader_call():
+    ttl_cache = TTLCache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "id-1"
+
+    async def run():
+        return await asyncio.gather(*(ttl_cache.get_or_load("key", loader) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["id-1"] * 5
+    assert len(calls) == 1
+    assert ttl_cache.misses == 1
+    assert ttl_cache.hits == 4
+
+
+def test_loader_errors_reach_every_waiter_and_are_not_cached():
+    ttl_cache = TTLCache()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("HTTP 500")
+
+    async def run():
+        return await asyncio.gather(
+            *(ttl_cache.get_or_load("key", failing) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert ttl_cache.get("key") is MISSING
+
+
+def test_cancelled_loader_lets_waiters_load_again():
+    ttl_cache = TTLCache()
+    started = []
+
+    async def loader():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return f"id-{len(started)}"
+
+    async def run():
+        leader = asyncio.create_task(ttl_cache.get_or_load("key", loader))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(ttl_cache.get_or_load("key", loader)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.gather(*waiters)
+        assert leader.cancelled()
+        return results
+
+    # Los que esperaban no reciben CancelledError: uno repite la carga y el resto la comparte
+    assert asyncio.run(run()) == ["id-2"] * 3
+    assert len(started) == 2
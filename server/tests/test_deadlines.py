@@ -0,0 +1,70 @@
+import pytest
+
+from core import deadlines
+from core.deadlines import Deadline, budget_for, parse_deadlines
+
+
+# ===== parse_deadlines =====
+
+def test_parse_deadlines():
+    assert parse_deadlines("a=10; b = 2.5 ;c=0") == {"a": 10.0, "b": 2.5, "c": 0.0}
+
+
+@pytest.mark.parametrize("spec", ["", ";", "a", "a=", "=5", " ; ;"])
+def test_parse_deadlines_skips_incomplete_items(spec):
+    assert parse_deadlines(spec) == {}
+
+
+def test_parse_deadlines_rejects_non_numeric_seconds():
+    with pytest.raises(ValueError):
+        parse_deadlines("a=soon")
+
+
+# ===== budget_for =====
+
+@pytest.fixture
+def overrides(monkeypatch):
+    monkeypatch.setattr(deadlines, "TOOL_DEADLINE", 120.0)
+    monkeypatch.setattr(deadlines, "TOOL_DEADLINE_GRACE", 30.0)
+    monkeypatch.setattr(deadlines, "_overrides", parse_deadlines("slow=300;free=0"))
+
+
+def test_budget_for_uses_override_or_default(overrides):
+    assert budget_for("list_projects", {}) == 120.0
+    assert budget_for("slow", {}) == 300.0
+    assert budget_for("free", {}) is None
+
+
+def test_budget_for_covers_tool_timeout_plus_grace(overrides):
+    assert budget_for("list_projects", {"timeout_seconds": 600}) == 630.0
+    assert budget_for("slow", {"timeout_seconds": 60}) == 300.0
+    assert budget_for("list_projects", {"timeout_seconds": "600"}) == 120.0
+
+
+# ===== Deadline =====
+
+def test_slow_step_reports_oldest_request_in_flight():
+    deadline = Deadline("tool", 60)
+    token = deadlines.activate(deadline)
+    try:
+        with deadlines.step("repos"):
+            with deadlines.upstream_call("GET repositories"):
+                with deadlines.upstream_call("GET policies"):
+                    assert deadline.in_flight == 2
+                    slow = deadline.slow_step()
+    finally:
+        deadlines.reset(token)
+
+    assert slow["step"] == "GET repositories"
+    assert slow["phase"] == "repos"
+    assert slow["in_flight"]
+    assert deadline.in_flight == 0
+    assert deadline.phase is None
+    assert deadline.slow_step()["step"] == "GET repositories"
+    assert not deadline.slow_step()["in_flight"]
+
+
+def test_without_active_deadline_helpers_are_noops():
+    assert deadlines.remaining() is None
+    with deadlines.step("x"), deadlines.upstream_call("GET x"):
+        pass
@@ -0,0 +1,125 @@
+import asyncio
+import importlib.util
+
+import httpx
+
+from core.http_client import AzureDevOpsClient
+
+BUILDS = "https://dev.azure.com/org/Web/_apis/build/builds"
+
+
+class ConcurrencyProbe:
+    """Transporte que cuenta las peticiones simultáneas por host."""
+
+    def __init__(self) -> None:
+        self.active: dict[str, int] = {}
+        self.peak: dict[str, int] = {}
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.active[host] = self.active.get(host, 0) + 1
+        self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+        try:
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"id": request.url.path.rsplit("/", 1)[-1]})
+        finally:
+            self.active[host] -= 1
+
+
+def test_concurrency_is_limited_per_host():
+    probe = ConcurrencyProbe()
+    client = AzureDevOpsClient(transport=httpx.MockTransport(probe), max_connections_per_host=2)
+
+    async def run():
+        async with client:
+            urls = [f"{BUILDS}/{i}" for i in range(8)]
+            urls += [f"https://vssps.dev.azure.com/org/_apis/graph/users/{i}" for i in range(8)]
+            return await asyncio.gather(*(client.get(url) for url in urls))
+
+    responses = asyncio.run(run())
+
+    assert [r.json()["id"] for r in responses[:8]] == [str(i) for i in range(8)]
+    assert probe.peak == {"dev.azure.com": 2, "vssps.dev.azure.com": 2}
+
+
+def test_pool_is_shared_and_recreated_after_close():
+    client = AzureDevOpsClient(transport=httpx.MockTransport(lambda r: httpx.Response(200)))
+
+    async def run():
+        first = client._ensure_client()
+        await client.get(f"{BUILDS}/1")
+        assert client._ensure_client() is first
+        await client.aclose()
+        assert client._client is None
+        # Una tool invocada fuera del lifespan crea el pool de forma perezosa
+        await client.get(f"{BUILDS}/2")
+        assert client._client is not None and client._client is not first
+        await client.aclose()
+
+    asyncio.run(run())
+
+
+def test_http2_requires_h2(monkeypatch):
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name: None)
+    assert AzureDevOpsClient(http2=True).http2 is False
+    assert AzureDevOpsClient(http2=False).http2 is False
+
+
+# ===== Agrupación de GETs idénticos =====
+
+class GatedTransport:
+    """Retiene las respuestas hasta que se abre ``gate``."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.gate = asyncio.Event()
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        call = self.calls
+        await self.gate.wait()
+        return httpx.Response(200, json={"call": call})
+
+
+def test_concurrent_identical_gets_share_one_call():
+    transport = GatedTransport()
+    client = AzureDevOpsClient(transport=httpx.MockTransport(transport))
+
+    async def run():
+        async with client:
+            tasks = [asyncio.create_task(client.get(f"{BUILDS}/1")) for _ in range(5)]
+            # Con otras credenciales no se comparte la respuesta
+            other = asyncio.create_task(client.get(f"{BUILDS}/1", headers={"Authorization": "Basic otro"}))
+            await asyncio.sleep(0.01)
+            transport.gate.set()
+            return await asyncio.gather(*tasks), await other
+
+    responses, other = asyncio.run(run())
+
+    assert transport.calls == 2
+    assert client.coalesced == 4
+    assert all(r.json() == {"call": 1} for r in responses)
+    assert other.status_code == 200
+
+
+def test_cancelled_leader_lets_followers_retry():
+    transport = GatedTransport()
+    client = AzureDevOpsClient(transport=httpx.MockTransport(transport))
+
+    async def run():
+        async with client:
+            leader = asyncio.create_task(client.get(f"{BUILDS}/1"))
+            await asyncio.sleep(0.01)
+            followers = [asyncio.create_task(client.get(f"{BUILDS}/1")) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            await asyncio.sleep(0.01)
+            transport.gate.set()
+            results = await asyncio.gather(*followers)
+            assert leader.cancelled()
+            return results
+
+    results = asyncio.run(run())
+
+    assert all(r.status_code == 200 for r in results)
+    assert client._inflight == {}
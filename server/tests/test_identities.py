@@ -0,0 +1,54 @@
+import asyncio
+
+import httpx
+
+from core.http_client import AzureDevOpsClient
+from core.identities import IdentityResolver
+
+IDENTITIES = {
+    "ana@acme.com": [
+        {"descriptor": "d-ana", "providerDisplayName": "Ana"},
+        {"descriptor": "d-ana-svc", "providerDisplayName": "Ana (servicio)"},
+        {"providerDisplayName": "sin descriptor"},
+    ],
+}
+
+
+def identity_resolver(calls, **kwargs):
+    async def handler(request):
+        email = request.url.params["filterValue"]
+        calls.append(email)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"value": IDENTITIES.get(email, [])})
+    return IdentityResolver(AzureDevOpsClient(transport=httpx.MockTransport(handler)), **kwargs)
+
+
+def test_concurrent_lookups_of_one_email_share_one_query():
+    calls = []
+    resolver = identity_resolver(calls)
+
+    async def run():
+        return await asyncio.gather(
+            resolver.descriptor("Ana@acme.com"),
+            resolver.descriptor(" ana@acme.com "),
+            resolver.descriptor("ana@acme.com", "Ana (servicio)"),
+        )
+
+    assert asyncio.run(run()) == ["d-ana", "d-ana", "d-ana-svc"]
+    assert calls == ["ana@acme.com"]
+
+
+def test_identity_without_matching_display_name():
+    resolver = identity_resolver([])
+    assert asyncio.run(resolver.descriptor("ana@acme.com", "Otra")) is None
+
+
+def test_unknown_email_is_cached_as_missing():
+    calls = []
+    resolver = identity_resolver(calls, negative_ttl=60)
+
+    async def run():
+        return [await resolver.lookup("nadie@acme.com"), await resolver.descriptor("nadie@acme.com")]
+
+    assert asyncio.run(run()) == [None, None]
+    assert calls == ["nadie@acme.com"]
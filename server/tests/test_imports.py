@@ -0,0 +1,192 @@
+import asyncio
+
+import httpx
+import pytest
+
+from core import imports, jobs
+from core.http_client import AzureDevOpsClient
+from core.imports import ImportFailed, ImportTimeout, describe_import, wait_for_import
+
+
+def import_request(status, step=None, error=None):
+    detailed = {"allSteps": ["Queued", "Cloning", "Pushing"], "currentStep": step} if step else {}
+    if error:
+        detailed["errorMessage"] = error
+    return {"importRequestId": 5, "status": status, "detailedStatus": detailed}
+
+
+def importer(*states):
+    """
+    Responde los estados de la importación en orden y repite el último. Un
+    entero responde ese código de error y una excepción se lanza como fallo
+    de red.
+    """
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        state = states[min(len(calls), len(states)) - 1]
+        if isinstance(state, Exception):
+            raise state
+        if isinstance(state, int):
+            return httpx.Response(state, text="error")
+        return httpx.Response(200, json=state)
+
+    # Sin reintentos del cliente: cada error llega al sondeo
+    return AzureDevOpsClient(transport=httpx.MockTransport(handler), max_retries=0), calls
+
+
+def wait(client, **kwargs):
+    updates = []
+    kwargs.setdefault("min_interval", 0)
+    kwargs.setdefault("max_interval", 0)
+    result = asyncio.run(wait_for_import(client, "Web", "repo-id", 5, on_update=updates.append, **kwargs))
+    return result, updates
+
+
+def test_describe_import():
+    assert describe_import(import_request("inProgress", step=2)) == "inProgress (paso 2/3: Cloning)"
+    assert describe_import(import_request("queued")) == "queued"
+
+
+def test_wait_reports_each_step_once():
+    client, calls = importer(
+        import_request("queued"),
+        import_request("inProgress", step=2),
+        import_request("inProgress", step=2),
+        import_request("completed"),
+    )
+
+    result, updates = wait(client)
+
+    assert result["status"] == "completed"
+    assert len(calls) == 4
+    assert [describe_import(u) for u in updates] == ["queued", "inProgress (paso 2/3: Cloning)", "completed"]
+
+
+def test_failed_import_raises_with_its_message():
+    client, _ = importer(import_request("inProgress", step=1), import_request("failed", error="auth"))
+    with pytest.raises(ImportFailed, match="auth"):
+        wait(client)
+
+    client, _ = importer(import_request("abandoned"))
+    with pytest.raises(ImportFailed, match="abandoned"):
+        wait(client)
+
+
+def test_transient_errors_keep_polling():
+    client, calls = importer(
+        import_request("inProgress", step=2),
+        httpx.ConnectError("connection reset"),
+        503,
+        import_request("completed"),
+    )
+
+    result, updates = wait(client)
+
+    assert result["status"] == "completed"
+    assert len(calls) == 4
+    assert [u["status"] for u in updates] == ["inProgress", "completed"]
+
+
+def test_auth_and_not_found_errors_end_the_wait():
+    for status in (401, 403, 404):
+        client, calls = importer(import_request("queued"), status)
+        with pytest.raises(httpx.HTTPStatusError):
+            wait(client)
+        assert len(calls) == 2
+
+
+def test_stuck_import_times_out(monkeypatch):
+    now = [0.0]
+
+    async def fake_sleep(delay):
+        now[0] += delay
+
+    monkeypatch.setattr(imports.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(imports.asyncio, "sleep", fake_sleep)
+    client, calls = importer(import_request("queued"))
+
+    with pytest.raises(ImportTimeout, match="queued"):
+        wait(client, min_interval=10, max_interval=40, max_wait=100)
+
+    # La última espera se recorta al tiempo que queda
+    assert now[0] == 100
+    assert len(calls) > 2
+
+    # Un estado que nunca se puede consultar también agota la espera
+    now[0] = 0.0
+    client, calls = importer(502)
+    with pytest.raises(ImportTimeout, match="unknown"):
+        wait(client, min_interval=10, max_interval=40, max_wait=100)
+    assert len(calls) > 2
+
+
+# ===== Jobs =====
+
+def test_job_lifecycle():
+    async def run():
+        gate = asyncio.Event()
+
+        async def work(job):
+            job.update("clonando", repository="web")
+            await gate.wait()
+
+        async def boom(job):
+            raise ImportFailed("sin acceso")
+
+        async with jobs.JobRegistry() as registry:
+            ok = registry.submit("import", "web", work)
+            failed = registry.submit("import", "api", boom)
+            await asyncio.sleep(0)
+            running = (ok.status, ok.detail, ok.result)
+            gate.set()
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            return registry, ok, failed, running
+
+    registry, ok, failed, running = asyncio.run(run())
+
+    assert running == (jobs.RUNNING, "clonando", {"repository": "web"})
+    assert ok.status == jobs.SUCCEEDED
+    assert (failed.status, failed.error) == (jobs.FAILED, "sin acceso")
+    assert registry.get(ok.id) is ok
+    assert {j.id for j in registry.list("import")} == {ok.id, failed.id}
+    assert registry.list("other") == []
+
+
+def test_semaphore_keeps_jobs_pending_and_close_cancels():
+    async def run():
+        async def forever(job):
+            await asyncio.Event().wait()
+
+        registry = jobs.JobRegistry()
+        semaphore = asyncio.Semaphore(1)
+        first = registry.submit("import", "a", forever, semaphore)
+        second = registry.submit("import", "b", forever, semaphore)
+        await asyncio.sleep(0)
+        states = (first.status, second.status)
+        await registry.__aexit__(None, None, None)
+        return states, first, second
+
+    states, first, second = asyncio.run(run())
+
+    assert states == (jobs.RUNNING, jobs.PENDING)
+    assert first.status == second.status == jobs.CANCELLED
+
+
+def test_finished_jobs_are_pruned_after_retention():
+    async def run():
+        async def noop(job):
+            pass
+
+        registry = jobs.JobRegistry(retention=0)
+        job = registry.submit("import", "a", noop)
+        await asyncio.sleep(0)
+        job.updated_at -= 1
+        return registry.list(), job
+
+    listed, job = asyncio.run(run())
+
+    assert job.status == jobs.SUCCEEDED
+    assert listed == []
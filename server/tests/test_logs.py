@@ -0,0 +1,138 @@
+import asyncio
+import gzip
+
+import httpx
+import pytest
+
+from core.http_client import AzureDevOpsClient
+from core.logs import ErrorSelector, PipelineLogs, RangeSelector, TailSelector, _scan_file
+
+
+def feed(selector, lines):
+    for number, line in enumerate(lines, 1):
+        if not selector.feed(number, line):
+            break
+    return selector
+
+
+LOG = [
+    "start",                  # 1
+    "step a",                 # 2
+    "##[error]first",         # 3
+    "after first",            # 4
+    "step b",                 # 5
+    "step c",                 # 6
+    "step d",                 # 7
+    "before second",          # 8
+    "##[error]second",        # 9
+    "##[error]third",         # 10
+    "after third",            # 11
+    "end",                    # 12
+]
+
+
+# ===== ErrorSelector =====
+
+def test_errors_with_context_and_block_separators():
+    selector = feed(ErrorSelector(context=1, limit=100), LOG)
+
+    assert selector.errors == 3
+    assert not selector.truncated
+    assert selector.lines == [
+        (2, "step a"), (3, "##[error]first"), (4, "after first"),
+        None,
+        (8, "before second"), (9, "##[error]second"), (10, "##[error]third"), (11, "after third"),
+    ]
+
+
+def test_overlapping_context_is_merged():
+    selector = feed(ErrorSelector(context=3, limit=100), LOG)
+    numbers = [entry[0] for entry in selector.lines if entry is not None]
+
+    # Los contextos de 3 líneas se tocan: un solo bloque sin duplicados
+    assert None not in selector.lines
+    assert numbers == list(range(1, 13))
+
+
+def test_without_context_only_error_lines():
+    selector = feed(ErrorSelector(context=0, limit=100), LOG)
+    assert selector.lines == [(3, "##[error]first"), None, (9, "##[error]second"), (10, "##[error]third")]
+
+
+def test_limit_keeps_counting_errors():
+    selector = feed(ErrorSelector(context=0, limit=1), LOG)
+    assert selector.lines == [(3, "##[error]first")]
+    assert selector.errors == 3
+    assert selector.truncated
+
+
+# ===== Otros selectores =====
+
+def test_range_selector_stops_at_limit_with_next_line():
+    selector = feed(RangeSelector(start=3, end=None, limit=2), LOG)
+    assert selector.lines == [(3, "##[error]first"), (4, "after first")]
+    assert selector.next_line == 5
+
+
+def test_tail_selector_keeps_last_lines():
+    assert feed(TailSelector(2), LOG).lines == [(11, "after third"), (12, "end")]
+
+
+def test_scan_file_reads_gzip_from_start_line(tmp_path):
+    path = tmp_path / "log.gz"
+    with gzip.open(path, "wt", encoding="utf-8", newline="") as f:
+        f.write("\r\n".join(LOG) + "\r\n")
+
+    selector = TailSelector(100)
+    _scan_file(str(path), selector, start=11)
+    assert selector.lines == [(11, "after third"), (12, "end")]
+
+
+# ===== PipelineLogs =====
+
+class LogBody(httpx.AsyncByteStream):
+    """Cuerpo en streaming que registra si se cerró."""
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.closed = False
+
+    async def __aiter__(self):
+        for line in self.lines:
+            yield f"{line}\r\n".encode()
+
+    async def aclose(self):
+        self.closed = True
+
+
+def test_scan_stopping_early_closes_the_stream(tmp_path):
+    body = LogBody(LOG)
+    client = AzureDevOpsClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, stream=body)))
+    selector = RangeSelector(start=1, end=None, limit=2)
+
+    async def scan():
+        await PipelineLogs(client, cache_dir=str(tmp_path)).scan("Web", 1, 5, selector, completed=False)
+        # Cerrada al volver de scan, no al finalizar el bucle de eventos
+        return body.closed
+
+    assert asyncio.run(scan())
+    assert selector.lines == [(1, "start"), (2, "step a")]
+
+
+def test_failed_download_can_be_retried(tmp_path):
+    statuses = [500, 200]
+
+    def handler(request):
+        status = statuses.pop(0)
+        return httpx.Response(status, text="\n".join(LOG) if status == 200 else "boom")
+
+    logs = PipelineLogs(AzureDevOpsClient(transport=httpx.MockTransport(handler), max_retries=0), cache_dir=str(tmp_path))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(logs._download("Web", 1, 5))
+    assert logs._downloads == {}
+
+    path = asyncio.run(logs._download("Web", 1, 5))
+    assert logs._downloads == {}
+    with gzip.open(path, "rt") as f:
+        assert f.read().splitlines() == LOG
@@ -0,0 +1,137 @@
+import asyncio
+import json
+
+import httpx
+
+from core.http_client import AzureDevOpsClient
+from core.metadata import GIT_NAMESPACE_KEY, MetadataCache
+
+NAMESPACES = {"value": [
+    {"displayName": "Analytics", "namespaceId": "ns-0", "actions": []},
+    {"displayName": "Git Repositories", "namespaceId": "ns-git", "actions": [
+        {"name": "GenericRead", "displayName": "Read", "bit": 2},
+        {"name": "GenericContribute", "displayName": "Contribute", "bit": 4},
+    ]},
+]}
+POLICY_TYPES = {"value": [{"id": "t-1", "displayName": "Required reviewers", "description": "..."}]}
+
+
+def metadata_client(calls):
+    def handler(request):
+        calls.append(request.url.path)
+        if request.url.path.endswith("securitynamespaces"):
+            return httpx.Response(200, json=NAMESPACES)
+        return httpx.Response(200, json=POLICY_TYPES)
+    return AzureDevOpsClient(transport=httpx.MockTransport(handler))
+
+
+def test_metadata_is_fetched_once_and_persisted(tmp_path):
+    calls = []
+    metadata = MetadataCache(metadata_client(calls), cache_dir=str(tmp_path))
+
+    async def run():
+        return [
+            await metadata.git_permission_bit("Contribute"),
+            await metadata.git_permission_bit("Read"),
+            await metadata.git_permission_bit("Nope"),
+            await metadata.policy_type_id("Web", "Required reviewers"),
+            await metadata.policy_type_id("web", "Required reviewers"),
+        ]
+
+    assert asyncio.run(run()) == [("ns-git", 4), ("ns-git", 2), ("ns-git", None), "t-1", "t-1"]
+    assert calls == ["/org/_apis/securitynamespaces", "/org/Web/_apis/policy/types"]
+
+    # Solo se guarda lo necesario del catálogo
+    saved = json.loads((tmp_path / "metadata-org.json").read_text())
+    assert saved[GIT_NAMESPACE_KEY]["value"]["namespaceId"] == "ns-git"
+    assert saved["policytypes:web"]["value"] == [{"id": "t-1", "displayName": "Required reviewers"}]
+
+    # Un proceso nuevo arranca con los metadatos del disco
+    calls.clear()
+    restarted = MetadataCache(metadata_client(calls), cache_dir=str(tmp_path))
+    restarted.load()
+    assert asyncio.run(restarted.git_permission_bit("Contribute")) == ("ns-git", 4)
+    assert calls == []
+
+
+def test_expired_entries_are_served_and_refreshed_in_background(tmp_path):
+    calls = []
+    metadata = MetadataCache(metadata_client(calls), cache_dir=str(tmp_path), ttl=60, refresh_interval=0.01)
+    (tmp_path / "metadata-org.json").write_text(json.dumps({
+        GIT_NAMESPACE_KEY: {"fetched_at": 0, "value": {"namespaceId": "old", "actions": []}},
+    }))
+
+    async def run():
+        async with metadata:
+            stale = await metadata.git_permission_bit("Contribute")
+            await asyncio.sleep(0.05)
+            return stale, await metadata.git_permission_bit("Contribute")
+
+    assert asyncio.run(run()) == (("old", None), ("ns-git", 4))
+    assert calls == ["/org/_apis/securitynamespaces"]
+
+
+def test_unreadable_cache_file_starts_empty(tmp_path):
+    (tmp_path / "metadata-org.json").write_text("{no es json")
+    metadata = MetadataCache(metadata_client([]), cache_dir=str(tmp_path))
+    metadata.load()
+    assert metadata._entries == {}
+
+
+def test_cancelled_fetch_lets_waiters_fetch_again(tmp_path):
+    metadata = MetadataCache(AzureDevOpsClient(), cache_dir=str(tmp_path))
+    started = []
+
+    async def fetch():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return {"namespaceId": f"ns-{len(started)}", "actions": []}
+
+    async def run():
+        leader = asyncio.create_task(metadata._fetch(GIT_NAMESPACE_KEY, fetch))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(metadata._fetch(GIT_NAMESPACE_KEY, fetch)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await asyncio.gather(*waiters)
+
+    results = asyncio.run(run())
+    assert {r["namespaceId"] for r in results} == {"ns-2"}
+    assert len(started) == 2
+
+
+def test_missing_namespace_is_not_cached(tmp_path):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(200, json={"value": []} if len(calls) == 1 else NAMESPACES)
+
+    client = AzureDevOpsClient(transport=httpx.MockTransport(handler), cache_max_bytes=0)
+    metadata = MetadataCache(client, cache_dir=str(tmp_path))
+
+    async def run():
+        missing = await metadata.git_permission_bit("Contribute")
+        saved = (tmp_path / "metadata-org.json").exists()
+        return missing, saved, await metadata.git_permission_bit("Contribute")
+
+    # El "no encontrado" no se guarda: la siguiente llamada vuelve a consultar
+    assert asyncio.run(run()) == ((None, None), False, ("ns-git", 4))
+    assert len(calls) == 2
+
+
+def test_save_failure_still_returns_the_value(tmp_path, caplog):
+    # Un fichero donde debería ir el directorio: no se puede crear la caché
+    blocked = tmp_path / "blocked"
+    blocked.write_text("")
+    calls = []
+    metadata = MetadataCache(metadata_client(calls), cache_dir=str(blocked / "cache"))
+
+    async def run():
+        waiter = asyncio.create_task(metadata.git_permission_bit("Contribute"))
+        first = await metadata.git_permission_bit("Contribute")
+        return first, await waiter, await metadata.git_permission_bit("Read")
+
+    assert asyncio.run(run()) == (("ns-git", 4), ("ns-git", 4), ("ns-git", 2))
+    assert calls == ["/org/_apis/securitynamespaces"]
+    assert "No se pudo guardar la caché de metadatos" in caplog.text
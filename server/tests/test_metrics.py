@@ -0,0 +1,66 @@
+import time
+
+import httpx
+import pytest
+
+from core import metrics
+from core.metrics import Histogram, Registry, endpoint_template, observe_upstream
+
+
+# ===== endpoint_template =====
+
+@pytest.mark.parametrize("path, template", [
+    ("/acme/Web/_apis/build/builds/42/logs/3", "/{org}/{project}/_apis/build/builds/{id}/logs/{id}"),
+    ("/acme/_apis/projects", "/{org}/_apis/projects"),
+    ("acme/Web/_apis/git/repositories/0f1e2d3c-4b5a-6978-8a9b-0c1d2e3f4a5b/pullrequests",
+     "/{org}/{project}/_apis/git/repositories/{id}/pullrequests"),
+    ("/acme/_apis/graph/users/aad.ZmFrZS1kZXNjcmlwdG9y", "/{org}/_apis/graph/users/{id}"),
+    ("/acme/Web/Team/_apis/work/teamsettings", "/{org}/{project}/{scope}/_apis/work/teamsettings"),
+    ("/acme/Web/_apis/git/repositories/web-app", "/{org}/{project}/_apis/git/repositories/web-app"),
+])
+def test_endpoint_template(path, template):
+    assert endpoint_template(path) == template
+
+
+def test_endpoint_template_without_apis_segment():
+    assert endpoint_template("/acme/Web") == "/{org}/{project}"
+
+
+# ===== Registro =====
+
+def test_observe_upstream_groups_by_template_and_ignores_query():
+    labels = ("GET", "/{org}/{project}/_apis/build/builds/{id}")
+    before = metrics.UPSTREAM_REQUESTS._values.get((*labels, 200), 0)
+
+    started = time.perf_counter()
+    observe_upstream("GET", "https://dev.azure.com/acme/Web/_apis/build/builds/1?api-version=7.1", 200, started)
+    observe_upstream("GET", httpx.URL("https://dev.azure.com/acme/Web/_apis/build/builds/2"), 200, started)
+
+    assert metrics.UPSTREAM_REQUESTS._values[(*labels, 200)] == before + 2
+
+
+def test_tool_status_records_last_error():
+    started = time.perf_counter()
+    with metrics.tool_status() as status:
+        observe_upstream("GET", "https://dev.azure.com/acme/_apis/projects", 200, started)
+        assert status[0] is None
+        observe_upstream("GET", "https://dev.azure.com/acme/_apis/projects", 404, started)
+        observe_upstream("GET", "https://dev.azure.com/acme/_apis/projects", "error", started)
+    assert status[0] == "error"
+
+
+def test_histogram_exposition_is_cumulative():
+    registry = Registry()
+    histogram = registry.register(Histogram("latency_seconds", "Latencia", ("tool",), (0.1, 1.0)))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(('a"b',), value)
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP latency_seconds Latencia", "# TYPE latency_seconds histogram"]
+    assert lines[2:] == [
+        'latency_seconds_bucket{tool="a\\"b",le="0.1"} 1',
+        'latency_seconds_bucket{tool="a\\"b",le="1.0"} 3',
+        'latency_seconds_bucket{tool="a\\"b",le="+Inf"} 4',
+        'latency_seconds_sum{tool="a\\"b"} 6.05',
+        'latency_seconds_count{tool="a\\"b"} 4',
+    ]
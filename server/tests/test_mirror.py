@@ -0,0 +1,203 @@
+import asyncio
+import json
+import re
+
+import httpx
+import pytest
+
+from core import mirror
+from core.http_client import AzureDevOpsClient
+from core.mirror import WorkItemMirror
+
+_CONDITION_RE = re.compile(r"\[([\w.]+)\] (>=|<=|<>|=|>|<) '((?:[^']|'')*)'")
+_COMPARE = {
+    "=": lambda a, b: a == b, "<>": lambda a, b: a != b, ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b, "<": lambda a, b: a < b, "<=": lambda a, b: a <= b,
+}
+
+
+class AzureBoardsStub:
+    """Work items en memoria servidos por ``wit/wiql`` y ``wit/workitemsbatch``."""
+
+    def __init__(self) -> None:
+        self.items: dict[int, dict] = {}
+        self.queries: list[str] = []
+
+    def put(self, id: int, changed: str, **fields) -> None:
+        self.items[id] = {"System.Id": id, "System.ChangedDate": changed, **fields}
+
+    def _matches(self, fields: dict, conditions: list[tuple]) -> bool:
+        for name, operator, value in conditions:
+            actual = fields.get(name)
+            if name == "System.TeamProject":
+                continue
+            if name == "System.Id":
+                actual, value = int(actual), int(value)
+            if actual is None or not _COMPARE[operator](actual, value):
+                return False
+        return True
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        if request.url.path.endswith("/wit/wiql"):
+            query = body["query"]
+            self.queries.append(query)
+            conditions = [(f, op, v.replace("''", "'")) for f, op, v in _CONDITION_RE.findall(query)]
+            order = re.findall(r"\[([\w.]+)\] (?:ASC|DESC)", query.partition("ORDER BY")[2])
+            matched = [f for f in self.items.values() if self._matches(f, conditions)]
+            matched.sort(key=lambda f: tuple(f[name] for name in order))
+            top = int(request.url.params.get("$top", len(matched)))
+            return httpx.Response(200, json={"workItems": [{"id": f["System.Id"]} for f in matched[:top]]})
+        return httpx.Response(200, json={"value": [
+            {"id": i, "fields": {k: v for k, v in self.items[i].items() if k in body["fields"]}}
+            for i in body["ids"] if i in self.items
+        ]})
+
+
+@pytest.fixture
+def boards():
+    return AzureBoardsStub()
+
+
+@pytest.fixture
+def work_item_mirror(boards):
+    client = AzureDevOpsClient(transport=httpx.MockTransport(boards))
+    item_mirror = WorkItemMirror(client, projects=["Web"], db_path=":memory:", max_age=60)
+    yield item_mirror
+    if item_mirror._db is not None:
+        item_mirror._db.close()
+
+
+def person(name: str) -> dict:
+    return {"displayName": name.title(), "uniqueName": f"{name}@acme.com"}
+
+
+# ===== Sincronización =====
+
+def test_sync_is_incremental_from_the_watermark(boards, work_item_mirror):
+    boards.put(1, "2025-01-01T10:00:00Z", **{"System.Title": "uno", "System.State": "New"})
+    boards.put(2, "2025-01-02T10:00:00Z", **{"System.Title": "dos", "System.State": "New"})
+
+    assert asyncio.run(work_item_mirror.sync("Web")) == 2
+
+    boards.put(2, "2025-01-03T10:00:00Z", **{"System.Title": "dos", "System.State": "Done"})
+    assert asyncio.run(work_item_mirror.sync("Web")) == 1
+    assert "[System.ChangedDate] >= '2025-01-02T10:00:00Z'" in boards.queries[-1]
+
+    items = asyncio.run(work_item_mirror.query("Web", state="done"))
+    assert [i["id"] for i in items] == [2]
+    assert asyncio.run(work_item_mirror.fresh_age("web")) is not None
+    assert asyncio.run(work_item_mirror.fresh_age("Otro")) is None
+
+
+def test_sync_walks_batches(boards, work_item_mirror, monkeypatch):
+    monkeypatch.setattr(mirror, "SYNC_BATCH_SIZE", 2)
+    for i in range(1, 6):
+        boards.put(i, f"2025-01-0{i}T10:00:00Z", **{"System.Title": f"wi {i}"})
+
+    assert asyncio.run(work_item_mirror.sync("Web")) >= 5
+    assert len(asyncio.run(work_item_mirror.query("Web"))) == 5
+
+
+def test_sync_pages_through_items_changed_at_the_same_time(boards, work_item_mirror, monkeypatch):
+    monkeypatch.setattr(mirror, "SYNC_BATCH_SIZE", 2)
+    for i in range(1, 6):
+        boards.put(i, "2025-01-01T10:00:00Z", **{"System.Title": f"wi {i}"})
+    boards.put(6, "2025-01-02T10:00:00Z", **{"System.Title": "wi 6"})
+
+    asyncio.run(work_item_mirror.sync("Web"))
+
+    # Más empates que el tamaño de lote: se paginan por id sin cortar el sync
+    assert sorted(ids(asyncio.run(work_item_mirror.query("Web")))) == [1, 2, 3, 4, 5, 6]
+    assert any("[System.Id] > '2'" in q for q in boards.queries)
+    assert "[System.ChangedDate] > '2025-01-01T10:00:00Z'" in boards.queries[-1]
+
+
+# ===== Consultas =====
+
+@pytest.fixture
+def synced(boards, work_item_mirror):
+    boards.put(1, "2025-01-01T00:00:00Z", **{
+        "System.WorkItemType": "Bug", "System.State": "Active", "System.AssignedTo": person("ana"),
+        "System.AreaPath": "Web\\Apps", "System.Tags": "api; urgent",
+    })
+    boards.put(2, "2025-01-02T00:00:00Z", **{
+        "System.WorkItemType": "Task", "System.State": "Active", "System.AssignedTo": person("luis"),
+        "System.AreaPath": "Web\\Apps\\Mobile", "System.Tags": "rapid",
+    })
+    boards.put(3, "2025-01-03T00:00:00Z", **{
+        "System.WorkItemType": "Bug", "System.State": "Closed",
+        "System.AreaPath": "Web\\AppsOld", "System.Tags": "api",
+    })
+    asyncio.run(work_item_mirror.sync("Web"))
+    return work_item_mirror
+
+
+def ids(items):
+    return [i["id"] for i in items]
+
+
+def test_query_filters(synced):
+    query = lambda **kw: ids(asyncio.run(synced.query("web", **kw)))
+
+    assert query() == [3, 2, 1]
+    assert query(work_item_type="bug") == [3, 1]
+    assert query(state="Active", limit=1) == [2]
+    assert query(assigned_to="ANA@acme.com") == [1]
+    assert query(assigned_to="luis") == [2]
+    assert query(changed_since="2025-01-02") == [3, 2]
+
+
+def test_area_path_behaves_like_under(synced):
+    # La ruta exacta y sus sub-rutas, pero no las que solo comparten prefijo
+    assert ids(asyncio.run(synced.query("Web", area_path="web\\apps"))) == [2, 1]
+    assert ids(asyncio.run(synced.query("Web", area_path="Web\\Apps\\Mobile"))) == [2]
+
+
+def test_tags_match_whole_tags(synced):
+    assert ids(asyncio.run(synced.query("Web", tags=["api"]))) == [3, 1]
+    assert ids(asyncio.run(synced.query("Web", tags=["api", "urgent"]))) == [1]
+    assert ids(asyncio.run(synced.query("Web", tags=["ap%"]))) == []
+
+
+def test_rows_keep_the_api_shape(synced):
+    item = asyncio.run(synced.query("Web", assigned_to="ana@acme.com"))[0]
+    assert item["fields"]["System.AssignedTo"] == {"displayName": "Ana", "uniqueName": "ana@acme.com"}
+    assert item["fields"]["System.Tags"] == "api; urgent"
+
+
+# ===== Búsqueda de texto completo =====
+
+def test_fts_query_quotes_terms_and_prefixes_the_last():
+    assert mirror._fts_query('login "OR" fail') == '"login" "OR" "fail"*'
+    assert mirror._fts_query("NEAR(a b) -x") == '"NEAR" "a" "b" "x"*'
+    assert mirror._fts_query("  ¿? ") is None
+
+
+def test_search_ranks_by_title_and_follows_updates(boards, work_item_mirror):
+    boards.put(1, "2025-01-01T00:00:00Z", **{
+        "System.Title": "Error de autenticación en login",
+        "System.Description": "<div>El <b>token</b> caduca &amp; falla</div>",
+    })
+    boards.put(2, "2025-01-02T00:00:00Z", **{
+        "System.Title": "Mejorar rendimiento",
+        "System.Description": "<p>Revisar el login de la API</p>",
+    })
+    asyncio.run(work_item_mirror.sync("Web"))
+    if not work_item_mirror.search_available:
+        pytest.skip("SQLite sin FTS5")
+
+    search = lambda text, **kw: ids(asyncio.run(work_item_mirror.search(text, **kw)))
+
+    # El título pesa más que la descripción; sin acentos y con prefijo
+    assert search("login") == [1, 2]
+    assert search("autenticacion") == [1]
+    assert search("tok") == [1]
+    assert search("login", project="Otro") == []
+    assert "[token]" in asyncio.run(work_item_mirror.search("token"))[0]["snippet"]
+
+    # Los triggers mantienen el índice al actualizar filas
+    boards.put(1, "2025-01-03T00:00:00Z", **{"System.Title": "Renombrado", "System.Description": ""})
+    asyncio.run(work_item_mirror.sync("Web"))
+    assert search("autenticacion") == []
+    assert search("renombrado") == [1]
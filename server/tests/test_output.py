@@ -0,0 +1,98 @@
+import json
+
+from core.output import OutputBudget, _truncate_json, _truncate_text, project, record_size, render
+
+RUNS = {
+    "project": "Web",
+    "runs": [
+        {"id": 1, "name": "a", "result": {"status": "ok", "code": 0}},
+        {"id": 2, "name": "b", "result": None},
+    ],
+}
+
+
+# ===== project =====
+
+def test_project_reduces_records_and_keeps_other_keys():
+    assert project(RUNS, ["id", "result.status"]) == {
+        "project": "Web",
+        "runs": [{"id": 1, "result": {"status": "ok"}}, {"id": 2}],
+    }
+
+
+def test_project_keeps_empty_lists_and_the_cursor():
+    empty = {"count": 0, "repositories": [], "next_cursor": None}
+    assert project(empty, ["name"]) == empty
+    # Las listas de valores simples se conservan tal cual
+    assert project({"branches": ["main"], "plan": [{"name": "a", "x": 1}]}, ["name"]) == {
+        "branches": ["main"], "plan": [{"name": "a"}],
+    }
+
+
+def test_project_without_lists_projects_the_result_itself():
+    assert project({"id": 7, "name": "x", "url": "u"}, ["id", "missing"]) == {"id": 7}
+
+
+# ===== _truncate_json =====
+
+def test_truncate_json_keeps_short_output():
+    assert json.loads(_truncate_json(RUNS, "compact", 10_000)) == RUNS
+
+
+def test_truncate_json_drops_last_records_of_largest_list():
+    data = {"project": "Web", "items": [{"id": i, "name": "x" * 20} for i in range(100)], "tags": ["a"]}
+    text = _truncate_json(data, "compact", 600)
+    result = json.loads(text)
+
+    assert len(text) <= 600
+    kept = len(result["items"])
+    assert 0 < kept < 100
+    assert result["items"] == data["items"][:kept]
+    assert result["tags"] == ["a"]
+    assert result["truncated"]["items"] == {"returned": kept, "total": 100}
+    assert "page_size" in result["truncated"]["hint"]
+
+
+def test_truncate_json_without_lists_returns_preview():
+    text = _truncate_json({"log": "x" * 500}, "json", 100)
+    result = json.loads(text)
+    assert result["truncated"]["chars"] > 100
+    assert result["preview"].startswith("{")
+
+
+def test_truncate_text_cuts_whole_lines():
+    text = "\n".join(f"línea {i}" for i in range(100))
+    cut = _truncate_text(text, 50)
+    lines = cut.splitlines()
+    assert lines[0] == "línea 0"
+    assert lines[-1].startswith("… (salida truncada")
+    assert all(line in text.splitlines() for line in lines[:-1])
+
+
+# ===== render =====
+
+def test_render_compact_prunes_and_projects():
+    text = render(RUNS, lambda d: "texto", "compact", fields=["id", "result"])
+    assert text == '{"project":"Web","runs":[{"id":1,"result":{"status":"ok","code":0}},{"id":2}]}'
+
+
+def test_render_text_and_invalid_format():
+    assert render(RUNS, lambda d: f"📦 {d['project']}", "TEXT") == "📦 Web"
+    assert render(RUNS, lambda d: "", "yaml").startswith("❌")
+
+
+# ===== OutputBudget =====
+
+def test_budget_accepts_first_page_and_refuses_pages_that_do_not_fit():
+    page = [{"id": i} for i in range(10)]
+    budget = OutputBudget(max_chars=record_size(page[0]) * 15)
+
+    assert budget.take(page)
+    assert not budget.overflowed
+    assert not budget.take(page)
+
+
+def test_budget_overflows_when_first_page_is_too_large():
+    budget = OutputBudget(max_chars=5)
+    assert budget.take([{"id": 1}, {"id": 2}])
+    assert budget.overflowed
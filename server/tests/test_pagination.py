@@ -0,0 +1,64 @@
+import asyncio
+
+import httpx
+
+from core.http_client import AzureDevOpsClient
+from core.pagination import iter_items, iter_pages
+
+URL = "https://dev.azure.com/org/_apis/projects?api-version=7.1&stateFilter=wellFormed"
+
+
+def paged_client(total, requests):
+    """Listado de ``total`` elementos que pagina con ``$top`` y continuation token."""
+
+    def handler(request):
+        params = request.url.params
+        requests.append(dict(params))
+        start = int(params.get("continuationToken", 0))
+        top = int(params.get("$top", total))
+        end = min(start + top, total)
+        headers = {"x-ms-continuationtoken": str(end)} if end < total else {}
+        return httpx.Response(200, headers=headers, json={"value": [{"id": i} for i in range(start, end)]})
+
+    return AzureDevOpsClient(transport=httpx.MockTransport(handler))
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+def test_iter_items_walks_every_page_keeping_url_query():
+    requests = []
+    client = paged_client(7, requests)
+
+    items = asyncio.run(collect(iter_items(client, URL, {}, page_size=3)))
+
+    assert [i["id"] for i in items] == list(range(7))
+    assert [r.get("continuationToken") for r in requests] == [None, "3", "6"]
+    assert all(r["api-version"] == "7.1" and r["stateFilter"] == "wellFormed" for r in requests)
+    assert all(r["$top"] == "3" for r in requests)
+
+
+def test_iter_pages_resumes_from_cursor_and_can_stop_after_one_page():
+    requests = []
+    client = paged_client(10, requests)
+
+    async def first_page():
+        async for page in iter_pages(client, URL, {}, page_size=4, cursor="4"):
+            return page
+
+    page = asyncio.run(first_page())
+    assert [i["id"] for i in page.items] == [4, 5, 6, 7]
+    assert page.continuation_token == "8"
+    assert len(requests) == 1
+
+
+def test_unpaginated_endpoint_returns_a_single_page():
+    requests = []
+    client = paged_client(5, requests)
+
+    pages = asyncio.run(collect(iter_pages(client, URL, {}, page_size=None)))
+
+    assert len(pages) == 1
+    assert pages[0].continuation_token is None
+    assert "$top" not in requests[0]
@@ -0,0 +1,117 @@
+import asyncio
+
+import httpx
+
+from core.http_client import AzureDevOpsClient
+from core.pipelines import PipelineIndex, build_duration, format_duration, latest_builds, normalize_folder
+
+
+def test_latest_builds_in_concurrent_chunks():
+    requests = []
+
+    def handler(request):
+        params = request.url.params
+        requests.append(params)
+        builds = []
+        for definition in params["definitions"].split(","):
+            definition = int(definition)
+            if definition % 10 == 0:
+                continue  # sin ejecuciones
+            builds.append({"id": definition * 100, "definition": {"id": definition},
+                           "queueTime": "2025-01-01T10:00:00Z"})
+            if definition == 1:
+                # Una ejecución más antigua fuera de orden no reemplaza a la última
+                builds.append({"id": 1, "definition": {"id": 1}, "queueTime": "2024-12-31T10:00:00Z"})
+        return httpx.Response(200, json={"value": builds})
+
+    client = AzureDevOpsClient(transport=httpx.MockTransport(handler))
+    latest = asyncio.run(latest_builds(client, "Web", list(range(1, 121)), concurrency=2))
+
+    assert len(requests) == 3
+    assert all(r["maxBuildsPerDefinition"] == "1" for r in requests)
+    assert sorted(len(r["definitions"].split(",")) for r in requests) == [20, 50, 50]
+    assert len(latest) == 108
+    assert latest[1]["id"] == 100
+    assert 10 not in latest
+
+
+def test_latest_builds_without_definitions():
+    client = AzureDevOpsClient(transport=httpx.MockTransport(lambda r: httpx.Response(500)))
+    assert asyncio.run(latest_builds(client, "Web", [])) == {}
+
+
+def test_dates_and_durations():
+    assert build_duration({"startTime": "2025-01-01T10:00:00Z", "finishTime": "2025-01-01T10:02:05Z"}) == 125
+    # La API devuelve hasta 7 decimales
+    assert build_duration({
+        "startTime": "2025-01-01T10:00:00.1234567Z", "finishTime": "2025-01-01T10:00:01.6234567Z",
+    }) == 1.5
+    assert build_duration({"queueTime": "2025-01-01T10:00:00Z"}) is None
+    assert [format_duration(s) for s in (None, 42, 125, 7260)] == ["-", "42s", "2m05s", "2h01m"]
+
+
+# ===== PipelineIndex =====
+
+def pipelines_stub(pipelines):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(200, json={"value": pipelines})
+
+    handler.calls = calls
+    return handler
+
+
+def test_normalize_folder():
+    assert [normalize_folder(f) for f in (None, "", "\\", "/a/b/", "\\a\\b", "a//b")] == [
+        "\\", "\\", "\\", "\\a\\b", "\\a\\b", "\\a\\b",
+    ]
+
+
+def test_index_finds_by_folder_and_name_with_one_listing():
+    handler = pipelines_stub([
+        {"id": 1, "name": "api-ci", "folder": "\\"},
+        {"id": 2, "name": "api-ci", "folder": "\\services\\api"},
+    ])
+    index = PipelineIndex(AzureDevOpsClient(transport=httpx.MockTransport(handler)), ttl=60)
+
+    async def run():
+        return (
+            await index.find("Web", "API-CI"),
+            await index.find("web", "api-ci", "services/API"),
+            await index.find("Web", "api-ci", "other"),
+            len(await index.pipelines("Web")),
+        )
+
+    root, nested, missing, count = asyncio.run(run())
+
+    assert (root["id"], nested["id"], missing, count) == (1, 2, None, 2)
+    assert len(handler.calls) == 1
+
+
+def test_remember_and_forget():
+    handler = pipelines_stub([{"id": 1, "name": "api-ci", "folder": "\\"}])
+    index = PipelineIndex(AzureDevOpsClient(transport=httpx.MockTransport(handler)), ttl=60)
+
+    async def run():
+        await index.pipelines("Web")
+        # Un pipeline recién creado se añade sin volver a listar
+        index.remember("Web", {"id": 9, "name": "web-ci", "folder": "\\apps"})
+        created = await index.find("Web", "web-ci", "\\apps")
+        calls = len(handler.calls)
+        index.forget("Web")
+        # Tras olvidar el proyecto el índice se reconstruye desde el listado
+        return created, calls, await index.find("Web", "web-ci", "\\apps")
+
+    created, calls, after_forget = asyncio.run(run())
+
+    assert created["id"] == 9
+    assert calls == 1
+    assert after_forget is None
+
+
+def test_lock_is_shared_per_pipeline():
+    index = PipelineIndex(AzureDevOpsClient(transport=httpx.MockTransport(pipelines_stub([]))))
+    assert index.lock("Web", "API-CI", "/a") is index.lock("web", "api-ci", "\\a")
+    assert index.lock("Web", "api-ci") is not index.lock("Web", "api-ci", "a")
@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from core.http_client import AzureDevOpsClient
+from core.output import OutputBudget, record_size
+from tools import projects as project_tools
+from tools.projects import register_project_tools
+
+PROJECTS = [
+    {"id": f"p-{i:02}", "name": f"project-{i:02}", "state": "wellFormed", "url": f"https://x/p-{i:02}"}
+    for i in range(30)
+]
+# Tamaño de un proyecto en la salida
+RECORD = record_size({k: PROJECTS[0][k] for k in ("id", "name", "state", "url")})
+
+
+class ProjectsStub:
+    """Pagina con ``$top`` (máximo 10 por página) y un token con el índice siguiente."""
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request.url.params)
+        start = int(request.url.params.get("continuationToken", 0))
+        end = min(start + min(int(request.url.params["$top"]), 10), len(PROJECTS))
+        headers = {"x-ms-continuationtoken": str(end)} if end < len(PROJECTS) else {}
+        return httpx.Response(200, headers=headers, json={"value": PROJECTS[start:end]})
+
+
+class ToolRegistry:
+    def tool(self, *args, **kwargs):
+        def register(fn):
+            setattr(self, fn.__name__, fn)
+            return fn
+        return register
+
+
+@pytest.fixture
+def list_projects(monkeypatch):
+    stub = ProjectsStub()
+
+    def call(max_records=None, **kwargs):
+        if max_records is not None:
+            monkeypatch.setattr(project_tools, "OutputBudget", lambda: OutputBudget(max_chars=RECORD * max_records))
+        registry = ToolRegistry()
+        register_project_tools(registry, AzureDevOpsClient(transport=httpx.MockTransport(stub)))
+        return json.loads(asyncio.run(registry.list_projects(**kwargs)))
+
+    call.stub = stub
+    return call
+
+
+def names(result):
+    return [p["name"] for p in result["projects"]]
+
+
+def test_page_size_returns_one_page_and_its_cursor(list_projects):
+    result = list_projects(page_size=5, cursor="10")
+    assert names(result) == [f"project-{i}" for i in range(10, 15)]
+    assert result["next_cursor"] == "15"
+    assert len(list_projects.stub.requests) == 1
+
+
+def test_pages_stop_at_the_output_budget(list_projects):
+    result = list_projects(max_records=25)
+
+    # Caben dos páginas de 10; la tercera no se pide entera, se continúa desde ella
+    assert names(result) == [f"project-{i:02}" for i in range(20)]
+    assert result["next_cursor"] == "20"
+    assert len(list_projects.stub.requests) == 3
+
+
+def test_first_page_over_the_budget_returns_a_cursor_for_the_rest(list_projects):
+    budget = OutputBudget(max_chars=RECORD * 8)
+    budget.take([{k: p[k] for k in ("id", "name", "state", "url")} for p in PROJECTS[:10]])
+    kept = budget.fitting
+
+    result = list_projects(max_records=8)
+
+    # La primera página de 10 no cabe: se retornan los que caben y se continúa
+    # desde el primero que se queda fuera
+    assert 0 < kept < 10
+    assert names(result) == [f"project-{i:02}" for i in range(kept)]
+    assert result["next_cursor"] == str(kept)
+    assert list_projects.stub.requests[-1]["$top"] == str(kept)
+    assert len(list_projects.stub.requests) == 2
+
+    resumed = list_projects(max_records=8, cursor=result["next_cursor"])
+    assert names(resumed)[0] == f"project-{kept:02}"
+
+
+def test_whole_listing_without_cursor(list_projects):
+    result = list_projects()
+    assert len(result["projects"]) == 30
+    assert "next_cursor" not in result
@@ -0,0 +1,243 @@
+"""Tools de repositorios frente a un stub de Azure DevOps (httpx.MockTransport)."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from core.http_client import AzureDevOpsClient
+from core.identities import IdentityResolver
+from core.jobs import JobRegistry
+from core.metadata import MetadataCache
+from core.output import OutputBudget
+from core.resolver import NameResolver
+from tools import repositories as repository_tools
+from tools.repositories import UserSpec, register_repository_tools
+
+REPOSITORIES = [
+    {"id": "r-api", "name": "api", "url": "https://x/api"},
+    {"id": "r-web", "name": "web", "url": "https://x/web"},
+    {"id": "r-docs", "name": "docs", "url": "https://x/docs"},
+]
+NAMESPACES = {"value": [{"displayName": "Git Repositories", "namespaceId": "ns-git", "actions": [
+    {"name": "GenericContribute", "displayName": "Contribute", "bit": 4},
+]}]}
+IDENTITIES = {
+    "ana@acme.com": {"descriptor": "d-ana", "providerDisplayName": "Ana"},
+    "bob@acme.com": {"descriptor": "d-bob", "providerDisplayName": "Bob"},
+}
+
+
+class AzureStub:
+    """Proyecto ``Web`` con tres repositorios; registra las peticiones."""
+
+    def __init__(self, policies=(), failing=(), repositories=REPOSITORIES):
+        self.policies = list(policies)
+        self.repositories = list(repositories)
+        # Fragmentos de URL o token cuyas escrituras responden 409
+        self.failing = set(failing)
+        self.requests = []
+
+    def writes(self, method=None):
+        return [r for r in self.requests if r.method != "GET" and (method is None or r.method == method)]
+
+    def reads(self, suffix):
+        return [r for r in self.requests if r.method == "GET" and r.url.path.endswith(suffix)]
+
+    async def __call__(self, request):
+        self.requests.append(request)
+        # Cede el control como una llamada real, para que las concurrentes se solapen
+        await asyncio.sleep(0)
+        path = request.url.path
+        if request.method != "GET":
+            body = request.content.decode()
+            if any(f in body or f in str(request.url) for f in self.failing):
+                return httpx.Response(409, text="conflict")
+            return httpx.Response(200, json={"id": 99})
+        if path.endswith("/_apis/projects"):
+            return httpx.Response(200, json={"value": [{"id": "p-web", "name": "Web"}]})
+        if path.endswith("/_apis/git/repositories"):
+            # Pagina con ``$top`` y un token con el índice siguiente
+            start = int(request.url.params.get("continuationToken", 0))
+            end = min(start + int(request.url.params.get("$top", len(self.repositories))), len(self.repositories))
+            headers = {"x-ms-continuationtoken": str(end)} if end < len(self.repositories) else {}
+            return httpx.Response(200, headers=headers, json={"value": self.repositories[start:end]})
+        if path.endswith("/securitynamespaces"):
+            return httpx.Response(200, json=NAMESPACES)
+        if path.endswith("/_apis/identities"):
+            identity = IDENTITIES.get(request.url.params["filterValue"])
+            return httpx.Response(200, json={"value": [identity] if identity else []})
+        if path.endswith("/policy/types"):
+            return httpx.Response(200, json={"value": [{"id": "t-min", "displayName": "Minimum number of reviewers"}]})
+        if path.endswith("/policy/configurations"):
+            return httpx.Response(200, json={"value": self.policies})
+        return httpx.Response(404)
+
+
+class ToolRegistry:
+    """Sustituto de FastMCP que guarda las funciones registradas como tools."""
+
+    def tool(self, *args, **kwargs):
+        def register(fn):
+            setattr(self, fn.__name__, fn)
+            return fn
+        return register
+
+
+@pytest.fixture
+def tools(tmp_path):
+    def build(stub):
+        client = AzureDevOpsClient(transport=httpx.MockTransport(stub))
+        registry = ToolRegistry()
+        register_repository_tools(
+            registry, client, NameResolver(client),
+            MetadataCache(client, cache_dir=str(tmp_path)), IdentityResolver(client), JobRegistry(),
+        )
+        return registry
+    return build
+
+
+# ===== list_repositories =====
+
+def test_list_first_page_over_the_budget_returns_a_cursor_for_the_rest(tools, monkeypatch):
+    repositories = [{"id": f"r-{i:02}", "name": f"repo-{i:02}", "url": f"https://x/repo-{i:02}"} for i in range(40)]
+    stub = AzureStub(repositories=repositories)
+    monkeypatch.setattr(repository_tools, "OutputBudget", lambda: OutputBudget(max_chars=2000))
+
+    result = json.loads(asyncio.run(tools(stub).list_repositories("Web")))
+
+    # La primera página no cabe: se retornan los que caben y se continúa desde
+    # el primero que se queda fuera
+    kept = len(result["repositories"])
+    assert 0 < kept < 40
+    assert result["next_cursor"] == str(kept)
+
+    resumed = json.loads(asyncio.run(tools(stub).list_repositories("Web", cursor=result["next_cursor"])))
+    assert resumed["repositories"][0]["name"] == f"repo-{kept:02}"
+
+
+# ===== assign_contribute_permission_bulk =====
+
+def test_bulk_grant_posts_once_per_repository(tools):
+    stub = AzureStub()
+    users = [UserSpec(email="ana@acme.com", name="Ana"), UserSpec(email="bob@acme.com", name="Bob"),
+             UserSpec(email="zed@acme.com", name="Zed")]
+
+    result = asyncio.run(tools(stub).assign_contribute_permission_bulk("Web", ["api", "WEB", "missing"], users))
+
+    posts = stub.writes("POST")
+    assert len(posts) == 2
+    bodies = sorted((httpx.Response(200, content=p.content).json() for p in posts), key=lambda b: b["token"])
+    assert [b["token"] for b in bodies] == ["repoV2/p-web/r-api", "repoV2/p-web/r-web"]
+    assert all([a["descriptor"] for a in b["accessControlEntries"]] == ["d-ana", "d-bob"] for b in bodies)
+    assert all(a["allow"] == 4 for b in bodies for a in b["accessControlEntries"])
+    assert "ns-git" in str(posts[0].url)
+    # Proyecto y repositorios se resuelven con un solo listado cada uno
+    assert len(stub.reads("/_apis/projects")) == 1
+    assert len(stub.reads("/_apis/git/repositories")) == 1
+    assert "repositorio no encontrado" in result
+    assert "usuario no encontrado" in result
+
+
+def test_bulk_grant_reports_failures_per_repository(tools):
+    stub = AzureStub(failing={"r-web"})
+    users = [UserSpec(email="ana@acme.com", name="Ana")]
+
+    result = asyncio.run(tools(stub).assign_contribute_permission_bulk("Web", ["api", "web"], users))
+
+    assert len(stub.writes("POST")) == 2
+    assert result.count("HTTP 409") == 1
+
+
+def test_bulk_grant_unknown_project(tools):
+    stub = AzureStub()
+    result = asyncio.run(tools(stub).assign_contribute_permission_bulk(
+        "Nope", ["api"], [UserSpec(email="ana@acme.com", name="Ana")]
+    ))
+    assert result.startswith("❌")
+    assert stub.writes() == []
+
+
+# ===== assign_reviewers_policies_rollout =====
+
+def reviewers_policy(id, *scopes, count=2, type_id="t-min", **settings):
+    return {
+        "id": id, "isEnabled": True, "isBlocking": True, "type": {"id": type_id},
+        "settings": {
+            "minimumApproverCount": count, "creatorVoteCounts": False, "allowDownvotes": False,
+            "scope": [{"repositoryId": r, "refName": f"refs/heads/{b}", "matchKind": "Exact"} for r, b in scopes],
+            **settings,
+        },
+    }
+
+
+def policy_writes(stub):
+    return [(r.method, r.url.path.rsplit("/", 1)[-1], httpx.Response(200, content=r.content).json())
+            for r in stub.writes()]
+
+
+def test_rollout_creates_updates_and_skips(tools):
+    stub = AzureStub(policies=[
+        reviewers_policy(1, ("r-api", "main")),
+        reviewers_policy(2, ("R-WEB", "main"), count=1, resetOnSourcePush=True),
+        reviewers_policy(3, ("r-docs", "main"), type_id="t-other"),
+    ])
+
+    asyncio.run(tools(stub).assign_reviewers_policies_rollout("Web", ["main", "develop"], reviewers=2))
+
+    writes = policy_writes(stub)
+    creates = sorted(
+        (body["settings"]["scope"][0]["repositoryId"], body["settings"]["scope"][0]["refName"])
+        for method, _, body in writes if method == "POST"
+    )
+    assert creates == [
+        ("r-api", "refs/heads/develop"), ("r-docs", "refs/heads/develop"),
+        ("r-docs", "refs/heads/main"), ("r-web", "refs/heads/develop"),
+    ]
+    ((_, policy_id, update),) = [w for w in writes if w[0] == "PUT"]
+    assert policy_id == "2"
+    # La actualización conserva el alcance y los demás ajustes
+    assert update["settings"]["minimumApproverCount"] == 2
+    assert update["settings"]["resetOnSourcePush"] is True
+    assert update["settings"]["scope"][0]["repositoryId"] == "R-WEB"
+    # Las políticas existentes se leen una sola vez
+    assert len(stub.reads("/policy/configurations")) == 1
+
+
+def test_rollout_filters_repositories_by_glob(tools):
+    stub = AzureStub()
+    asyncio.run(tools(stub).assign_reviewers_policies_rollout("Web", ["main"], 1, repositories="A*"))
+    assert [body["settings"]["scope"][0]["repositoryId"] for _, _, body in policy_writes(stub)] == ["r-api"]
+
+    result = asyncio.run(tools(stub).assign_reviewers_policies_rollout("Web", ["main"], 1, repositories="nada-*"))
+    assert "Ningún repositorio" in result
+
+
+def test_rollout_dry_run_writes_nothing(tools):
+    stub = AzureStub(policies=[reviewers_policy(2, ("r-web", "main"), count=1)])
+    asyncio.run(tools(stub).assign_reviewers_policies_rollout("Web", ["main", "develop"], 2, dry_run=True))
+    assert stub.writes() == []
+
+
+def test_rollout_lists_scopes_outside_the_request(tools):
+    stub = AzureStub(policies=[reviewers_policy(7, ("r-api", "release"), ("r-web", "release"), count=1)])
+
+    result = asyncio.run(tools(stub).assign_reviewers_policies_rollout("Web", ["release"], 2, repositories="api"))
+
+    assert [(method, policy_id) for method, policy_id, _ in policy_writes(stub)] == [("PUT", "7")]
+    # Actualizar la política también cambia web @ release, fuera del patrón pedido
+    assert "web @ refs/heads/release" in result
+
+
+def test_rollout_shared_policy_entries_take_the_upsert_result(tools):
+    stub = AzureStub(
+        policies=[reviewers_policy(7, ("r-api", "release"), ("r-web", "release"), count=1)],
+        failing={"configurations/7"},
+    )
+
+    result = asyncio.run(tools(stub).assign_reviewers_policies_rollout("Web", ["release"], 2))
+
+    # Una sola petición por política; las dos entradas que la comparten fallan
+    assert [method for method, _, _ in policy_writes(stub)].count("PUT") == 1
+    assert result.count("HTTP 409") == 2
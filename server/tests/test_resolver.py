@@ -0,0 +1,60 @@
+import asyncio
+
+import httpx
+
+from core.http_client import AzureDevOpsClient
+from core.resolver import NameResolver
+
+
+def listing_transport(calls):
+    def handler(request):
+        calls.append(request.url.path)
+        if request.url.path.endswith("/_apis/projects"):
+            return httpx.Response(200, json={"value": [
+                {"id": "p-1", "name": "Web"}, {"id": "p-2", "name": "Mobile"},
+            ]})
+        return httpx.Response(200, json={"value": [
+            {"id": "r-1", "name": "web-app"}, {"id": "r-2", "name": "web-api"},
+        ]})
+    return httpx.MockTransport(handler)
+
+
+def test_one_listing_resolves_every_name_case_insensitively():
+    calls = []
+    resolver = NameResolver(AzureDevOpsClient(transport=listing_transport(calls)))
+
+    async def run():
+        return [
+            await resolver.project_id("web"),
+            await resolver.project_id("MOBILE"),
+            await resolver.project_id("Web"),
+            await resolver.repository_id("Web", "Web-API"),
+            await resolver.repository_id("web", "web-app"),
+        ]
+
+    assert asyncio.run(run()) == ["p-1", "p-2", "p-1", "r-2", "r-1"]
+    assert calls == ["/org/_apis/projects", "/org/Web/_apis/git/repositories"]
+
+
+def test_unknown_names_are_cached_as_missing():
+    calls = []
+    resolver = NameResolver(AzureDevOpsClient(transport=listing_transport(calls)), negative_ttl=60)
+
+    async def run():
+        return [await resolver.project_id("nope"), await resolver.project_id("nope")]
+
+    assert asyncio.run(run()) == [None, None]
+    assert len(calls) == 1
+
+
+def test_remember_and_forget():
+    calls = []
+    resolver = NameResolver(AzureDevOpsClient(transport=listing_transport(calls)))
+    resolver.remember_repository("Web", "New-Repo", "r-9")
+
+    assert asyncio.run(resolver.repository_id("web", "new-repo")) == "r-9"
+    assert calls == []
+
+    resolver.forget_repository("Web", "New-Repo")
+    assert asyncio.run(resolver.repository_id("web", "new-repo")) is None
+    assert len(calls) == 1
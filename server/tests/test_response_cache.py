@@ -0,0 +1,180 @@
+"""Caché de respuestas GET del cliente frente a un stub con ETag."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from core import response_cache
+from core.http_client import AzureDevOpsClient
+from core.response_cache import ResponseCache
+
+REPOS = "https://dev.azure.com/org/Web/_apis/git/repositories"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+class EtagStub:
+    """Sirve listados con ETag y responde 304 si el cliente trae el mismo."""
+
+    def __init__(self):
+        self.requests = []
+        self.version = 1
+
+    def __call__(self, request):
+        self.requests.append(request)
+        if request.method != "GET":
+            self.version += 1
+            return httpx.Response(201, json={})
+        etag = f'"v{self.version}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, headers={"ETag": etag},
+                              json={"value": [{"name": f"repo-{self.version}"}]})
+
+
+def run(stub, *calls, **kwargs):
+    client = AzureDevOpsClient(transport=httpx.MockTransport(stub), **kwargs)
+
+    async def go():
+        try:
+            results = []
+            for method, url in calls:
+                results.append(await client.request(method, url))
+            return results
+        finally:
+            await client.aclose()
+
+    return client, asyncio.run(go())
+
+
+def test_fresh_entry_is_served_without_calling(clock):
+    stub = EtagStub()
+    client, (first, second) = run(stub, ("GET", REPOS), ("GET", REPOS))
+
+    assert len(stub.requests) == 1
+    assert first.json() == second.json() == {"value": [{"name": "repo-1"}]}
+    assert client.cache.stats()["hits"] == 1
+
+
+def test_uncached_endpoints_always_call(clock):
+    stub = EtagStub()
+    items = "https://dev.azure.com/org/Web/_apis/wit/workitems/1"
+    run(stub, ("GET", items), ("GET", items))
+    assert len(stub.requests) == 2
+
+
+def test_expired_entry_is_revalidated_with_etag(clock):
+    stub = EtagStub()
+    client = AzureDevOpsClient(transport=httpx.MockTransport(stub))
+
+    async def go():
+        try:
+            await client.get(REPOS)
+            clock[0] += 61
+            return await client.get(REPOS)
+        finally:
+            await client.aclose()
+
+    response = asyncio.run(go())
+
+    assert stub.requests[1].headers["If-None-Match"] == '"v1"'
+    assert response.status_code == 200
+    assert response.json() == {"value": [{"name": "repo-1"}]}
+    assert client.cache.revalidated == 1
+
+
+def test_304_serves_a_fresh_copy(clock):
+    stub = EtagStub()
+    client = AzureDevOpsClient(transport=httpx.MockTransport(stub))
+
+    async def go():
+        try:
+            first = await client.get(REPOS)
+            # Modificar el resultado no debe alterar la caché
+            first.json()["value"].clear()
+            clock[0] += 61
+            revalidated = await client.get(REPOS)
+            revalidated.json()["value"].append("extra")
+            return first, revalidated, await client.get(REPOS)
+        finally:
+            await client.aclose()
+
+    first, revalidated, fresh = asyncio.run(go())
+
+    assert len(stub.requests) == 2
+    assert revalidated is not first and fresh is not revalidated
+    assert fresh.json() == {"value": [{"name": "repo-1"}]}
+
+
+def test_write_invalidates_its_collection(clock):
+    stub = EtagStub()
+    _, (_, _, after) = run(stub, ("GET", REPOS), ("POST", REPOS), ("GET", REPOS))
+
+    assert [r.method for r in stub.requests] == ["GET", "POST", "GET"]
+    assert after.json() == {"value": [{"name": "repo-2"}]}
+
+
+def test_item_write_invalidates_listings_at_any_level(clock):
+    stub = EtagStub()
+    org_level = "https://dev.azure.com/org/_apis/git/repositories"
+    item = "https://dev.azure.com/org/web/_apis/git/Repositories/0f4c7a0e-1111-2222-3333-444455556666/importRequests"
+    run(stub, ("GET", REPOS), ("GET", org_level), ("POST", item), ("GET", REPOS), ("GET", org_level))
+
+    assert [r.method for r in stub.requests] == ["GET", "GET", "POST", "GET", "GET"]
+
+
+@pytest.mark.parametrize("query", ["wit/wiql", "wit/workitemsbatch", "graph/subjectquery"])
+def test_read_only_posts_do_not_invalidate(clock, query):
+    stub = EtagStub()
+    wiql_listing = "https://dev.azure.com/org/Web/_apis/wit/wiql"
+    client = AzureDevOpsClient(transport=httpx.MockTransport(stub))
+    # Un listado más de otra colección, que tampoco debe invalidarse
+    client.cache.policies += response_cache.parse_policies("/_apis/wit/wiql$=60")
+
+    async def go():
+        try:
+            await client.get(REPOS)
+            await client.get(wiql_listing)
+            await client.post(f"https://dev.azure.com/org/Web/_apis/{query}", json={})
+            await client.get(REPOS)
+            await client.get(wiql_listing)
+        finally:
+            await client.aclose()
+
+    asyncio.run(go())
+
+    assert [r.method for r in stub.requests] == ["GET", "GET", "POST"]
+
+
+def test_lru_eviction_by_bytes(clock):
+    cache = ResponseCache(max_bytes=4 * 1024, policies="/items/=60")
+    request = lambda n: httpx.Request("GET", f"https://h/items/{n}")
+    body = b"x" * 300
+    for n in range(4):
+        cache.store(("k", n), httpx.Response(200, content=body, request=request(n)), 60)
+    # Cada entrada cuesta 300 bytes más 512 de sobrecarga: caben 5
+    assert cache.bytes == 4 * 812
+    cache.get(("k", 0))  # la más antigua pasa a ser la más reciente
+    cache.store(("k", 4), httpx.Response(200, content=body, request=request(4)), 60)
+    cache.store(("k", 5), httpx.Response(200, content=body, request=request(5)), 60)
+
+    assert cache.evictions == 1
+    assert cache.get(("k", 1)) is None
+    assert cache.get(("k", 0)) is not None
+    assert cache.bytes <= cache.max_bytes
+    # Una respuesta de más de un cuarto de la caché no se guarda
+    cache.store(("k", 6), httpx.Response(200, content=b"x" * 1024, request=request(6)), 60)
+    assert cache.get(("k", 6)) is None
+
+
+def test_disabled_cache():
+    stub = EtagStub()
+    client, _ = run(stub, ("GET", REPOS), ("GET", REPOS), cache_max_bytes=0)
+    assert client.cache is None
+    assert len(stub.requests) == 2
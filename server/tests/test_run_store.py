@@ -0,0 +1,124 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from core.http_client import AzureDevOpsClient
+from core.run_store import RunStore, _row_from_build, _store_runs
+
+
+def iso(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def build(id, definition=1, branch="main", result="succeeded", status="completed",
+          queued=1.0, duration=10.0, queue_time=None):
+    queue_time = queue_time if queue_time is not None else 1_700_000_000 + id * 1000
+    start = queue_time + queued
+    return {
+        "id": id,
+        "definition": {"id": definition, "name": f"pipeline-{definition}"},
+        "sourceBranch": f"refs/heads/{branch}",
+        "status": status,
+        "result": result if status == "completed" else None,
+        "queueTime": iso(queue_time),
+        "startTime": iso(start),
+        "finishTime": iso(start + duration) if status == "completed" else None,
+    }
+
+
+# Resultados de las ejecuciones 1..10 de pipeline-1 en main (S = éxito, F = fallo)
+PATTERN = "SSFSFFSSSS"
+
+
+@pytest.fixture
+def store():
+    run_store = RunStore(AzureDevOpsClient(transport=httpx.MockTransport(lambda r: httpx.Response(500))),
+                         db_path=":memory:", in_progress_ttl=3600)
+    completed = [
+        build(i, result="succeeded" if outcome == "S" else "failed", queued=i, duration=10 * i)
+        for i, outcome in enumerate(PATTERN, 1)
+    ]
+    completed += [
+        build(11, result="canceled", duration=999),
+        build(20, definition=2, branch="dev", duration=42, queued=3),
+    ]
+    running = [build(12, status="inProgress"), build(30, definition=3, status="notStarted")]
+    # sync_state reciente: la analítica no vuelve a sincronizar
+    asyncio.run(run_store._run(
+        _store_runs, "web",
+        [_row_from_build("web", b) for b in completed],
+        [_row_from_build("web", b) for b in running],
+        "2025-01-01T00:00:00Z", time.time(),
+    ))
+    yield run_store
+    asyncio.run(run_store.__aexit__(None, None, None))
+
+
+def test_percentiles_success_rate_and_flips(store):
+    stats = {s.definition_id: s for s in asyncio.run(store.analytics("Web"))}
+
+    main = stats[1]
+    assert (main.pipeline, main.branch, main.runs) == ("pipeline-1", "main", 10)
+    assert main.success_rate == pytest.approx(0.7)
+    # Rango más cercano: p50 = 5.º valor, p95 = 10.º
+    assert (main.duration_p50, main.duration_p95) == (50, 100)
+    assert (main.queue_p50, main.queue_p95) == (5, 10)
+    # S→F, F→S, S→F, F→S: 4 cambios en 9 transiciones
+    assert main.flakiness == pytest.approx(4 / 9)
+
+    # Las ejecuciones en curso (pipeline-3) y las canceladas no cuentan
+    assert 3 not in stats
+
+
+def test_last_runs_window(store):
+    main = asyncio.run(store.analytics("web", definition_ids=[1], last_runs=5))[0]
+    # Ejecuciones 6..10: F S S S S
+    assert main.runs == 5
+    assert main.success_rate == pytest.approx(0.8)
+    assert main.flakiness == pytest.approx(1 / 4)
+    assert (main.duration_p50, main.duration_p95) == (80, 100)
+
+
+def test_single_run_and_branch_filter(store):
+    stats = asyncio.run(store.analytics("web", branch="refs/heads/DEV"))
+    assert len(stats) == 1
+    dev = stats[0]
+    assert (dev.definition_id, dev.runs, dev.success_rate, dev.flakiness) == (2, 1, 1.0, 0.0)
+    assert dev.duration_p50 == dev.duration_p95 == 42
+    assert dev.queue_p50 == 3
+
+
+def test_only_in_progress_runs_give_no_stats(store):
+    assert asyncio.run(store.analytics("web", definition_ids=[3])) == []
+
+
+def test_sync_downloads_from_the_watermark():
+    requests = []
+    finished = [build(1, duration=60), build(2, duration=30)]
+
+    def handler(request):
+        params = request.url.params
+        requests.append(params)
+        if params["statusFilter"] == "completed":
+            return httpx.Response(200, json={"value": finished})
+        return httpx.Response(200, json={"value": [build(3, status="inProgress")]})
+
+    run_store = RunStore(AzureDevOpsClient(transport=httpx.MockTransport(handler)), db_path=":memory:")
+
+    async def run():
+        try:
+            first = await run_store.sync("Web")
+            skipped = await run_store.sync("Web")
+            forced = await run_store.sync("Web", force=True)
+            return first, skipped, forced
+        finally:
+            await run_store.__aexit__(None, None, None)
+
+    assert asyncio.run(run()) == (2, 0, 2)
+    completed = [r for r in requests if r["statusFilter"] == "completed"]
+    assert len(completed) == 2
+    # La segunda descarga parte del fin de la última ejecución completada
+    assert completed[1]["minTime"].startswith(iso(max(_row_from_build("web", b)[-1] for b in finished))[:19])
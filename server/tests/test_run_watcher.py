@@ -0,0 +1,117 @@
+"""Sondeo compartido de ejecuciones frente a un stub del API de builds."""
+
+import asyncio
+
+import httpx
+
+from core.http_client import AzureDevOpsClient
+from core.run_watcher import RunWatcher
+
+
+class BuildStub:
+    """Devuelve los estados del build en orden y repite el último."""
+
+    def __init__(self, *states, timeline=None):
+        self.states = list(states)
+        self.timeline = timeline or {}
+        self.polls = 0
+
+    def __call__(self, request):
+        if request.url.path.endswith("/timeline"):
+            records = self.timeline.get(min(self.polls, max(self.timeline, default=0)), [])
+            return httpx.Response(200, json={"records": records}) if records else httpx.Response(204)
+        state = self.states[min(self.polls, len(self.states) - 1)]
+        self.polls += 1
+        if isinstance(state, int):
+            return httpx.Response(state, text="boom")
+        status, result = state
+        return httpx.Response(200, json={
+            "id": 7, "buildNumber": "20250101.1", "status": status, "result": result,
+            "definition": {"name": "ci"},
+        })
+
+
+def make_watcher(stub):
+    client = AzureDevOpsClient(transport=httpx.MockTransport(stub))
+    return RunWatcher(client, min_interval=0, max_interval=0)
+
+
+async def collect(watcher, project="Web", run_id=7):
+    return [s async for s in watcher.watch(project, run_id)]
+
+
+def test_publishes_only_changes_until_completed():
+    stub = BuildStub(
+        ("notStarted", None), ("inProgress", None), ("inProgress", None),
+        ("completed", "succeeded"),
+        timeline={
+            1: [{"type": "Stage", "name": "Build", "state": "inProgress", "order": 1},
+                {"type": "Job", "name": "job", "state": "inProgress"}],
+            3: [{"type": "Stage", "name": "Deploy", "state": "completed", "result": "succeeded", "order": 2},
+                {"type": "Stage", "name": "Build", "state": "completed", "result": "succeeded", "order": 1}],
+        },
+    )
+    watcher = make_watcher(stub)
+
+    snapshots = asyncio.run(collect(watcher))
+
+    assert snapshots[0].status == "notStarted"
+    # Un sondeo sin cambios de estado ni de stages no se publica
+    assert all(a.key() != b.key() for a, b in zip(snapshots, snapshots[1:]))
+    final = snapshots[-1]
+    assert (final.pipeline, final.build_number, final.result) == ("ci", "20250101.1", "succeeded")
+    # Solo los registros de tipo Stage, en su orden
+    assert [s.name for s in final.stages] == ["Build", "Deploy"]
+    assert final.completed_stages == 2
+    assert watcher._pollers == {}
+
+
+def test_watchers_of_the_same_run_share_one_poller():
+    stub = BuildStub(("inProgress", None), ("inProgress", None), ("completed", "failed"))
+    watcher = make_watcher(stub)
+
+    async def run():
+        return await asyncio.gather(collect(watcher, "Web"), collect(watcher, "web"))
+
+    first, second = asyncio.run(run())
+
+    assert first[-1].result == second[-1].result == "failed"
+    assert stub.polls == 3
+
+
+def test_transient_errors_keep_polling():
+    stub = BuildStub(("inProgress", None), 500, ("completed", "succeeded"))
+    watcher = make_watcher(stub)
+
+    snapshots = asyncio.run(collect(watcher))
+
+    assert [s.status for s in snapshots] == ["inProgress", "completed"]
+    assert snapshots[-1].error is None
+
+
+def test_missing_run_ends_the_watch_with_an_error():
+    watcher = make_watcher(BuildStub(404))
+
+    snapshots = asyncio.run(collect(watcher))
+
+    assert len(snapshots) == 1
+    assert snapshots[0].completed
+    assert "No se encontró la ejecución 7" in snapshots[0].error
+
+
+def test_last_watcher_leaving_stops_the_poller():
+    watcher = make_watcher(BuildStub(("inProgress", None), ("inProgress", "x")))
+
+    async def run():
+        stream = watcher.watch("Web", 7)
+        first = await stream.__anext__()
+        task = next(iter(watcher._pollers.values())).task
+        await stream.aclose()
+        await asyncio.sleep(0)
+        return first, task
+
+    first, task = asyncio.run(run())
+
+    assert first.status == "inProgress"
+    assert task.cancelled() or task.done()
+    assert watcher._pollers == {}
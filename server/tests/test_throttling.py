@@ -0,0 +1,239 @@
+"""Reintentos y concurrencia adaptativa frente a un stub de throttling (httpx.MockTransport)."""
+
+import asyncio
+import email.utils
+import time
+
+import httpx
+import pytest
+
+from core import ratelimit
+from core.http_client import AzureDevOpsClient
+from core.ratelimit import AdaptiveLimiter, retry_after
+
+URL = "https://dev.azure.com/org/Web/_apis/git/repositories"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Registra las esperas y adelanta el reloj del limitador en lugar de dormir."""
+    recorded = []
+    offset = [0.0]
+    real_sleep = asyncio.sleep
+    real_monotonic = time.monotonic
+
+    async def fake_sleep(delay, *args, **kwargs):
+        recorded.append(delay)
+        offset[0] += delay
+        await real_sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: real_monotonic() + offset[0])
+    return recorded
+
+
+def make_client(handler, **kwargs) -> AzureDevOpsClient:
+    kwargs.setdefault("max_retries", 3)
+    return AzureDevOpsClient(transport=httpx.MockTransport(handler), **kwargs)
+
+
+def scripted(*responses):
+    """Handler que responde en orden y repite la última respuesta."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return responses[min(len(calls), len(responses)) - 1]
+
+    handler.calls = calls
+    return handler
+
+
+async def fetch(client, method="GET"):
+    try:
+        return await client.request(method, URL)
+    finally:
+        await client.aclose()
+
+
+# ===== Retry-After =====
+
+def test_retry_after_seconds_and_http_date():
+    assert retry_after(httpx.Response(429, headers={"Retry-After": "7"})) == 7.0
+    assert retry_after(httpx.Response(429)) is None
+    assert retry_after(httpx.Response(429, headers={"Retry-After": "soon"})) is None
+
+    when = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 28 <= retry_after(httpx.Response(429, headers={"Retry-After": when})) <= 30
+
+
+def test_429_waits_retry_after_and_retries(sleeps):
+    handler = scripted(httpx.Response(429, headers={"Retry-After": "2"}), httpx.Response(200, json={}))
+    client = make_client(handler)
+
+    response = asyncio.run(fetch(client))
+
+    assert response.status_code == 200
+    assert len(handler.calls) == 2
+    assert client.retries == 1
+    assert client.limiter.throttled == 1
+    # Retry-After más un jitter de hasta 0.5 s
+    assert any(2 <= delay <= 2.5 for delay in sleeps)
+
+
+def test_retry_after_longer_than_max_wait_is_returned(sleeps):
+    handler = scripted(httpx.Response(429, headers={"Retry-After": "3600"}))
+    client = make_client(handler, retry_max_wait=60)
+
+    response = asyncio.run(fetch(client))
+
+    assert response.status_code == 429
+    assert len(handler.calls) == 1
+
+
+def test_gives_up_after_max_retries(sleeps):
+    handler = scripted(httpx.Response(429))
+    client = make_client(handler, max_retries=2)
+
+    response = asyncio.run(fetch(client))
+
+    assert response.status_code == 429
+    assert len(handler.calls) == 3
+    assert client.retries == 2
+
+
+# ===== 503 y backoff =====
+
+def test_503_retried_with_exponential_backoff(sleeps):
+    handler = scripted(httpx.Response(503), httpx.Response(503), httpx.Response(200, json={}))
+    client = make_client(handler, retry_backoff_base=1.0, retry_backoff_max=30.0)
+
+    response = asyncio.run(fetch(client))
+
+    assert response.status_code == 200
+    assert len(handler.calls) == 3
+    backoffs = [d for d in sleeps if d > 0]
+    # Jitter completo: intento n espera entre 0 y base * 2**n
+    assert len(backoffs) <= 2
+    assert all(0 <= d <= 2.0 for d in backoffs)
+
+
+def test_503_not_retried_for_post(sleeps):
+    handler = scripted(httpx.Response(503), httpx.Response(200, json={}))
+    client = make_client(handler)
+
+    response = asyncio.run(fetch(client, "POST"))
+
+    assert response.status_code == 503
+    assert len(handler.calls) == 1
+
+
+def test_429_retried_for_post(sleeps):
+    handler = scripted(httpx.Response(429), httpx.Response(201, json={}))
+    client = make_client(handler)
+
+    response = asyncio.run(fetch(client, "POST"))
+
+    assert response.status_code == 201
+    assert len(handler.calls) == 2
+
+
+# ===== AIMD =====
+
+def test_limit_halves_on_throttling_once_per_cooldown(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    limiter = AdaptiveLimiter(initial=16, minimum=2, maximum=64)
+
+    async def observe(*responses):
+        for response in responses:
+            await limiter.observe(response)
+
+    # Una ráfaga de 429 dentro del cooldown cuenta como una sola reducción
+    asyncio.run(observe(httpx.Response(429), httpx.Response(429)))
+    assert limiter.limit == 8
+    assert limiter.throttled == 2
+
+    now[0] += ratelimit.DECREASE_COOLDOWN
+    asyncio.run(observe(httpx.Response(503)))
+    assert limiter.limit == 4
+
+    for _ in range(3):
+        now[0] += ratelimit.DECREASE_COOLDOWN
+        asyncio.run(observe(httpx.Response(429)))
+    assert limiter.limit == 2
+
+
+def test_limit_grows_additively_with_healthy_responses():
+    limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=5)
+
+    async def observe(count):
+        for _ in range(count):
+            await limiter.observe(httpx.Response(200))
+
+    # +1/limit por respuesta sana: unas ``limit`` respuestas suben el límite en 1
+    asyncio.run(observe(3))
+    assert int(limiter.limit) == 4
+    asyncio.run(observe(2))
+    assert int(limiter.limit) == 5
+    asyncio.run(observe(50))
+    assert limiter.limit == 5
+
+
+def test_low_remaining_budget_or_delay_header_decreases_limit():
+    limiter = AdaptiveLimiter(initial=10, minimum=1, maximum=20)
+    asyncio.run(limiter.observe(
+        httpx.Response(200, headers={"X-RateLimit-Remaining": "5", "X-RateLimit-Limit": "100"})
+    ))
+    assert limiter.limit == 5
+
+    limiter = AdaptiveLimiter(initial=10, minimum=1, maximum=20)
+    asyncio.run(limiter.observe(httpx.Response(200, headers={"X-RateLimit-Delay": "0.5"})))
+    assert limiter.limit == 5
+
+
+def test_retry_after_pauses_new_requests():
+    limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=8)
+    asyncio.run(limiter.observe(httpx.Response(429, headers={"Retry-After": "5"})))
+    assert limiter._paused_until - time.monotonic() > 4
+
+
+# ===== Stub de throttling =====
+
+class TokenBucketStub:
+    """Stub que admite ``capacity`` peticiones simultáneas y responde 429 al resto."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.active = 0
+        self.statuses = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        if self.active >= self.capacity:
+            self.statuses.append(429)
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        self.active += 1
+        try:
+            await asyncio.sleep(0)
+            self.statuses.append(200)
+            return httpx.Response(200, json={"value": []})
+        finally:
+            self.active -= 1
+
+
+def test_concurrent_calls_recover_from_throttling_stub(sleeps):
+    stub = TokenBucketStub(capacity=3)
+    client = make_client(stub, max_retries=10, max_connections_per_host=20, min_concurrency=1, max_concurrency=20)
+
+    async def run():
+        try:
+            return await asyncio.gather(*(client.get(f"{URL}/{i}") for i in range(30)))
+        finally:
+            await client.aclose()
+
+    responses = asyncio.run(run())
+
+    assert all(r.status_code == 200 for r in responses)
+    assert stub.statuses.count(429) == client.limiter.throttled
+    assert client.limiter.throttled > 0
+    assert client.limiter.limit < 20
@@ -0,0 +1,166 @@
+import asyncio
+import json
+
+import httpx
+
+from core import tracing
+from core.http_client import AzureDevOpsClient
+from core.tracing import CLIENT, SERVER, JsonlExporter, OtlpExporter, Tracer, parse_headers
+
+
+class MemoryExporter:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    async def export(self, spans):
+        if self.fail:
+            raise OSError("collector caído")
+        self.batches.append(spans)
+
+    async def aclose(self):
+        pass
+
+
+def traced_call(tracer, handler, *urls):
+    """Ejecuta GETs dentro de una traza y la cierra como haría el middleware."""
+    client = AzureDevOpsClient(transport=httpx.MockTransport(handler), max_retries=0)
+
+    async def run():
+        root = tracer.start_trace("tools/call list_repositories", {"mcp.tool": "list_repositories"})
+        token = tracing.activate(root)
+        try:
+            for url in urls:
+                await client.get(url)
+        finally:
+            tracing.reset(token)
+            await client.aclose()
+        tracer.finish_trace(root)
+        await tracer.flush()
+        return root
+
+    return asyncio.run(run())
+
+
+def test_sampling_rate_zero_and_one():
+    tracer = Tracer(MemoryExporter(), sample_rate=0.0)
+    assert all(tracer.start_trace("tool") is None for _ in range(50))
+
+    tracer = Tracer(MemoryExporter(), sample_rate=1.0)
+    assert all(tracer.start_trace("tool") is not None for _ in range(50))
+
+    # Sin exportador no se traza nada
+    assert Tracer(exporter=None, sample_rate=1.0).start_trace("tool") is None
+
+
+def test_upstream_spans_are_children_of_the_tool_span():
+    exporter = MemoryExporter()
+    tracer = Tracer(exporter, sample_rate=1.0)
+
+    def handler(request):
+        status = 404 if request.url.path.endswith("missing") else 200
+        return httpx.Response(status, json={})
+
+    root = traced_call(
+        tracer, handler,
+        "https://dev.azure.com/org/Web/_apis/git/repositories/0f4c7a0e-1111-2222-3333-444455556666",
+        "https://dev.azure.com/org/Web/_apis/git/missing",
+    )
+
+    (spans,) = exporter.batches
+    assert spans[0] is root and root.kind == SERVER and root.parent_id is None
+    children = spans[1:]
+    assert len(children) == 2
+    assert all(s.kind == CLIENT and s.parent_id == root.span_id and s.trace_id == root.trace_id for s in children)
+    assert children[0].name == "GET /{org}/{project}/_apis/git/repositories/{id}"
+    assert children[0].attributes["http.response.status_code"] == 200
+    assert children[0].error is None
+    assert children[1].error == "HTTP 404"
+
+
+def test_untraced_calls_create_no_spans():
+    client = AzureDevOpsClient(transport=httpx.MockTransport(lambda r: httpx.Response(200, json={})))
+
+    async def run():
+        try:
+            await client.get("https://dev.azure.com/org/_apis/projects")
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+    assert tracing.current() is None
+
+
+def test_otlp_span_linkage_and_status():
+    tracer = Tracer(MemoryExporter(), sample_rate=1.0)
+    root = tracer.start_trace("tool", {"mcp.tool": "x", "retries": 2, "cached": True, "ratio": 0.5, "none": None})
+    child = tracing.Span("GET /_apis/projects", CLIENT, root)
+    child.end("HTTP 503")
+    tracer.finish_trace(root)
+
+    exporter = OtlpExporter(endpoint="http://collector/v1/traces", headers={})
+    otlp_root, otlp_child = exporter._span(root), exporter._span(child)
+    asyncio.run(exporter.aclose())
+
+    assert "parentSpanId" not in otlp_root
+    assert otlp_child["parentSpanId"] == otlp_root["spanId"] == root.span_id
+    assert otlp_child["traceId"] == otlp_root["traceId"]
+    assert otlp_root["status"] == {"code": 1}
+    assert otlp_child["status"] == {"code": 2, "message": "HTTP 503"}
+    assert otlp_root["kind"] == SERVER
+    assert {a["key"]: a["value"] for a in otlp_root["attributes"]} == {
+        "mcp.tool": {"stringValue": "x"},
+        "retries": {"intValue": "2"},
+        "cached": {"boolValue": True},
+        "ratio": {"doubleValue": 0.5},
+    }
+
+
+def test_unfinished_spans_are_closed_with_the_trace():
+    tracer = Tracer(MemoryExporter(), sample_rate=1.0)
+    root = tracer.start_trace("tool")
+    pending = tracing.Span("GET /slow", CLIENT, root)
+    tracer.finish_trace(root)
+    assert pending.end_ns is not None
+    assert pending.error == "no terminó antes que la tool"
+    assert root.error is None
+
+
+def test_parse_headers():
+    assert parse_headers("") == {}
+    assert parse_headers("api-key=abc, x-tenant = t1 ,invalid,empty=") == {"api-key": "abc", "x-tenant": "t1"}
+    assert parse_headers("authorization=Basic a=b") == {"authorization": "Basic a=b"}
+
+
+def test_full_queue_drops_whole_traces():
+    exporter = MemoryExporter()
+    tracer = Tracer(exporter, sample_rate=1.0, max_queue=5)
+    for _ in range(3):
+        root = tracer.start_trace("tool")
+        tracing.Span("GET /a", CLIENT, root).end()
+        tracer.finish_trace(root)
+
+    # Caben dos trazas de dos spans; la tercera se descarta entera
+    assert tracer.dropped == 2
+    asyncio.run(tracer.flush())
+    assert len(exporter.batches[0]) == 4
+
+
+def test_failed_export_counts_dropped_spans():
+    tracer = Tracer(MemoryExporter(fail=True), sample_rate=1.0)
+    root = tracer.start_trace("tool")
+    tracer.finish_trace(root)
+    asyncio.run(tracer.flush())
+    assert tracer.dropped == 1
+
+
+def test_jsonl_exporter(tmp_path):
+    path = tmp_path / "traces" / "spans.jsonl"
+    tracer = Tracer(JsonlExporter(str(path)), sample_rate=1.0)
+    root = tracer.start_trace("tool", {"mcp.tool": "x"})
+    tracer.finish_trace(root, error="boom")
+    asyncio.run(tracer.__aexit__(None, None, None))
+
+    (line,) = path.read_text(encoding="utf-8").splitlines()
+    span = json.loads(line)
+    assert (span["name"], span["kind"], span["status"], span["error"]) == ("tool", "server", "error", "boom")
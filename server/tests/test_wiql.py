@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from core.http_client import AzureDevOpsClient
+from core.wiql import WiqlQuery, quote, run_wiql
+
+
+def test_quote_doubles_single_quotes():
+    assert quote("O'Brien") == "'O''Brien'"
+    assert quote("x' OR [System.Id] > '0") == "'x'' OR [System.Id] > ''0'"
+    assert quote(42) == "'42'"
+
+
+def test_build_escapes_values_and_in_lists():
+    query = (
+        WiqlQuery(("System.Id", "System.Title"))
+        .project("Web's")
+        .where("System.State", "not in", ["Closed", "Won't fix"])
+        .tags(["a'b"])
+        .order_by("System.ChangedDate", descending=True)
+    )
+    assert query.build() == (
+        "SELECT [System.Id], [System.Title] FROM WorkItems"
+        " WHERE [System.TeamProject] = 'Web''s'"
+        " AND [System.State] NOT IN ('Closed', 'Won''t fix')"
+        " AND [System.Tags] CONTAINS 'a''b'"
+        " ORDER BY [System.ChangedDate] DESC"
+    )
+
+
+@pytest.mark.parametrize("field", ["System.Id]", "System Id", "1abc", "a;DROP", ""])
+def test_rejects_invalid_field_names(field):
+    with pytest.raises(ValueError):
+        WiqlQuery().where(field, "=", "x")
+
+
+def test_rejects_unknown_operators():
+    with pytest.raises(ValueError):
+        WiqlQuery().where("System.State", "= 'x' OR", "y")
+
+
+def test_time_precision_only_for_dates_with_time():
+    assert not WiqlQuery().changed_since("2025-01-31").time_precision
+    assert WiqlQuery().changed_since("2025-01-31T10:00:00Z").time_precision
+
+
+def test_run_wiql_sends_top_and_time_precision():
+    seen = {}
+
+    def handler(request):
+        seen["params"] = dict(request.url.params)
+        seen["body"] = json.loads(request.content)
+        return httpx.Response(200, json={"workItems": [{"id": 3}, {"id": 1}]})
+
+    async def run():
+        client = AzureDevOpsClient(transport=httpx.MockTransport(handler))
+        try:
+            query = WiqlQuery().project("Web").changed_since("2025-01-31T10:00:00Z")
+            return await run_wiql(client, "Web", query, top=5)
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run()) == [3, 1]
+    assert seen["params"]["$top"] == "5"
+    assert seen["params"]["timePrecision"] == "true"
+    assert seen["body"]["query"].startswith("SELECT [System.Id] FROM WorkItems WHERE")
@@ -0,0 +1,115 @@
+import asyncio
+import json
+
+import httpx
+
+from core.http_client import AzureDevOpsClient
+from core.work_items import create_work_items_batch, fetch_work_items
+
+
+def test_fetch_splits_ids_in_chunks_and_keeps_order():
+    batches = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        batches.append(body["ids"])
+        # Orden distinto al pedido y sin los IDs borrados (múltiplos de 7)
+        items = [{"id": i, "fields": {"System.Title": f"t{i}"}} for i in reversed(body["ids"]) if i % 7]
+        return httpx.Response(200, json={"value": items})
+
+    client = AzureDevOpsClient(transport=httpx.MockTransport(handler))
+    ids = list(range(450, 0, -1))
+
+    items = asyncio.run(fetch_work_items(client, "Web", ids, fields=["System.Title"], concurrency=2))
+
+    assert sorted(len(b) for b in batches) == [50, 200, 200]
+    assert [item["id"] for item in items] == [i for i in ids if i % 7]
+
+
+def test_fetch_without_ids_makes_no_request():
+    client = AzureDevOpsClient(transport=httpx.MockTransport(lambda r: httpx.Response(500)))
+    assert asyncio.run(fetch_work_items(client, "Web", [])) == []
+
+
+# ===== Creación por $batch =====
+
+class BatchStub:
+    """``$batch`` que asigna IDs correlativos y rechaza los títulos ``boom``."""
+
+    def __init__(self) -> None:
+        self.next_id = 100
+        self.waves = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        operations = json.loads(request.content)
+        wave, entries = [], []
+        for operation in operations:
+            fields = {op["path"]: op["value"] for op in operation["body"]}
+            title = fields["/fields/System.Title"]
+            parent = fields.get("/relations/-")
+            wave.append((title, parent["url"].rsplit("/", 1)[-1] if parent else None))
+            if title == "boom":
+                body = {"value": {"Message": "TF401320: regla incumplida"}}
+                entries.append({"code": 400, "body": json.dumps(body)})
+            else:
+                self.next_id += 1
+                entries.append({"code": 200, "body": json.dumps({"id": self.next_id})})
+        self.waves.append(wave)
+        return httpx.Response(200, json={"count": len(entries), "value": entries})
+
+
+def create(specs):
+    stub = BatchStub()
+    client = AzureDevOpsClient(transport=httpx.MockTransport(stub))
+    return asyncio.run(create_work_items_batch(client, "Web", specs)), stub
+
+
+def test_children_are_created_after_their_parents():
+    results, stub = create([
+        {"type": "Epic", "title": "epic"},
+        {"type": "Task", "title": "task", "parent_index": 2},
+        {"type": "Feature", "title": "feature", "parent_index": 0},
+        {"type": "Bug", "title": "bug", "parent_id": 7},
+    ])
+
+    assert [r["ok"] for r in results] == [True] * 4
+    ids = {title: results[i]["id"] for i, title in enumerate(["epic", "task", "feature", "bug"])}
+    assert stub.waves == [
+        [("epic", None), ("bug", "7")],
+        [("feature", str(ids["epic"]))],
+        [("task", str(ids["feature"]))],
+    ]
+
+
+def test_item_failures_do_not_stop_the_rest():
+    results, _ = create([
+        {"type": "Epic", "title": "boom"},
+        {"type": "Task", "title": "child", "parent_index": 0},
+        {"type": "Task", "title": "ok"},
+    ])
+
+    assert results[0] == {"index": 0, "ok": False, "id": None, "error": "TF401320: regla incumplida"}
+    assert not results[1]["ok"] and "padre" in results[1]["error"]
+    assert results[2]["ok"]
+
+
+def test_invalid_and_circular_parent_index():
+    results, stub = create([
+        {"type": "Task", "title": "self", "parent_index": 0},
+        {"type": "Task", "title": "out of range", "parent_index": 9},
+        {"type": "Task", "title": "a", "parent_index": 3},
+        {"type": "Task", "title": "b", "parent_index": 2},
+        {"type": "Task", "title": "root"},
+    ])
+
+    assert "inválido" in results[0]["error"]
+    assert "inválido" in results[1]["error"]
+    assert "circular" in results[2]["error"] and "circular" in results[3]["error"]
+    assert results[4]["ok"]
+    assert stub.waves == [[("root", None)]]
+
+
+def test_failed_batch_request_fails_its_items():
+    client = AzureDevOpsClient(transport=httpx.MockTransport(lambda r: httpx.Response(400, json={})))
+    results = asyncio.run(create_work_items_batch(client, "Web", [{"type": "Task", "title": "x"}]))
+    assert not results[0]["ok"] and "400" in results[0]["error"]
@@ -0,0 +1,82 @@
+from fastmcp import FastMCP
+from typing import Optional
+import time
+
+from core.jobs import Job, JobRegistry
+from core.output import OutputFormat, render
+
+_ICONS = {
+    "pending": "🕒",
+    "running": "⏳",
+    "succeeded": "✅",
+    "failed": "❌",
+    "cancelled": "⚠️",
+}
+
+
+def _job_data(job: Job) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "description": job.description,
+        "status": job.status,
+        "elapsed_seconds": int((job.updated_at if job.finished else time.time()) - job.created_at),
+        "detail": job.detail,
+        "result": dict(job.result),
+        "error": job.error,
+    }
+
+
+def _format_job(job: dict) -> list[str]:
+    lines = [f"{_ICONS.get(job['status'], '•')} Job {job['id']}: {job['status']} ({job['elapsed_seconds']} s)"]
+    lines.append(f"  {job['description']}")
+    if job["detail"]:
+        lines.append(f"  Estado: {job['detail']}")
+    for key, value in job["result"].items():
+        if value is not None:
+            lines.append(f"  {key}: {value}")
+    if job["error"]:
+        lines.append(f"  Error: {job['error']}")
+    return lines
+
+
+def _jobs_text(data: dict) -> str:
+    if "jobs" not in data:
+        return "\n".join(_format_job(data))
+    if not data["jobs"]:
+        return "No hay jobs registrados."
+    lines = ["Jobs recientes:", ""]
+    for job in data["jobs"]:
+        lines.extend(_format_job(job))
+        lines.append("")
+    return "\n".join(lines)
+
+
+def register_job_tools(mcp: FastMCP, jobs: JobRegistry) -> None:
+    @mcp.tool()
+    async def get_job_status(
+        job_id: Optional[str] = None,
+        output_format: Optional[OutputFormat] = None,
+        fields: Optional[list[str]] = None
+    ) -> str:
+        """
+        Consulta el estado de una operación en segundo plano (p. ej. la
+        importación iniciada por create_and_import). No llama a Azure DevOps:
+        el servidor sigue la operación y aquí se lee el último estado conocido.
+
+        Args:
+            job_id: ID del job; si se omite, lista los jobs recientes
+            output_format: compact (JSON mínimo, por defecto), json o text
+            fields: Campos de cada job a incluir (p. ej. ["id", "status"])
+
+        Returns:
+            Estado del job o de los jobs
+        """
+        if job_id:
+            job = jobs.get(job_id)
+            if job is None:
+                return f"❌ Job '{job_id}' no encontrado (puede haber expirado o el servidor se reinició)."
+            return render(_job_data(job), _jobs_text, output_format, fields)
+
+        data = {"jobs": [_job_data(job) for job in jobs.list()]}
+        return render(data, _jobs_text, output_format, fields)
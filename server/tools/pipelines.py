@@ -1,22 +1,281 @@
 # tools/pipelines.py
-import time
+import asyncio
+import fnmatch
+from typing import Optional
+
 import httpx
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
+
+from azure_devops_config import (
+    get_base_url,
+    get_auth_header,
+    AZURE_DEVOPS_API_VERSION,
+    PIPELINE_RUN_CONCURRENCY,
+    PIPELINE_YAML_PATH,
+)
+from core import deadlines
+from core.http_client import AzureDevOpsClient
+from core.logs import ErrorSelector, PipelineLogs, RangeSelector, TailSelector, format_lines
+from core.output import OutputFormat, check_format, render
+from core.pipelines import (
+    PipelineIndex,
+    build_duration,
+    format_duration,
+    latest_builds,
+    normalize_folder,
+)
+from core.resolver import NameResolver
+from core.run_store import RunStore
+from core.run_watcher import RunWatcher
+
+
+def _run_summary(run: dict) -> dict:
+    """Campos relevantes de un build (en lugar de su representación completa)."""
+    return {
+        "id": run["id"],
+        "build_number": run.get("buildNumber"),
+        "status": run.get("status"),
+        "result": run.get("result"),
+        "branch": (run.get("sourceBranch") or "").removeprefix("refs/heads/") or None,
+        "commit": run.get("sourceVersion"),
+        "requested_for": (run.get("requestedFor") or {}).get("displayName"),
+        "queue_time": run.get("queueTime"),
+        "start_time": run.get("startTime"),
+        "finish_time": run.get("finishTime"),
+        "duration_seconds": build_duration(run),
+        "url": ((run.get("_links") or {}).get("web") or {}).get("href"),
+    }
+
+
+def _table(header: tuple, rows: list[tuple]) -> list[str]:
+    widths = [max(len(row[i]) for row in [header, *rows]) for i in range(len(header))]
+
+    def line(values):
+        return "  ".join(v.ljust(w) for v, w in zip(values, widths)).rstrip()
+
+    return [line(header), line(["-" * w for w in widths]), *(line(row) for row in rows)]
+
+
+def _create_run_text(data: dict) -> str:
+    title = "✅ PIPELINE EN EJECUCIÓN" if data["run_id"] is not None else "⚠️ PIPELINE SIN EJECUCIONES"
+    lines = [
+        title,
+        "=" * 80,
+        "",
+        f"📁 Proyecto: {data['project']}",
+        f"🔧 Pipeline: {data['pipeline_name']} (ID: {data['pipeline_id']}, "
+        f"{'creado' if data['created'] else 'existente reutilizado'})",
+        "",
+    ]
+    for run in data["runs"]:
+        if "run_id" in run:
+            lines.append(f"🌿 {run['branch']}: ✅ run {run['run_id']}")
+        else:
+            lines.append(f"🌿 {run['branch']}: ❌ {run['error']}")
+    lines += ["", data["message"]]
+    return "\n".join(lines)
+
+
+def _run_report_text(data: dict) -> str:
+    pipeline, run = data["pipeline"], data["run"]
+
+    def safe(key):
+        return run.get(key) or "N/A"
+
+    report = [
+        "✅ PIPELINE RUN REPORT",
+        "=" * 80,
+        "",
+        f"Project: {data['project']}",
+        f"Pipeline: {pipeline['name']} (ID: {pipeline['id']})",
+        f"Run ID: {run['id']} ({safe('build_number')})",
+        f"State: {safe('status')}",
+        f"Result: {safe('result')}",
+        f"Branch: {safe('branch')}",
+        f"Commit: {safe('commit')}",
+        f"Requested for: {safe('requested_for')}",
+        f"Created: {safe('queue_time')}",
+        f"Finished: {safe('finish_time')}",
+        f"Duration: {format_duration(run['duration_seconds'])}",
+        f"URL: {safe('url')}",
+    ]
+    return "\n".join(report)
+
+
+def _dashboard_text(data: dict) -> str:
+    rows = []
+    for pipeline in data["pipelines"]:
+        run = pipeline["run"]
+        if run is None:
+            rows.append((pipeline["name"], "-", "no runs", "-", "-", "-", "-"))
+            continue
+        rows.append((
+            pipeline["name"],
+            str(run["build_number"] or run["id"]),
+            run["status"] or "N/A",
+            run["result"] or "-",
+            run["branch"] or "-",
+            (run["queue_time"] or "-")[:19].replace("T", " "),
+            format_duration(run["duration_seconds"]),
+        ))
+
+    header = ("Pipeline", "Run", "State", "Result", "Branch", "Queued (UTC)", "Duration")
+    report = [
+        "✅ PIPELINE DASHBOARD",
+        "=" * 80,
+        "",
+        f"Project: {data['project']}  Pipelines: {len(rows)}  With failures: {data['with_failures']}",
+        "",
+        *_table(header, rows),
+    ]
+    return "\n".join(report)
+
+
+def _analytics_text(data: dict) -> str:
+    header = ("Pipeline", "Rama", "Runs", "Éxito", "Dur. p50", "Dur. p95", "Cola p50", "Cola p95", "Flaky")
+    rows = [
+        (
+            s["pipeline"],
+            s["branch"],
+            str(s["runs"]),
+            f"{s['success_rate']:.0%}",
+            format_duration(s["duration_p50"]),
+            format_duration(s["duration_p95"]),
+            format_duration(s["queue_p50"]),
+            format_duration(s["queue_p95"]),
+            f"{s['flakiness']:.0%}",
+        )
+        for s in data["stats"]
+    ]
+    report = [
+        "📊 ANALÍTICA DE PIPELINES",
+        "=" * 80,
+        "",
+        f"📁 Proyecto: {data['project']}  Últimas {data['last_runs']} ejecuciones por pipeline y rama",
+        "",
+        *_table(header, rows),
+    ]
+    return "\n".join(report)
+
+
+def _watch_text(data: dict) -> str:
+    if data["result"] == "succeeded":
+        icon = "✅"
+    else:
+        icon = "❌" if data["completed"] else "⏳"
+    title = "EJECUCIÓN FINALIZADA" if data["completed"] else "EJECUCIÓN EN CURSO (tiempo de espera agotado)"
+    report = [
+        f"{icon} {title}",
+        "=" * 80,
+        "",
+        f"📁 Proyecto: {data['project']}",
+        f"🔧 Pipeline: {data['pipeline']}",
+        f"🆔 Run: {data['run_id']} ({data['build_number']})",
+        f"Estado: {data['status']}",
+        f"Resultado: {data['result'] or 'N/A'}",
+    ]
+    if data["stages"]:
+        report.append("")
+        report.append("Stages:")
+        for stage in data["stages"]:
+            report.append(f"  - {stage['name']}: {stage['result'] or stage['state']}")
+    return "\n".join(report)
+
+
+def _numbered(lines: list) -> list[dict]:
+    """Líneas de un selector como registros; los separadores de bloque se omiten."""
+    return [{"line": entry[0], "text": entry[1]} for entry in lines if entry is not None]
+
+
+def _logs_text(data: dict) -> str:
+    report = [
+        f"📜 LOGS DE LA EJECUCIÓN {data['run_id']}",
+        "=" * 80,
+        "",
+        f"🔧 Pipeline: {data['pipeline'] or 'N/A'}",
+        f"Estado: {data['status'] or 'N/A'}  Resultado: {data['result'] or 'N/A'}",
+        "",
+    ]
+
+    if "logs" in data:
+        for log in data["logs"]:
+            result = f" [{log['result']}]" if log["result"] else ""
+            report.append(f"- Log {log['id']}: {log['name'] or '-'}{result} ({log['line_count'] or 0} líneas)")
+        return "\n".join(report)
+
+    if "errors" in data:
+        for log in data["errors"]:
+            report.append(f"### Log {log['log_id']}: {log['name'] or '-'} ({log['count']} errores)")
+            for i, block in enumerate(log["blocks"]):
+                if i:
+                    report.append("--")
+                report.extend(format_lines((entry["line"], entry["text"]) for entry in block))
+            if log["truncated"]:
+                report.append("… (truncado)")
+            report.append("")
+        if data["line_limit_reached"]:
+            report.append("⚠️ Límite de líneas alcanzado; indica log_id para ver el resto.")
+        if not data["errors"]:
+            report.append("✅ No se encontraron líneas con ##[error].")
+        return "\n".join(report)
 
+    report.append(f"### Log {data['log']['id']}: {data['log']['name'] or '-'}")
+    report.extend(format_lines((entry["line"], entry["text"]) for entry in data["lines"]))
+    if data.get("next_line"):
+        report.append("")
+        report.append(f"Siguiente start_line: {data['next_line']}")
+    return "\n".join(report)
 
-def register_pipeline_tools(mcp: FastMCP) -> None:
+
+def _blocks(lines: list) -> list[list[dict]]:
+    """Agrupa las líneas de ``ErrorSelector`` en bloques contiguos."""
+    blocks: list[list[dict]] = [[]]
+    for entry in lines:
+        if entry is None:
+            blocks.append([])
+        else:
+            blocks[-1].append({"line": entry[0], "text": entry[1]})
+    return [block for block in blocks if block]
+
+
+def register_pipeline_tools(
+    mcp: FastMCP,
+    client: AzureDevOpsClient,
+    resolver: NameResolver,
+    runs: RunStore,
+    watcher: RunWatcher,
+    logs: PipelineLogs,
+    pipeline_index: PipelineIndex,
+) -> None:
     @mcp.tool()
     async def create_and_run_pipeline(
         project: str,
         repository: str,
         pipeline_name: str,
-        branch: str
-    ) -> dict:
+        branch: Optional[str] = None,
+        branches: Optional[list[str]] = None,
+        folder: Optional[str] = None,
+        yaml_path: Optional[str] = None,
+        output_format: Optional[OutputFormat] = None,
+        fields: Optional[list[str]] = None
+    ) -> str:
         """
         Esta tool debe usarse cuando el usuario solicite la creación de un pipeline en un repositorio.
         Crea (si no existe) y ejecuta un pipeline YAML en Azure DevOps.
+        Si ya hay un pipeline con el mismo nombre en la carpeta, se reutiliza.
         Retorna pipeline_id y run_id para consultar luego el estado.
 
+        Args:
+            project: Nombre del proyecto
+            repository: Repositorio que contiene el YAML
+            pipeline_name: Nombre del pipeline
+            branch: Rama a ejecutar
+            branches: Varias ramas a ejecutar a la vez (se suman a `branch`)
+            folder: Carpeta del pipeline (por defecto la raíz)
+            yaml_path: Ruta del YAML en el repositorio (por defecto AZURE_DEVOPS_PIPELINE_YAML_PATH)
+            output_format: compact (JSON mínimo, por defecto), json o text
+            fields: Campos de cada ejecución a incluir (p. ej. ["branch", "run_id"])
+
         Ejemplo de petición: Create and run a pipeline with name "CI for Repo Backend Repository" to the web-app repository under the project HackathonNov2025
         """
         try:
@@ -25,160 +284,440 @@ def register_pipeline_tools(mcp: FastMCP) -> None:
                 "Content-Type": "application/json"
             }
 
-            async with httpx.AsyncClient(timeout=None) as client:
+            targets = list(dict.fromkeys(
+                b.strip().removeprefix("refs/heads/")
+                for b in ([branch] if branch else []) + (branches or [])
+                if b and b.strip()
+            ))
+            if not targets:
+                return "❌ Error: Indica al menos una rama en 'branch' o 'branches'."
 
-                # ===== Obtener Project ID =====
-                projects_url = f"{get_base_url()}/_apis/projects?api-version={AZURE_DEVOPS_API_VERSION}"
-                res = await client.get(projects_url, headers=headers)
-                res.raise_for_status()
-                project_id = next(
-                    (p["id"] for p in res.json().get("value", []) if p["name"] == project),
-                    None
-                )
-                if not project_id:
-                    return {"error": f"No se encontró el proyecto '{project}'"}
-
-                # ===== Obtener Repository ID =====
-                repos_url = f"{get_base_url()}/{project}/_apis/git/repositories?api-version={AZURE_DEVOPS_API_VERSION}"
-                res = await client.get(repos_url, headers=headers)
-                res.raise_for_status()
-                repo_id = next(
-                    (r["id"] for r in res.json().get("value", []) if r["name"] == repository),
-                    None
-                )
-                if not repo_id:
-                    return {"error": f"No se encontró el repositorio '{repository}'"}
-
-                # ===== Crear pipeline =====
-                create_url = f"{get_base_url()}/{project}/_apis/pipelines?api-version={AZURE_DEVOPS_API_VERSION}"
-                create_body = {
-                    "name": pipeline_name,
-                    "configuration": {
-                        "type": "yaml",
-                        "path": ".azure-pipelines/ci.yml",
-                        "repository": {"id": repo_id, "type": "azureReposGit"}
+            # ===== Obtener Project ID =====
+            with deadlines.step("resolver proyecto"):
+                project_id = await resolver.project_id(project)
+            if not project_id:
+                return f"❌ Error: No se encontró el proyecto '{project}'."
+
+            # ===== Reutilizar o crear el pipeline =====
+            async with pipeline_index.lock(project, pipeline_name, folder):
+                with deadlines.step("buscar pipeline existente"):
+                    pipeline = await pipeline_index.find(project, pipeline_name, folder)
+                created = pipeline is None
+
+                if created:
+                    # ===== Obtener Repository ID =====
+                    with deadlines.step("resolver repositorio"):
+                        repo_id = await resolver.repository_id(project, repository)
+                    if not repo_id:
+                        return f"❌ Error: No se encontró el repositorio '{repository}'."
+
+                    create_url = f"{get_base_url()}/{project}/_apis/pipelines?api-version={AZURE_DEVOPS_API_VERSION}"
+                    create_body = {
+                        "name": pipeline_name,
+                        "folder": normalize_folder(folder),
+                        "configuration": {
+                            "type": "yaml",
+                            "path": yaml_path or PIPELINE_YAML_PATH,
+                            "repository": {"id": repo_id, "type": "azureReposGit"}
+                        }
                     }
-                }
-                res = await client.post(create_url, headers=headers, json=create_body)
-                res.raise_for_status()
-                pipeline_id = res.json().get("id")
+                    with deadlines.step("crear pipeline"):
+                        res = await client.post(create_url, headers=headers, json=create_body)
+                    if res.status_code in (400, 409):
+                        # Puede haberse creado fuera de este servidor tras cachear el índice
+                        pipeline_index.forget(project)
+                        pipeline = await pipeline_index.find(project, pipeline_name, folder)
+                        created = pipeline is None
+                    if created:
+                        res.raise_for_status()
+                        pipeline = res.json()
+                        pipeline_index.remember(project, pipeline)
+
+            pipeline_id = pipeline["id"]
+
+            # ===== Ejecutar pipeline en cada rama =====
+            run_url = f"{get_base_url()}/{project}/_apis/pipelines/{pipeline_id}/runs?api-version={AZURE_DEVOPS_API_VERSION}"
+            semaphore = asyncio.Semaphore(PIPELINE_RUN_CONCURRENCY)
 
-                # ===== Ejecutar pipeline =====
-                run_url = f"{get_base_url()}/{project}/_apis/pipelines/{pipeline_id}/runs?api-version={AZURE_DEVOPS_API_VERSION}"
+            async def run_branch(target: str) -> dict:
                 run_body = {
                     "resources": {
                         "repositories": {
-                            "self": {"refName": f"refs/heads/{branch}"}
+                            "self": {"refName": f"refs/heads/{target}"}
                         }
                     }
                 }
-                res = await client.post(run_url, headers=headers, json=run_body)
-                res.raise_for_status()
-                run_id = res.json().get("id")
-
-                return {
-                    "pipeline_id": pipeline_id,
-                    "run_id": run_id,
-                    "message": "Pipeline creado y ejecutado exitosamente"
-                }
+                async with semaphore:
+                    try:
+                        res = await client.post(run_url, headers=headers, json=run_body)
+                        res.raise_for_status()
+                        return {"branch": target, "run_id": res.json().get("id")}
+                    except httpx.HTTPStatusError as e:
+                        return {"branch": target, "error": f"HTTP {e.response.status_code}: {e.response.text}"}
+                    except Exception as e:
+                        return {"branch": target, "error": str(e)}
+
+            with deadlines.step("encolar ejecuciones"):
+                results = await asyncio.gather(*(run_branch(t) for t in targets))
+            queued = [r for r in results if "run_id" in r]
+
+            action = "creado" if created else "existente reutilizado"
+            data = {
+                "project": project,
+                "pipeline_id": pipeline_id,
+                "pipeline_name": pipeline.get("name", pipeline_name),
+                "created": created,
+                "run_id": queued[0]["run_id"] if queued else None,
+                "runs": results,
+                "message": (
+                    f"Pipeline {action}; {len(queued)}/{len(targets)} ejecuciones encoladas"
+                    if queued else f"Pipeline {action}, pero no se pudo encolar ninguna ejecución"
+                )
+            }
+            return render(data, _create_run_text, output_format, fields)
+
+        except httpx.HTTPStatusError as e:
+            return f"❌ Error HTTP {e.response.status_code}: {e.response.text}"
 
         except Exception as ex:
-            return {"error": str(ex)}
+            return f"❌ Error inesperado: {str(ex)}"
 
     @mcp.tool()
     async def get_pipeline_run_report(
-        project: str
+        project: str,
+        pipelines: Optional[str] = None,
+        output_format: Optional[OutputFormat] = None,
+        fields: Optional[list[str]] = None
     ) -> str:
         """
         Retrieves the latest pipeline run for a given project,
         dynamically resolving project_id, pipeline_id and run_id.
-        Returns a full formatted report.
+        Returns a report of the run (or a dashboard for several pipelines).
+
+        Args:
+            project: Nombre del proyecto
+            pipelines: "all" o un patrón de nombres (p. ej. "api-*") para obtener
+                una tabla con la última ejecución de cada pipeline. Si se omite,
+                se reporta el primer pipeline del proyecto.
+            output_format: compact (JSON mínimo, por defecto), json o text
+            fields: Campos de cada pipeline a incluir (p. ej. ["name", "run.result"])
         """
         try:
-            headers = {"Authorization": get_auth_header()}
+            # ============================================================
+            # 1. Resolve project_id from project name
+            # ============================================================
+            project_id = await resolver.project_id(project)
 
-            async with httpx.AsyncClient() as client:
+            if not project_id:
+                return f"❌ Project '{project}' not found."
 
-                # ============================================================
-                # 1. Resolve project_id from project name
-                # ============================================================
-                projects_url = f"{get_base_url()}/_apis/projects?api-version={AZURE_DEVOPS_API_VERSION}"
-                res = await client.get(projects_url, headers=headers)
-                res.raise_for_status()
+            # ============================================================
+            # 2. Get the pipelines for this project
+            # ============================================================
+            all_pipelines = await pipeline_index.pipelines(project)
+            if not all_pipelines:
+                return f"❌ No pipelines found in project '{project}'."
 
-                project_id = next(
-                    (p["id"] for p in res.json().get("value", []) if p["name"].lower() == project.lower()),
-                    None
-                )
+            if pipelines is None:
+                selected = all_pipelines[:1]
+            elif pipelines.strip().lower() in ("all", "*"):
+                selected = all_pipelines
+            else:
+                pattern = pipelines.lower()
+                selected = [p for p in all_pipelines if fnmatch.fnmatch(p["name"].lower(), pattern)]
+                if not selected:
+                    return f"❌ No pipelines matching '{pipelines}' in project '{project}'."
+
+            # ============================================================
+            # 3. Get the latest run of each selected pipeline
+            # ============================================================
+            latest = await latest_builds(client, project, [p["id"] for p in selected])
 
-                if not project_id:
-                    return f"❌ Project '{project}' not found."
+            if pipelines is None:
+                pipeline = selected[0]
+                pipeline_id = pipeline["id"]
+                run_info = latest.get(pipeline_id)
+                if not run_info:
+                    return f"❌ No runs found for pipeline {pipeline_id} in project '{project}'."
 
                 # ============================================================
-                # 2. Get all pipelines for this project
+                # 4. Build the report of the run
                 # ============================================================
-                pipelines_url = f"{get_base_url()}/{project}/_apis/pipelines?api-version={AZURE_DEVOPS_API_VERSION}"
-                res = await client.get(pipelines_url, headers=headers)
-                res.raise_for_status()
+                data = {
+                    "project": project,
+                    "pipeline": {"id": pipeline_id, "name": pipeline.get("name")},
+                    "run": _run_summary(run_info),
+                }
+                return render(data, _run_report_text, output_format, fields)
 
-                pipelines = res.json().get("value", [])
-                if not pipelines:
-                    return f"❌ No pipelines found in project '{project}'."
+            # ============================================================
+            # 4. Build the dashboard
+            # ============================================================
+            rows = []
+            for pipeline in sorted(selected, key=lambda p: p["name"].lower()):
+                run = latest.get(pipeline["id"])
+                rows.append({
+                    "id": pipeline["id"],
+                    "name": pipeline["name"],
+                    "run": _run_summary(run) if run is not None else None,
+                })
 
-                # Select the first pipeline (or adjust selection logic)
-                pipeline = pipelines[0]
-                pipeline_id = pipeline["id"]
+            failed = sum(
+                1 for row in rows
+                if row["run"] and row["run"]["result"] in ("failed", "partiallySucceeded")
+            )
+            data = {"project": project, "with_failures": failed, "pipelines": rows}
+            return render(data, _dashboard_text, output_format, fields)
 
-                # ============================================================
-                # 3. Get the latest run for the selected pipeline
-                # ============================================================
-                runs_url = f"{get_base_url()}/{project}/_apis/pipelines/{pipeline_id}/runs?api-version={AZURE_DEVOPS_API_VERSION}"
-                res = await client.get(runs_url, headers=headers)
-                res.raise_for_status()
+        except Exception as ex:
+            return f"❌ Error obtaining pipeline run report: {str(ex)}"
 
-                runs = res.json().get("value", [])
-                if not runs:
-                    return f"❌ No runs found for pipeline {pipeline_id} in project '{project}'."
+    @mcp.tool()
+    async def get_pipeline_analytics(
+        project: str,
+        pipelines: Optional[str] = None,
+        branch: Optional[str] = None,
+        last_runs: int = 50,
+        output_format: Optional[OutputFormat] = None,
+        fields: Optional[list[str]] = None
+    ) -> str:
+        """
+        Estadísticas de ejecución por pipeline y rama: tasa de éxito,
+        duración p50/p95, tiempo en cola y flakiness (cambios de resultado
+        entre ejecuciones consecutivas).
 
-                latest_run = runs[0]  # Always the latest execution
-                run_id = latest_run["id"]
+        Usa la caché local de ejecuciones: las completadas se descargan una
+        sola vez, así que las consultas repetidas son casi sin red.
 
-                # ============================================================
-                # 4. Fetch full run details
-                # ============================================================
-                run_detail_url = (
-                    f"{get_base_url()}/{project}/_apis/pipelines/{pipeline_id}/runs/{run_id}"
-                    f"?api-version={AZURE_DEVOPS_API_VERSION}"
-                )
+        Args:
+            project: Nombre del proyecto
+            pipelines: Patrón de nombres de pipeline (p. ej. "api-*"); todos si se omite
+            branch: Rama a analizar (p. ej. "main"); todas si se omite
+            last_runs: Ejecuciones completadas más recientes a considerar por pipeline y rama
+            output_format: compact (JSON mínimo, por defecto), json o text
+            fields: Campos de cada estadística a incluir (p. ej. ["pipeline", "success_rate"])
+        """
+        try:
+            project_id = await resolver.project_id(project)
+            if not project_id:
+                return f"❌ Proyecto '{project}' no encontrado."
 
-                res = await client.get(run_detail_url, headers=headers)
-                res.raise_for_status()
-                run_info = res.json()
+            definition_ids = None
+            if pipelines and pipelines.strip().lower() not in ("all", "*"):
+                pattern = pipelines.lower()
+                definition_ids = [
+                    p["id"] for p in await pipeline_index.pipelines(project)
+                    if fnmatch.fnmatch(p["name"].lower(), pattern)
+                ]
+                if not definition_ids:
+                    return f"❌ Ningún pipeline coincide con '{pipelines}' en el proyecto '{project}'."
 
-                # Helper
-                def safe(key):
-                    return run_info.get(key, "N/A")
+            stats = await runs.analytics(project, definition_ids, branch, max(last_runs, 1))
+            if not stats:
+                return f"ℹ️ No hay ejecuciones completadas para analizar en '{project}'."
 
-                # ============================================================
-                # 5. Build formatted report
-                # ============================================================
-                report = []
-                report.append("✅ PIPELINE RUN REPORT")
-                report.append("=" * 80)
-                report.append("")
-                report.append(f"Project: {project}")
-                report.append(f"Pipeline: {pipeline.get('name', 'N/A')} (ID: {pipeline_id})")
-                report.append(f"Run ID: {run_id}")
-                report.append(f"State: {safe('state')}")
-                report.append(f"Result: {safe('result')}")
-                report.append(f"Created: {safe('createdDate')}")
-                report.append(f"Finished: {safe('finishedDate')}")
-                report.append("")
-                report.append("RAW DATA:")
-                report.append("=" * 80)
-                report.append(str(run_info))
-
-                return "\n".join(report)
+            data = {
+                "project": project,
+                "last_runs": last_runs,
+                "stats": [
+                    {
+                        "pipeline": s.pipeline,
+                        "branch": s.branch,
+                        "runs": s.runs,
+                        "success_rate": round(s.success_rate, 4),
+                        "duration_p50": s.duration_p50,
+                        "duration_p95": s.duration_p95,
+                        "queue_p50": s.queue_p50,
+                        "queue_p95": s.queue_p95,
+                        "flakiness": round(s.flakiness, 4),
+                    }
+                    for s in sorted(stats, key=lambda s: (s.pipeline.lower(), s.branch.lower()))
+                ],
+            }
+            return render(data, _analytics_text, output_format, fields)
 
-        except Exception as ex:
-            return f"❌ Error obtaining pipeline run report: {str(ex)}"
+        except httpx.HTTPStatusError as e:
+            return f"❌ Error HTTP {e.response.status_code}: {e.response.text}"
+        except Exception as e:
+            return f"❌ Error al calcular la analítica: {str(e)}"
+
+    @mcp.tool()
+    async def watch_pipeline_run(
+        project: str,
+        run_id: int,
+        ctx: Context,
+        timeout_seconds: int = 600,
+        output_format: Optional[OutputFormat] = None,
+        fields: Optional[list[str]] = None
+    ) -> str:
+        """
+        Sigue una ejecución de pipeline (el run_id que retorna
+        create_and_run_pipeline) hasta que termine, enviando notificaciones
+        de progreso en cada cambio de estado o de stage. Usar en lugar de
+        llamar repetidamente a get_pipeline_run_report.
+
+        Args:
+            project: Nombre del proyecto
+            run_id: ID de la ejecución
+            timeout_seconds: Tiempo máximo de espera; al agotarse retorna el último estado
+            output_format: compact (JSON mínimo, por defecto), json o text
+            fields: Campos de cada stage a incluir (p. ej. ["name", "result"])
+        """
+        error = check_format(output_format)
+        if error:
+            return error
+
+        snapshot = None
+        events = 0
+        try:
+            async with asyncio.timeout(timeout_seconds):
+                async for snapshot in watcher.watch(project, run_id):
+                    if snapshot.error:
+                        return f"❌ Error al seguir la ejecución {run_id}: {snapshot.error}"
+                    events += 1
+                    current = next((s.name for s in snapshot.stages if s.state == "inProgress"), None)
+                    message = f"{snapshot.status}" + (f" ({snapshot.result})" if snapshot.result else "")
+                    if snapshot.stages:
+                        message += f" - stages {snapshot.completed_stages}/{len(snapshot.stages)}"
+                    if current:
+                        message += f", en curso: {current}"
+                    await ctx.report_progress(events, None, message)
+        except TimeoutError:
+            pass
+
+        if snapshot is None:
+            return f"⏳ Sin respuesta de la ejecución {run_id} tras {timeout_seconds} s."
+
+        data = {
+            "project": project,
+            "run_id": run_id,
+            "pipeline": snapshot.pipeline,
+            "build_number": snapshot.build_number,
+            "status": snapshot.status,
+            "result": snapshot.result,
+            "completed": snapshot.completed,
+            "stages": [
+                {"name": stage.name, "state": stage.state, "result": stage.result}
+                for stage in snapshot.stages
+            ],
+        }
+        return render(data, _watch_text, output_format, fields)
+
+    @mcp.tool()
+    async def get_pipeline_logs(
+        project: str,
+        run_id: int,
+        mode: str = "list",
+        log_id: Optional[int] = None,
+        lines: int = 100,
+        start_line: int = 1,
+        context: int = 3,
+        output_format: Optional[OutputFormat] = None,
+        fields: Optional[list[str]] = None
+    ) -> str:
+        """
+        Consulta los logs de una ejecución de pipeline para ver por qué falló.
+
+        Modos:
+            list: lista los logs de la ejecución (ID, tarea, resultado, líneas)
+            errors: solo las líneas con ##[error] y `context` líneas alrededor;
+                sin log_id revisa los logs de las tareas fallidas
+            tail: las últimas `lines` líneas del log `log_id`
+            range: `lines` líneas del log `log_id` desde `start_line`; retorna
+                la siguiente línea para continuar
+
+        Args:
+            project: Nombre del proyecto
+            run_id: ID de la ejecución
+            mode: list, errors, tail o range
+            log_id: ID del log (obtenido con mode="list")
+            lines: Máximo de líneas a retornar
+            start_line: Primera línea (modo range)
+            context: Líneas de contexto alrededor de cada error (modo errors)
+            output_format: compact (JSON mínimo, por defecto), json o text
+            fields: Campos de cada registro a incluir (p. ej. ["id", "result"] en mode="list")
+        """
+        mode = mode.lower()
+        if mode not in ("list", "errors", "tail", "range"):
+            return f"❌ Modo no soportado: '{mode}'. Usa list, errors, tail o range."
+        if mode in ("tail", "range") and log_id is None:
+            return f"❌ El modo '{mode}' requiere log_id (obtenlo con mode=\"list\")."
+        lines = max(lines, 1)
+
+        try:
+            build, run_logs = await logs.describe(project, run_id)
+            completed = build.get("status") == "completed"
+            by_id = {log["id"]: log for log in run_logs}
+
+            data = {
+                "run_id": run_id,
+                "pipeline": (build.get("definition") or {}).get("name"),
+                "status": build.get("status"),
+                "result": build.get("result"),
+            }
+
+            if mode == "list":
+                data["logs"] = [
+                    {
+                        "id": log["id"],
+                        "name": log["name"],
+                        "type": log["type"],
+                        "result": log["result"],
+                        "line_count": log["lineCount"],
+                    }
+                    for log in run_logs
+                ]
+                return render(data, _logs_text, output_format, fields)
+
+            if log_id is not None and log_id not in by_id:
+                return f"❌ La ejecución {run_id} no tiene el log {log_id}."
+
+            if mode == "errors":
+                if log_id is not None:
+                    targets = [by_id[log_id]]
+                else:
+                    targets = [log for log in run_logs if log["result"] == "failed" and log["type"] == "Task"]
+                    targets = targets or run_logs
+
+                remaining = lines
+                data["errors"] = []
+                data["line_limit_reached"] = False
+                for log in targets:
+                    if remaining <= 0:
+                        data["line_limit_reached"] = True
+                        break
+                    selector = ErrorSelector(context, remaining)
+                    await logs.scan(project, run_id, log["id"], selector, completed)
+                    if not selector.errors:
+                        continue
+                    data["errors"].append({
+                        "log_id": log["id"],
+                        "name": log["name"],
+                        "count": selector.errors,
+                        "blocks": _blocks(selector.lines),
+                        "truncated": selector.truncated,
+                    })
+                    remaining -= len(selector.lines)
+                return render(data, _logs_text, output_format, fields)
+
+            log = by_id[log_id]
+            data["log"] = {"id": log_id, "name": log["name"]}
+            if mode == "tail":
+                selector = TailSelector(lines)
+                # En curso: solo se piden a la API las últimas líneas conocidas
+                start = 1 if completed else max((log["lineCount"] or 0) - lines + 1, 1)
+                await logs.scan(project, run_id, log_id, selector, completed, start=start)
+            else:
+                selector = RangeSelector(start_line, start_line + lines, lines)
+                await logs.scan(
+                    project, run_id, log_id, selector, completed,
+                    start=start_line, end=start_line + lines
+                )
+                data["next_line"] = selector.next_line
+            data["lines"] = _numbered(selector.lines)
+            return render(data, _logs_text, output_format, fields)
+
+        except httpx.HTTPStatusError as e:
+            return f"❌ Error HTTP {e.response.status_code}: {e.response.text}"
+        except Exception as e:
+            return f"❌ Error al obtener los logs: {str(e)}"
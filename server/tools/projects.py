@@ -1,36 +1,92 @@
-import httpx
 from fastmcp import FastMCP
+from typing import Optional
 
 from azure_devops_config import (
     get_base_url,
     get_auth_header,
     AZURE_DEVOPS_API_VERSION,
 )
+from core.http_client import AzureDevOpsClient
+from core.output import OutputBudget, OutputFormat, render
+from core.pagination import DEFAULT_PAGE_SIZE, cursor_after, iter_pages
 
-def register_project_tools(mcp: FastMCP) -> None:
+
+def _projects_text(data: dict) -> str:
+    lines = ["Proyectos encontrados:", ""]
+    for project in data["projects"]:
+        lines.append(f"- {project['name']} (ID: {project['id']})")
+        lines.append(f"  Estado: {project['state']}")
+        lines.append(f"  URL: {project['url']}")
+        lines.append("")
+    if data["next_cursor"]:
+        lines.append(f"Siguiente cursor: {data['next_cursor']}")
+    return "\n".join(lines) + "\n"
+
+
+def register_project_tools(mcp: FastMCP, client: AzureDevOpsClient) -> None:
     @mcp.tool()
-    async def list_projects() -> str:
+    async def list_projects(
+        page_size: Optional[int] = None,
+        cursor: Optional[str] = None,
+        output_format: Optional[OutputFormat] = None,
+        fields: Optional[list[str]] = None
+    ) -> str:
         """
         Lista todos los proyectos en la organización de Azure DevOps.
 
+        Args:
+            page_size: Si se indica, retorna solo una página de este tamaño; si
+                se omite, retorna las páginas que quepan en la salida y el cursor
+                desde el que continuar
+            cursor: Cursor de la página a consultar (retornado por la llamada anterior)
+            output_format: compact (JSON mínimo, por defecto), json o text
+            fields: Campos de cada proyecto a incluir (p. ej. ["name", "id"])
+
         Returns:
-            JSON string con la lista de proyectos
+            Lista de proyectos y, si se pagina, el siguiente cursor
         """
         url = f"{get_base_url()}/_apis/projects?api-version={AZURE_DEVOPS_API_VERSION}"
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url,
-                headers={"Authorization": get_auth_header()}
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            projects = data.get("value", [])
-            result = "Proyectos encontrados:\n\n"
-            for project in projects:
-                result += f"- {project['name']} (ID: {project['id']})\n"
-                result += f"  Estado: {project['state']}\n"
-                result += f"  URL: {project['url']}\n\n"
-
-            return result
+        headers = {"Authorization": get_auth_header()}
+        projects = []
+        next_cursor = None
+        budget = OutputBudget()
+        page_cursor = cursor
+        async for page in iter_pages(
+            client,
+            url,
+            headers=headers,
+            page_size=page_size or DEFAULT_PAGE_SIZE,
+            cursor=cursor
+        ):
+            page_projects = [
+                {
+                    "id": project["id"],
+                    "name": project["name"],
+                    "state": project.get("state"),
+                    "url": project.get("url"),
+                }
+                for project in page.items
+            ]
+            if not page_size and not budget.take(page_projects):
+                # La página no cabe en la salida: se continúa desde ella
+                next_cursor = page_cursor
+                break
+            projects.extend(page_projects)
+            page_cursor = page.continuation_token
+            if not page_size and budget.overflowed:
+                # Ni la primera página cabe: se retornan los proyectos que caben
+                # y el cursor del primero que se queda fuera
+                kept = max(budget.fitting, 1)
+                resume = await cursor_after(client, url, headers, kept, cursor)
+                if resume:
+                    del projects[kept:]
+                    next_cursor = resume
+                break
+
+            if page_size:
+                next_cursor = page.continuation_token
+                break
+
+        data = {"projects": projects, "next_cursor": next_cursor}
+        return render(data, _projects_text, output_format, fields)
@@ -1,87 +1,299 @@
+import asyncio
+import fnmatch
 import httpx
 from fastmcp import FastMCP
+from pydantic import BaseModel
+from typing import Optional
 
 from azure_devops_config import (
     get_base_url,
     get_auth_header,
-    AZURE_DEVOPS_ORG,
     AZURE_DEVOPS_API_VERSION,
+    REPOSITORY_BULK_CONCURRENCY,
+    REPOSITORY_IMPORT_CONCURRENCY,
 )
+from core.http_client import AzureDevOpsClient
+from core.identities import IdentityResolver
+from core.imports import create_repository, describe_import, start_import, wait_for_import
+from core.jobs import Job, JobRegistry
+from core.metadata import MetadataCache
+from core.output import OutputBudget, OutputFormat, render
+from core.pagination import DEFAULT_PAGE_SIZE, cursor_after, iter_items, iter_pages
+from core.resolver import NameResolver
 
-def register_repository_tools(mcp: FastMCP) -> None:
+
+class UserSpec(BaseModel):
+    """Usuario al que se asignan permisos."""
+    email: str
+    name: str
+
+
+class ImportSpec(BaseModel):
+    """Repositorio a crear e importar desde una URL Git."""
+    repository: str
+    url: str
+
+
+def _contribute_ace(descriptor: str, contribute_bit: int) -> dict:
+    """Entrada de control de acceso que concede 'Contribute'."""
+    return {
+        "descriptor": descriptor,
+        "allow": contribute_bit,
+        "deny": 0,
+        "extendedInfo": {
+            "effectiveAllow": contribute_bit,
+            "effectiveDeny": 0,
+            "inheritedAllow": contribute_bit,
+            "inheritedDeny": 0
+        }
+    }
+
+
+def _repositories_text(data: dict) -> str:
+    if not data["repositories"]:
+        return f"No se encontraron repositorios en el proyecto '{data['project']}'."
+
+    lines = [
+        f"📁 REPOSITORIOS EN '{data['project']}'",
+        "=" * 80,
+        "",
+        f"Total de repositorios: {len(data['repositories'])}",
+        "",
+    ]
+    for repo in data["repositories"]:
+        lines.append(f"📦 {repo['name']}")
+        lines.append(f"   🆔 ID: {repo['id']}")
+        lines.append(f"   🌐 URL: {repo['url']}")
+        lines.append(f"   🔗 Web URL: {repo['web_url'] or 'N/A'}")
+        lines.append(f"   📊 Tamaño: {repo['size']} bytes")
+        lines.append(f"   🌿 Rama por defecto: {repo['default_branch'] or 'N/A'}")
+        status = "❌ Deshabilitado" if repo["disabled"] else "✅ Activo"
+        lines.append(f"   📌 Estado: {status}")
+        lines.append("")
+    if data["next_cursor"]:
+        lines.append(f"➡️ Siguiente cursor: {data['next_cursor']}")
+    return "\n".join(lines) + "\n"
+
+
+def _permission_text(data: dict) -> str:
+    result = "✅ PERMISO ASIGNADO EXITOSAMENTE\n"
+    result += "=" * 80 + "\n\n"
+    result += f"👤 Usuario: {data['user']['name']} ({data['user']['email']})\n"
+    result += f"📦 Repositorio: {data['repository']}\n"
+    result += f"📁 Proyecto: {data['project']}\n"
+    result += f"🔐 Permiso: {data['permission']}\n"
+    result += f"🆔 Project ID: {data['project_id']}\n"
+    result += f"🆔 Repo ID: {data['repository_id']}\n"
+    result += f"🆔 User Descriptor: {data['user_descriptor']}\n\n"
+    result += "El usuario ahora puede contribuir al repositorio.\n"
+    return result
+
+
+def _outcome(entry: dict) -> str:
+    return "✅" if entry["ok"] else f"❌ {entry['error']}"
+
+
+def _permission_bulk_text(data: dict) -> str:
+    lines = [
+        "✅ PERMISOS ASIGNADOS" if data["granted"] == data["total"] else "⚠️ PERMISOS ASIGNADOS PARCIALMENTE",
+        "=" * 80,
+        "",
+        f"📁 Proyecto: {data['project']}",
+        f"🔐 Permiso: {data['permission']}",
+        f"✅ Asignados: {data['granted']} de {data['total']}",
+        "",
+    ]
+    user = None
+    for entry in data["results"]:
+        if entry["email"] != user:
+            if user is not None:
+                lines.append("")
+            user = entry["email"]
+            lines.append(f"👤 {entry['user']} ({entry['email']})")
+        lines.append(f"   📦 {entry['repository']}: {_outcome(entry)}")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def _policy_text(data: dict) -> str:
+    result = "✅ POLÍTICA ASIGNADA EXITOSAMENTE\n"
+    result += "=" * 80 + "\n\n"
+    result += f"📁 Proyecto: {data['project']}\n"
+    result += f"📦 Repositorio: {data['repository']}\n"
+    result += f"🔐 Política: {data['policy']}\n"
+    result += f"🆔 Project ID: {data['project_id']}\n"
+    result += f"🆔 Repo ID: {data['repository_id']}\n"
+    return result
+
+
+def _rollout_text(data: dict) -> str:
+    summary = data["summary"]
+    if data["dry_run"]:
+        title = "🔎 PLAN DE POLÍTICAS (DRY RUN)"
+    elif summary["failed"]:
+        title = "⚠️ POLÍTICAS APLICADAS PARCIALMENTE"
+    else:
+        title = "✅ POLÍTICAS APLICADAS EXITOSAMENTE"
+
+    lines = [
+        title,
+        "=" * 80,
+        "",
+        f"📁 Proyecto: {data['project']}",
+        f"🔐 Política: {data['policy']} ({data['reviewers']})",
+        f"📦 Repositorios: {data['repositories']}  🌿 Ramas: {', '.join(data['branches'])}",
+        f"➕ Crear: {summary['create']}  "
+        f"✏️ Actualizar: {summary['update']}  "
+        f"⏭️ Sin cambios: {summary['skip']}",
+        "",
+    ]
+    for entry in data["plan"]:
+        line = f"{entry['repository']} @ {entry['branch']}: {entry['action']} ({entry['detail']})"
+        if entry.get("ok") is not None:
+            line += f" {_outcome(entry)}"
+            if entry.get("same_policy"):
+                line += " (misma política)"
+        lines.append(line)
+        if entry.get("extra_scopes"):
+            lines.append(f"   ⚠️ También afecta a: {', '.join(entry['extra_scopes'])}")
+    return "\n".join(lines)
+
+
+def _import_text(data: dict) -> str:
+    return (
+        "✅ REPOSITORIO CREADO, IMPORTACIÓN INICIADA\n"
+        + "=" * 80 + "\n\n"
+        + f"📁 Proyecto: {data['project']}\n"
+        + f"📦 Repositorio: {data['repository']}\n"
+        + f"🆔 Project ID: {data['project_id']}\n"
+        + f"🆔 Repo ID: {data['repository_id']}\n"
+        + f"🔗 URL Remota: {data['remote_url']}\n"
+        + f"⏳ Job: {data['job_id']} (consulta el progreso con get_job_status)\n"
+    )
+
+
+def _import_bulk_text(data: dict) -> str:
+    lines = [
+        "⏳ IMPORTACIONES EN COLA",
+        "=" * 80,
+        "",
+        f"📁 Proyecto: {data['project']}",
+        f"📦 Repositorios: {len(data['jobs'])}",
+        "",
+    ]
+    for entry in data["jobs"]:
+        lines.append(f"- {entry['repository']}: job {entry['job_id']}")
+    lines.append("")
+    lines.append("Consulta el progreso con get_job_status.")
+    return "\n".join(lines)
+
+
+def register_repository_tools(
+    mcp: FastMCP,
+    client: AzureDevOpsClient,
+    resolver: NameResolver,
+    metadata: MetadataCache,
+    identities: IdentityResolver,
+    jobs: JobRegistry,
+) -> None:
 
     @mcp.tool()
-    async def list_repositories(project: str) -> str:
+    async def list_repositories(
+        project: str,
+        page_size: Optional[int] = None,
+        cursor: Optional[str] = None,
+        output_format: Optional[OutputFormat] = None,
+        fields: Optional[list[str]] = None
+    ) -> str:
         """
         Lista todos los repositorios Git en un proyecto de Azure DevOps.
         
         Args:
             project: Nombre del proyecto en Azure DevOps
+            page_size: Si se indica, retorna solo una página de este tamaño; si
+                se omite, retorna las páginas que quepan en la salida y el cursor
+                desde el que continuar
+            cursor: Cursor de la página a consultar (retornado por la llamada anterior)
+            output_format: compact (JSON mínimo, por defecto), json o text
+            fields: Campos de cada repositorio a incluir (p. ej. ["name", "default_branch"])
         
         Returns:
-            Lista formateada con información de los repositorios
+            Repositorios del proyecto y, si se pagina, el siguiente cursor
         """
         url = f"{get_base_url()}/{project}/_apis/git/repositories?api-version={AZURE_DEVOPS_API_VERSION}"
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    url,
-                    headers={"Authorization": get_auth_header()}
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                repositories = data.get("value", [])
-                
-                if not repositories:
-                    return f"No se encontraron repositorios en el proyecto '{project}'."
-                
-                result = f"📁 REPOSITORIOS EN '{project}'\n"
-                result += "=" * 80 + "\n\n"
-                result += f"Total de repositorios: {len(repositories)}\n\n"
-                
-                for repo in repositories:
-                    result += f"📦 {repo['name']}\n"
-                    result += f"   🆔 ID: {repo['id']}\n"
-                    result += f"   🌐 URL: {repo['url']}\n"
-                    result += f"   🔗 Web URL: {repo.get('webUrl', 'N/A')}\n"
-                    result += f"   📊 Tamaño: {repo.get('size', 0)} bytes\n"
-                    
-                    # Información de la rama por defecto
-                    default_branch = repo.get('defaultBranch', 'N/A')
-                    if default_branch != 'N/A' and default_branch.startswith('refs/heads/'):
-                        default_branch = default_branch.replace('refs/heads/', '')
-                    result += f"   🌿 Rama por defecto: {default_branch}\n"
-                    
-                    # Estado del repositorio
-                    is_disabled = repo.get('isDisabled', False)
-                    status = "❌ Deshabilitado" if is_disabled else "✅ Activo"
-                    result += f"   📌 Estado: {status}\n"
-                    
-                    result += "\n"
-                
-                return result
+        try:
+            # Solo se conservan los campos que se retornan; cada página se
+            # descarta una vez procesada.
+            headers = {"Authorization": get_auth_header()}
+            repositories = []
+            next_cursor = None
+            budget = OutputBudget()
+            page_cursor = cursor
+            
+            async for page in iter_pages(
+                client,
+                url,
+                headers=headers,
+                page_size=page_size or DEFAULT_PAGE_SIZE,
+                cursor=cursor
+            ):
+                page_repositories = [
+                    {
+                        "id": repo["id"],
+                        "name": repo["name"],
+                        "url": repo["url"],
+                        "web_url": repo.get("webUrl"),
+                        "size": repo.get("size", 0),
+                        "default_branch": (repo.get("defaultBranch") or "").removeprefix("refs/heads/") or None,
+                        "disabled": repo.get("isDisabled", False),
+                    }
+                    for repo in page.items
+                ]
+                if not page_size and not budget.take(page_repositories):
+                    # La página no cabe en la salida: se continúa desde ella
+                    next_cursor = page_cursor
+                    break
+                repositories.extend(page_repositories)
+                page_cursor = page.continuation_token
+                if not page_size and budget.overflowed:
+                    # Ni la primera página cabe: se retornan los repositorios que
+                    # caben y el cursor del primero que se queda fuera
+                    kept = max(budget.fitting, 1)
+                    resume = await cursor_after(client, url, headers, kept, cursor)
+                    if resume:
+                        del repositories[kept:]
+                        next_cursor = resume
+                    break
                 
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 404:
-                    return f"❌ Error: No se encontró el proyecto '{project}'. Verifica que el nombre sea correcto."
-                elif e.response.status_code == 401:
-                    return "❌ Error de autenticación. Verifica tu Personal Access Token (PAT)."
-                elif e.response.status_code == 403:
-                    return f"❌ Error: No tienes permisos para acceder a los repositorios del proyecto '{project}'."
-                else:
-                    return f"❌ Error HTTP {e.response.status_code}: {str(e)}"
-            except Exception as e:
-                return f"❌ Error inesperado: {str(e)}"
+                if page_size:
+                    next_cursor = page.continuation_token
+                    break
             
+            data = {"project": project, "repositories": repositories, "next_cursor": next_cursor}
+            return render(data, _repositories_text, output_format, fields)
+            
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return f"❌ Error: No se encontró el proyecto '{project}'. Verifica que el nombre sea correcto."
+            elif e.response.status_code == 401:
+                return "❌ Error de autenticación. Verifica tu Personal Access Token (PAT)."
+            elif e.response.status_code == 403:
+                return f"❌ Error: No tienes permisos para acceder a los repositorios del proyecto '{project}'."
+            else:
+                return f"❌ Error HTTP {e.response.status_code}: {str(e)}"
+        except Exception as e:
+            return f"❌ Error inesperado: {str(e)}"
+        
     
     @mcp.tool()
     async def assign_contribute_permission(
         project: str,
         repository: str,
         user_email: str,
-        user_name: str
+        user_name: str,
+        output_format: Optional[OutputFormat] = None,
+        fields: Optional[list[str]] = None
     ) -> str:
         """
         Asigna permisos de contribuidor a un usuario en un repositorio de Azure DevOps.
@@ -91,132 +303,82 @@ def register_repository_tools(mcp: FastMCP) -> None:
             repository: Nombre del repositorio
             user_email: Email del usuario al que se le asignarán permisos
             user_name: Nombre completo del usuario
+            output_format: compact (JSON mínimo, por defecto), json o text
+            fields: Campos a incluir (p. ej. ["repository_id"])
         
         Returns:
             Mensaje indicando el resultado de la operación
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                headers = {"Authorization": get_auth_header()}
-                organization = AZURE_DEVOPS_ORG
-                
-                # ===== 1. Obtener Project ID =====
-                projects_url = f"{get_base_url()}/_apis/projects?api-version={AZURE_DEVOPS_API_VERSION}"
-                projects_response = await client.get(projects_url, headers=headers)
-                projects_response.raise_for_status()
-                projects = projects_response.json()
-                
-                project_id = next(
-                    (p["id"] for p in projects.get("value", []) if p["name"] == project),
-                    None
-                )
-                
-                if not project_id:
-                    return f"❌ Error: No se encontró el proyecto '{project}'."
-                
-                # ===== 2. Obtener Repository ID =====
-                repos_url = f"{get_base_url()}/{project}/_apis/git/repositories?api-version={AZURE_DEVOPS_API_VERSION}"
-                repos_response = await client.get(repos_url, headers=headers)
-                repos_response.raise_for_status()
-                repos = repos_response.json()
-                
-                repo_id = next(
-                    (r["id"] for r in repos.get("value", []) if r["name"] == repository),
-                    None
-                )
-                
-                if not repo_id:
-                    return f"❌ Error: No se encontró el repositorio '{repository}' en el proyecto '{project}'."
-                
-                # ===== 3. Obtener Security Namespace para Git Repositories =====
-                namespaces_url = f"{get_base_url()}/_apis/securitynamespaces?api-version={AZURE_DEVOPS_API_VERSION}"
-                namespaces_response = await client.get(namespaces_url, headers=headers)
-                namespaces_response.raise_for_status()
-                namespaces = namespaces_response.json()
-                
-                git_namespace = next(
-                    (n for n in namespaces.get("value", []) if n["displayName"] == "Git Repositories"),
-                    None
-                )
-                
-                if not git_namespace:
-                    return "❌ Error: No se encontró el namespace de Git Repositories."
-                
-                namespace_id_git_repos = git_namespace["namespaceId"]
-                contribute_action = next(
-                    (a for a in git_namespace["actions"] if a["displayName"] == "Contribute"),
-                    None
-                )
-                
-                if not contribute_action:
-                    print("❌ Error: No se encontró el permiso 'Contribute")
-                    return "❌ Error: No se encontró el permiso 'Contribute'."
-                
-                contribute_bit = contribute_action["bit"]
-                
-                # ===== 4. Obtener User Identity =====
-                identities_url = (
-                    f"https://vssps.dev.azure.com/{organization}/_apis/identities"
-                    f"?searchFilter=General&filterValue={user_email}&queryMembership=None&api-version={AZURE_DEVOPS_API_VERSION}"
-                )
-                user_response = await client.get(identities_url, headers=headers)
-                user_response.raise_for_status()
-                user_data = user_response.json()
-                
-                user_descriptor = next(
-                    (u["descriptor"] for u in user_data.get("value", [])
-                     if u.get("providerDisplayName") == user_name),
-                    None
-                )
-                
-                if not user_descriptor:
-                    return f"❌ Error: No se encontró el usuario '{user_name}' con email '{user_email}'."
-                
-                # ===== 5. Asignar Permiso de Contribute =====
-                ace_url = (
-                    f"{get_base_url()}/_apis/accesscontrolentries/"
-                    f"{namespace_id_git_repos}?api-version={AZURE_DEVOPS_API_VERSION}"
-                )
-                
-                body = {
-                    "token": f"repoV2/{project_id}/{repo_id}",
-                    "merge": True,
-                    "accessControlEntries": [
-                        {
-                            "descriptor": user_descriptor,
-                            "allow": contribute_bit,
-                            "deny": 0,
-                            "extendedInfo": {
-                                "effectiveAllow": contribute_bit,
-                                "effectiveDeny": 0,
-                                "inheritedAllow": contribute_bit,
-                                "inheritedDeny": 0
-                            }
-                        }
-                    ]
-                }
-                
-                ace_response = await client.post(
-                    ace_url,
-                    headers={**headers, "Content-Type": "application/json"},
-                    json=body
-                )
-                ace_response.raise_for_status()
-                
-                # ===== Resultado exitoso =====
-                result = "✅ PERMISO ASIGNADO EXITOSAMENTE\n"
-                result += "=" * 80 + "\n\n"
-                result += f"👤 Usuario: {user_name} ({user_email})\n"
-                result += f"📦 Repositorio: {repository}\n"
-                result += f"📁 Proyecto: {project}\n"
-                result += f"🔐 Permiso: Contribute\n"
-                result += f"🆔 Project ID: {project_id}\n"
-                result += f"🆔 Repo ID: {repo_id}\n"
-                result += f"🆔 User Descriptor: {user_descriptor}\n\n"
-                result += "El usuario ahora puede contribuir al repositorio.\n"
-                
-                return result
-                
+            headers = {"Authorization": get_auth_header()}
+            
+            # ===== 1. Obtener Project ID =====
+            project_id = await resolver.project_id(project)
+            
+            if not project_id:
+                return f"❌ Error: No se encontró el proyecto '{project}'."
+            
+            # ===== 2. Obtener Repository ID =====
+            repo_id = await resolver.repository_id(project, repository)
+            
+            if not repo_id:
+                return f"❌ Error: No se encontró el repositorio '{repository}' en el proyecto '{project}'."
+            
+            # ===== 3. Obtener Security Namespace para Git Repositories =====
+            git_namespace = await metadata.git_repositories_namespace()
+            
+            if not git_namespace:
+                return "❌ Error: No se encontró el namespace de Git Repositories."
+            
+            namespace_id_git_repos = git_namespace["namespaceId"]
+            contribute_action = next(
+                (a for a in git_namespace["actions"] if a["displayName"] == "Contribute"),
+                None
+            )
+            
+            if not contribute_action:
+                return "❌ Error: No se encontró el permiso 'Contribute'."
+            
+            contribute_bit = contribute_action["bit"]
+            
+            # ===== 4. Obtener User Identity =====
+            user_descriptor = await identities.descriptor(user_email, user_name)
+            
+            if not user_descriptor:
+                return f"❌ Error: No se encontró el usuario '{user_name}' con email '{user_email}'."
+            
+            # ===== 5. Asignar Permiso de Contribute =====
+            ace_url = (
+                f"{get_base_url()}/_apis/accesscontrolentries/"
+                f"{namespace_id_git_repos}?api-version={AZURE_DEVOPS_API_VERSION}"
+            )
+            
+            body = {
+                "token": f"repoV2/{project_id}/{repo_id}",
+                "merge": True,
+                "accessControlEntries": [_contribute_ace(user_descriptor, contribute_bit)]
+            }
+            
+            ace_response = await client.post(
+                ace_url,
+                headers={**headers, "Content-Type": "application/json"},
+                json=body
+            )
+            ace_response.raise_for_status()
+            
+            # ===== Resultado exitoso =====
+            data = {
+                "granted": True,
+                "user": {"name": user_name, "email": user_email},
+                "repository": repository,
+                "project": project,
+                "permission": "Contribute",
+                "project_id": project_id,
+                "repository_id": repo_id,
+                "user_descriptor": user_descriptor,
+            }
+            return render(data, _permission_text, output_format, fields)
+            
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 404:
                 return f"❌ Error 404: Recurso no encontrado. Verifica los nombres del proyecto y repositorio."
@@ -231,132 +393,489 @@ def register_repository_tools(mcp: FastMCP) -> None:
         except Exception as e:
             return f"❌ Error inesperado: {str(e)}"
 
+    @mcp.tool()
+    async def assign_contribute_permission_bulk(
+        project: str,
+        repositories: list[str],
+        users: list[UserSpec],
+        output_format: Optional[OutputFormat] = None,
+        fields: Optional[list[str]] = None
+    ) -> str:
+        """
+        Asigna permisos de contribuidor a varios usuarios en varios repositorios
+        de un proyecto de Azure DevOps en una sola llamada.
+
+        Usar en lugar de llamar assign_contribute_permission por cada par
+        usuario/repositorio (por ejemplo, al incorporar un equipo).
+        
+        Args:
+            project: Nombre del proyecto en Azure DevOps
+            repositories: Nombres de los repositorios
+            users: Usuarios, cada uno con email y name (nombre completo)
+            output_format: compact (JSON mínimo, por defecto), json o text
+            fields: Campos de cada resultado a incluir (p. ej. ["email", "repository", "ok"])
+        
+        Returns:
+            Matriz de resultados por usuario y repositorio
+        """
+        try:
+            headers = {
+                "Authorization": get_auth_header(),
+                "Content-Type": "application/json"
+            }
+
+            # ===== 1. Resolver proyecto, namespace y permiso una sola vez =====
+            project_id = await resolver.project_id(project)
+
+            if not project_id:
+                return f"❌ Error: No se encontró el proyecto '{project}'."
+
+            namespace_id, contribute_bit = await metadata.git_permission_bit("Contribute")
+
+            if namespace_id is None or contribute_bit is None:
+                return "❌ Error: No se encontró el permiso 'Contribute' de Git Repositories."
+
+            # ===== 2. Resolver repositorios e identidades en paralelo =====
+            repo_ids = await asyncio.gather(
+                *(resolver.repository_id(project, r) for r in repositories)
+            )
+            descriptors = await asyncio.gather(
+                *(identities.descriptor(u.email, u.name) for u in users)
+            )
+
+            # matrix[(usuario, repositorio)] = None si se asignó, o motivo del fallo
+            matrix: dict[tuple[int, int], Optional[str]] = {}
+            for ui, descriptor in enumerate(descriptors):
+                for ri, repo_id in enumerate(repo_ids):
+                    if not repo_id:
+                        matrix[(ui, ri)] = "repositorio no encontrado"
+                    elif not descriptor:
+                        matrix[(ui, ri)] = "usuario no encontrado"
+
+            valid_users = [(ui, d) for ui, d in enumerate(descriptors) if d]
+
+            # ===== 3. Un POST de ACEs por repositorio, con concurrencia limitada =====
+            ace_url = (
+                f"{get_base_url()}/_apis/accesscontrolentries/"
+                f"{namespace_id}?api-version={AZURE_DEVOPS_API_VERSION}"
+            )
+            semaphore = asyncio.Semaphore(REPOSITORY_BULK_CONCURRENCY)
+
+            async def grant(ri: int, repo_id: str) -> None:
+                body = {
+                    "token": f"repoV2/{project_id}/{repo_id}",
+                    "merge": True,
+                    "accessControlEntries": [
+                        _contribute_ace(descriptor, contribute_bit) for _, descriptor in valid_users
+                    ]
+                }
+                async with semaphore:
+                    try:
+                        response = await client.post(ace_url, headers=headers, json=body)
+                        response.raise_for_status()
+                        outcome = None
+                    except httpx.HTTPStatusError as e:
+                        outcome = f"HTTP {e.response.status_code}"
+                    except Exception as e:
+                        outcome = str(e)
+                for ui, _ in valid_users:
+                    matrix[(ui, ri)] = outcome
+
+            if valid_users:
+                await asyncio.gather(
+                    *(grant(ri, repo_id) for ri, repo_id in enumerate(repo_ids) if repo_id)
+                )
+
+            # ===== Resultado =====
+            results = [
+                {
+                    "user": user.name,
+                    "email": user.email,
+                    "repository": repository,
+                    "ok": matrix[(ui, ri)] is None,
+                    "error": matrix[(ui, ri)],
+                }
+                for ui, user in enumerate(users)
+                for ri, repository in enumerate(repositories)
+            ]
+            data = {
+                "project": project,
+                "permission": "Contribute",
+                "granted": sum(1 for r in results if r["ok"]),
+                "total": len(results),
+                "results": results,
+            }
+            return render(data, _permission_bulk_text, output_format, fields)
+
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 401:
+                return "❌ Error de autenticación. Verifica tu Personal Access Token (PAT)."
+            return f"❌ Error HTTP {e.response.status_code}: {e.response.text}"
+        except httpx.TimeoutException:
+            return "❌ Error: Tiempo de espera agotado al conectar con Azure DevOps."
+        except Exception as e:
+            return f"❌ Error inesperado: {str(e)}"
+
     @mcp.tool()
     async def assign_reviewers_policies(
         project: str,
         repository: str,
         branch: str,
-        reviewers: int
+        reviewers: int,
+        output_format: Optional[OutputFormat] = None,
+        fields: Optional[list[str]] = None
     ) -> str:
         """
         Asigna la política 'Minimum number of reviewers' en un repositorio Azure DevOps.
+
+        Args:
+            project: Nombre del proyecto en Azure DevOps
+            repository: Nombre del repositorio
+            branch: Rama a la que aplicar la política
+            reviewers: Número mínimo de revisores
+            output_format: compact (JSON mínimo, por defecto), json o text
+            fields: Campos a incluir (p. ej. ["policy_id", "action"])
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            headers = {
+                "Authorization": get_auth_header(),
+                "Content-Type": "application/json"
+            }
 
-                headers = {
-                    "Authorization": get_auth_header(),
-                    "Content-Type": "application/json"
-                }
+            # ===== Obtener Project ID =====
+            project_id = await resolver.project_id(project)
 
-                print('==========assign reviewers')
-                print(f'branch: {branch}')
+            if not project_id:
+                return f"❌ Error: No se encontró el proyecto '{project}'."
 
-                # ===== Obtener Project ID =====
-                projects_url = f"{get_base_url()}/_apis/projects?api-version={AZURE_DEVOPS_API_VERSION}"
-                projects_response = await client.get(projects_url, headers=headers)
-                projects_response.raise_for_status()
-                project_id = next(
-                    (p["id"] for p in projects_response.json().get("value", []) if p["name"] == project),
-                    None
-                )
+            # ===== Obtener Repository ID =====
+            repo_id = await resolver.repository_id(project, repository)
 
-                if not project_id:
-                    return f"❌ Error: No se encontró el proyecto '{project}'."
+            if not repo_id:
+                return f"❌ Error: No se encontró el repositorio '{repository}'."
 
-                # ===== Obtener Repository ID =====
-                repos_url = f"{get_base_url()}/_apis/git/repositories?api-version={AZURE_DEVOPS_API_VERSION}"
-                repos_response = await client.get(repos_url, headers=headers)
-                repos_response.raise_for_status()
-                repo_id = next(
-                    (r["id"] for r in repos_response.json().get("value", []) if r["name"] == repository),
-                    None
-                )
+            # ===== Obtener ID del tipo de política =====
+            reviewer_policy_type_id = await metadata.policy_type_id(
+                project, "Minimum number of reviewers"
+            )
 
-                if not repo_id:
-                    return f"❌ Error: No se encontró el repositorio '{repository}'."
+            if not reviewer_policy_type_id:
+                return "❌ No se pudo encontrar el tipo de política 'Minimum number of reviewers'."
 
-                # ===== Obtener ID del tipo de política =====
-                policy_types_url = f"{get_base_url()}/{project}/_apis/policy/types?api-version={AZURE_DEVOPS_API_VERSION}"
-                policy_types = (await client.get(policy_types_url, headers=headers)).json()["value"]
+            # ===== Obtener políticas existentes =====
+            policies_url = (
+                f"{get_base_url()}/{project}/_apis/policy/configurations?"
+                f"api-version={AZURE_DEVOPS_API_VERSION}&repositoryId={repo_id}&refName=refs/heads/{branch}"
+            )
+            policies_response = await client.get(policies_url, headers=headers)
+            policies_response.raise_for_status()
 
-                reviewer_policy_type_id = next(
-                    (t["id"] for t in policy_types if t["displayName"] == "Minimum number of reviewers"),
-                    None
-                )
+            existing_policy = next(
+                (p for p in policies_response.json().get("value", [])
+                if p.get("type", {}).get("id") == reviewer_policy_type_id),
+                None
+            )
 
-                if not reviewer_policy_type_id:
-                    return "❌ No se pudo encontrar el tipo de política 'Minimum number of reviewers'."
+            existing_policy_id = existing_policy["id"] if existing_policy else None                
 
-                # ===== Obtener políticas existentes =====
-                policies_url = (
-                    f"{get_base_url()}/{project}/_apis/policy/configurations?"
-                    f"api-version={AZURE_DEVOPS_API_VERSION}&repositoryId={repo_id}&refName=refs/heads/{branch}"
+            # ===== Crear o actualizar política =====
+            body = {
+                "isEnabled": True,
+                "isBlocking": True,
+                "type": {"id": reviewer_policy_type_id},
+                "settings": {
+                    "minimumApproverCount": reviewers,
+                    "creatorVoteCounts": False,
+                    "allowDownvotes": False,
+                    "scope": [
+                        {
+                            "refName": f"refs/heads/{branch}",
+                            "repositoryId": repo_id,
+                            "matchKind": "Exact"
+                        }
+                    ]
+                }
+            }
+
+            if existing_policy_id:
+                upsert_url = (
+                    f"{get_base_url()}/{project}/_apis/policy/configurations/"
+                    f"{existing_policy_id}?api-version={AZURE_DEVOPS_API_VERSION}"
                 )
-                policies_response = await client.get(policies_url, headers=headers)
-                policies_response.raise_for_status()
+                upsert_response = await client.put(upsert_url, headers=headers, json=body)
 
-                existing_policy = next(
-                    (p for p in policies_response.json().get("value", [])
-                    if p.get("type", {}).get("id") == reviewer_policy_type_id),
-                    None
+            else:
+                upsert_url = (
+                    f"{get_base_url()}/{project}/_apis/policy/configurations"
+                    f"?api-version={AZURE_DEVOPS_API_VERSION}"
                 )
+                upsert_response = await client.post(upsert_url, headers=headers, json=body)
 
-                existing_policy_id = existing_policy["id"] if existing_policy else None                
+            upsert_response.raise_for_status()
 
-                # ===== Crear o actualizar política =====
-                body = {
-                    "isEnabled": True,
-                    "isBlocking": True,
-                    "type": {"id": reviewer_policy_type_id},
-                    "settings": {
-                        "minimumApproverCount": reviewers,
-                        "creatorVoteCounts": False,
-                        "allowDownvotes": False,
-                        "scope": [
-                            {
-                                "refName": f"refs/heads/{branch}",
-                                "repositoryId": repo_id,
-                                "matchKind": "Exact"
-                            }
-                        ]
-                    }
-                }
+            # ===== Resultado =====
+            data = {
+                "project": project,
+                "repository": repository,
+                "branch": branch,
+                "policy": "Minimum number of reviewers",
+                "reviewers": reviewers,
+                "action": "updated" if existing_policy_id else "created",
+                "policy_id": upsert_response.json().get("id"),
+                "project_id": project_id,
+                "repository_id": repo_id,
+            }
 
-                print(f'body: {body}')
+            return render(data, _policy_text, output_format, fields)
 
-                if existing_policy_id:
-                    upsert_url = (
-                        f"{get_base_url()}/{project}/_apis/policy/configurations/"
-                        f"{existing_policy_id}?api-version={AZURE_DEVOPS_API_VERSION}"
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return "❌ 404: Recurso no encontrado."
+            if e.response.status_code == 401:
+                return "❌ 401: No autorizado. Verifica tu PAT."
+            if e.response.status_code == 403:
+                return "❌ 403: No tienes permisos."
+            return f"❌ Error HTTP {e.response.status_code}: {e.response.text}"
+
+        except httpx.TimeoutException:
+            return "❌ Error: Tiempo de espera agotado."
+
+        except Exception as e:
+            return f"❌ Error inesperado: {str(e)}"
+
+    @mcp.tool()
+    async def assign_reviewers_policies_rollout(
+        project: str,
+        branches: list[str],
+        reviewers: int,
+        repositories: str = "all",
+        dry_run: bool = False,
+        output_format: Optional[OutputFormat] = None,
+        fields: Optional[list[str]] = None
+    ) -> str:
+        """
+        Aplica la política 'Minimum number of reviewers' a muchos repositorios y
+        ramas de un proyecto Azure DevOps en una sola llamada.
+
+        Solo crea o actualiza las combinaciones repositorio/rama cuya política
+        difiere de la deseada; las idénticas se omiten. Si una política
+        existente cubre también otros repositorios o ramas, el plan los indica
+        en ``extra_scopes``: al actualizarla cambian igualmente.
+
+        Args:
+            project: Nombre del proyecto en Azure DevOps
+            branches: Ramas a las que aplicar la política (ej: ["main", "develop"])
+            reviewers: Número mínimo de revisores
+            repositories: "all" o un patrón glob sobre el nombre (ej: "api-*")
+            dry_run: Si es True, solo muestra los cambios sin aplicarlos
+            output_format: compact (JSON mínimo, por defecto), json o text
+            fields: Campos de cada entrada del plan a incluir (p. ej. ["repository", "action", "ok"])
+
+        Returns:
+            Plan de cambios y resultado por repositorio y rama
+        """
+        try:
+            headers = {
+                "Authorization": get_auth_header(),
+                "Content-Type": "application/json"
+            }
+
+            # ===== 1. Proyecto y tipo de política =====
+            project_id = await resolver.project_id(project)
+
+            if not project_id:
+                return f"❌ Error: No se encontró el proyecto '{project}'."
+
+            reviewer_policy_type_id = await metadata.policy_type_id(
+                project, "Minimum number of reviewers"
+            )
+
+            if not reviewer_policy_type_id:
+                return "❌ No se pudo encontrar el tipo de política 'Minimum number of reviewers'."
+
+            # ===== 2. Repositorios del proyecto que cumplen el patrón =====
+            pattern = "*" if repositories.lower() == "all" else repositories.lower()
+            repos_url = f"{get_base_url()}/{project}/_apis/git/repositories?api-version={AZURE_DEVOPS_API_VERSION}"
+            repos = []
+            repo_names: dict[str, str] = {}
+            async for repo in iter_items(client, repos_url, headers):
+                resolver.remember_repository(project, repo["name"], repo["id"])
+                repo_names[repo["id"].lower()] = repo["name"]
+                if fnmatch.fnmatchcase(repo["name"].lower(), pattern):
+                    repos.append(repo)
+
+            if not repos:
+                return f"❌ Error: Ningún repositorio de '{project}' coincide con '{repositories}'."
+
+            # ===== 3. Políticas existentes de todo el proyecto (una sola vez) =====
+            policies_url = f"{get_base_url()}/{project}/_apis/policy/configurations?api-version={AZURE_DEVOPS_API_VERSION}"
+            existing: dict[tuple[str, str], dict] = {}
+            async for policy in iter_items(client, policies_url, headers):
+                if policy.get("type", {}).get("id") != reviewer_policy_type_id:
+                    continue
+                for scope in policy.get("settings", {}).get("scope", []):
+                    if scope.get("repositoryId") and scope.get("refName"):
+                        existing[(scope["repositoryId"].lower(), scope["refName"].lower())] = policy
+
+            # ===== 4. Plan: crear, actualizar u omitir =====
+            desired_settings = {
+                "minimumApproverCount": reviewers,
+                "creatorVoteCounts": False,
+                "allowDownvotes": False,
+            }
+            plan = []
+            for repo in sorted(repos, key=lambda r: r["name"].lower()):
+                for branch in branches:
+                    ref_name = f"refs/heads/{branch}"
+                    policy = existing.get((repo["id"].lower(), ref_name.lower()))
+                    if policy is None:
+                        plan.append({
+                            "repo": repo, "branch": branch, "action": "crear",
+                            "detail": f"{reviewers} revisores", "policy": None,
+                        })
+                        continue
+
+                    settings = policy.get("settings", {})
+                    identical = (
+                        policy.get("isEnabled") and policy.get("isBlocking")
+                        and all(settings.get(k) == v for k, v in desired_settings.items())
                     )
-                    upsert_response = await client.put(upsert_url, headers=headers, json=body)
+                    plan.append({
+                        "repo": repo, "branch": branch,
+                        "action": "omitir" if identical else "actualizar",
+                        "detail": (
+                            f"{reviewers} revisores" if identical
+                            else f"{settings.get('minimumApproverCount')} → {reviewers} revisores"
+                        ),
+                        "policy": policy,
+                    })
+
+            # Una política existente con varios alcances se actualiza entera:
+            # se indican los alcances fuera de lo pedido que también cambiarán
+            targets = {(e["repo"]["id"].lower(), f"refs/heads/{e['branch']}".lower()) for e in plan}
+
+            def describe_scope(scope: dict) -> str:
+                repo_id = scope.get("repositoryId")
+                repo_name = repo_names.get(repo_id.lower(), repo_id) if repo_id else "todos los repositorios"
+                ref = scope.get("refName") or "todas las ramas"
+                if scope.get("matchKind", "Exact").lower() == "prefix":
+                    ref += "*"
+                return f"{repo_name} @ {ref}"
+
+            for entry in plan:
+                if entry["action"] != "actualizar":
+                    continue
+                entry["extra_scopes"] = [
+                    describe_scope(scope)
+                    for scope in entry["policy"].get("settings", {}).get("scope", [])
+                    if (
+                        (scope.get("repositoryId") or "").lower(),
+                        (scope.get("refName") or "").lower(),
+                    ) not in targets
+                ]
 
+            # ===== 5. Aplicar cambios con concurrencia limitada =====
+            semaphore = asyncio.Semaphore(REPOSITORY_BULK_CONCURRENCY)
+
+            async def upsert(entry: dict) -> None:
+                policy = entry["policy"]
+                if policy is None:
+                    body = {
+                        "isEnabled": True,
+                        "isBlocking": True,
+                        "type": {"id": reviewer_policy_type_id},
+                        "settings": {
+                            **desired_settings,
+                            "scope": [
+                                {
+                                    "refName": f"refs/heads/{entry['branch']}",
+                                    "repositoryId": entry["repo"]["id"],
+                                    "matchKind": "Exact"
+                                }
+                            ]
+                        }
+                    }
+                    url = f"{get_base_url()}/{project}/_apis/policy/configurations?api-version={AZURE_DEVOPS_API_VERSION}"
+                    method = client.post
                 else:
-                    upsert_url = (
-                        f"{get_base_url()}/{project}/_apis/policy/configurations"
-                        f"?api-version={AZURE_DEVOPS_API_VERSION}"
+                    # Conserva el resto de ajustes y el alcance de la política existente
+                    body = {
+                        "isEnabled": True,
+                        "isBlocking": True,
+                        "type": {"id": reviewer_policy_type_id},
+                        "settings": {**policy.get("settings", {}), **desired_settings}
+                    }
+                    url = (
+                        f"{get_base_url()}/{project}/_apis/policy/configurations/"
+                        f"{policy['id']}?api-version={AZURE_DEVOPS_API_VERSION}"
                     )
-                    upsert_response = await client.post(upsert_url, headers=headers, json=body)
+                    method = client.put
 
-                upsert_response.raise_for_status()
+                async with semaphore:
+                    try:
+                        response = await method(url, headers=headers, json=body)
+                        response.raise_for_status()
+                        entry["ok"] = True
+                    except httpx.HTTPStatusError as e:
+                        entry["ok"], entry["error"] = False, f"HTTP {e.response.status_code}"
+                    except Exception as e:
+                        entry["ok"], entry["error"] = False, str(e)
 
-                # ===== Resultado =====
-                result = "✅ POLÍTICA ASIGNADA EXITOSAMENTE\n"
-                result += "=" * 80 + "\n\n"
-                result += f"📁 Proyecto: {project}\n"
-                result += f"📦 Repositorio: {repository}\n"
-                result += f"🔐 Política: Minimum number of reviewers\n"
-                result += f"🆔 Project ID: {project_id}\n"
-                result += f"🆔 Repo ID: {repo_id}\n"
+            changes = [entry for entry in plan if entry["action"] != "omitir"]
 
-                print(result)
+            if not dry_run:
+                # Una política con varios alcances se actualiza una sola vez; las
+                # demás entradas toman el resultado de la que hizo la petición
+                leaders: dict[int, dict] = {}
+                unique_changes = []
+                followers = []
+                for entry in changes:
+                    policy_id = entry["policy"]["id"] if entry["policy"] else None
+                    if policy_id is not None and policy_id in leaders:
+                        entry["same_policy"] = True
+                        followers.append((entry, leaders[policy_id]))
+                        continue
+                    if policy_id is not None:
+                        leaders[policy_id] = entry
+                    unique_changes.append(entry)
+                await asyncio.gather(*(upsert(entry) for entry in unique_changes))
+                for entry, leader in followers:
+                    entry["ok"] = leader.get("ok")
+                    if leader.get("error"):
+                        entry["error"] = leader["error"]
 
-                return result
+            # ===== Resultado =====
+            data = {
+                "project": project,
+                "policy": "Minimum number of reviewers",
+                "reviewers": reviewers,
+                "dry_run": dry_run,
+                "repositories": len(repos),
+                "branches": branches,
+                "summary": {
+                    "create": sum(1 for e in plan if e["action"] == "crear"),
+                    "update": sum(1 for e in plan if e["action"] == "actualizar"),
+                    "skip": sum(1 for e in plan if e["action"] == "omitir"),
+                    "failed": sum(1 for e in changes if e.get("ok") is False),
+                },
+                "plan": [
+                    {
+                        "repository": entry["repo"]["name"],
+                        "branch": entry["branch"],
+                        "action": entry["action"],
+                        "detail": entry["detail"],
+                        "policy_id": entry["policy"]["id"] if entry["policy"] else None,
+                        "ok": entry.get("ok"),
+                        "error": entry.get("error"),
+                        "same_policy": entry.get("same_policy"),
+                        "extra_scopes": entry.get("extra_scopes") or None,
+                    }
+                    for entry in plan
+                ],
+            }
+            return render(data, _rollout_text, output_format, fields)
 
         except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                return "❌ 404: Recurso no encontrado."
             if e.response.status_code == 401:
                 return "❌ 401: No autorizado. Verifica tu PAT."
             if e.response.status_code == 403:
@@ -370,11 +889,24 @@ def register_repository_tools(mcp: FastMCP) -> None:
             return f"❌ Error inesperado: {str(e)}"
 
 
+    async def _track_import(job: Job, project: str, repo_id: str, import_request: dict) -> None:
+        job.update(describe_import(import_request), repository_id=repo_id)
+        final = await wait_for_import(
+            client,
+            project,
+            repo_id,
+            import_request["importRequestId"],
+            on_update=lambda r: job.update(describe_import(r)),
+        )
+        job.update(describe_import(final), remote_url=final.get("repository", {}).get("remoteUrl"))
+
     @mcp.tool()
     async def create_and_import(
         project: str,
         repository: str,
-        repository_url_import: str
+        repository_url_import: str,
+        output_format: Optional[OutputFormat] = None,
+        fields: Optional[list[str]] = None
     ) -> str:
         """
         Crea e importa un repositorio de Azure DevOps.
@@ -383,104 +915,64 @@ def register_repository_tools(mcp: FastMCP) -> None:
             project: Nombre del proyecto en Azure DevOps.
             repository: Nombre del repositorio a crear.
             repository_url_import: URL del repositorio Git origen (HTTP/HTTPS).
+            output_format: compact (JSON mínimo, por defecto), json o text
+            fields: Campos a incluir (p. ej. ["job_id"])
         
         Returns:
             Mensaje indicando el resultado de la operación.
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-
-                headers = {
-                    "Authorization": get_auth_header(),
-                    "Content-Type": "application/json"
-                }
-
-                # ===== 1. Buscar el proyecto =====
-                projects_url = f"{get_base_url()}/_apis/projects?api-version={AZURE_DEVOPS_API_VERSION}"
-                resp = await client.get(projects_url, headers=headers)
-                resp.raise_for_status()
-
-                print(f'resp: {resp}')
-
-                projects = resp.json().get("value", [])
-                project_id = next((p["id"] for p in projects if p["name"] == project), None)
-
-                print(f'project_id: {project_id}')
-
-                if not project_id:
-                    return f"❌ Error: Proyecto '{project}' no encontrado."
-
-                # ===== 2. Verificar si el repositorio ya existe =====
-                repos_url = f"{get_base_url()}/_apis/git/repositories?api-version={AZURE_DEVOPS_API_VERSION}"
-                resp = await client.get(repos_url, headers=headers)
-                resp.raise_for_status()
-
-                
+            # ===== 1. Buscar el proyecto =====
+            project_id = await resolver.project_id(project)
 
-                existing = next((r for r in resp.json().get("value", []) if r["name"] == repository), None)
+            if not project_id:
+                return f"❌ Error: Proyecto '{project}' no encontrado."
 
-                if existing:
-                    return f"❌ Error: El repositorio '{repository}' ya existe en el proyecto '{project}'."
+            # ===== 2. Verificar si el repositorio ya existe =====
+            existing = await resolver.repository_id(project, repository)
 
-                # ===== 3. Crear el repositorio vacío =====
-                create_body = { "name": repository }
+            if existing:
+                return f"❌ Error: El repositorio '{repository}' ya existe en el proyecto '{project}'."
 
-                create_url = f"{get_base_url()}/{project}/_apis/git/repositories?api-version={AZURE_DEVOPS_API_VERSION}"
-                resp = await client.post(create_url, headers=headers, json=create_body)
-                resp.raise_for_status()
+            # ===== 3. Crear el repositorio vacío =====
+            repo = await create_repository(client, project, repository)
+            repo_id = repo["id"]
+            resolver.remember_repository(project, repository, repo_id)
 
-                print(f'resp2: {resp}')
+            # ===== 4. Importar código desde la URL =====
+            import_result = await start_import(client, project, repo_id, repository_url_import)
+            repo_url = import_result["repository"]["remoteUrl"]
 
-                repo_id = resp.json()["id"]
+            # La importación continúa en Azure DevOps: se sigue en segundo plano
+            job = jobs.submit(
+                "import",
+                f"Importar {repository_url_import} en {project}/{repository}",
+                lambda job: _track_import(job, project, repo_id, import_result),
+            )
 
-                print(f'repo_id: {repo_id}')
+            '''
+            workitem_id, workitem_url = await create_work_item(
+                client=client,
+                project=project,
+                type="Task",
+                title=f"As a development team member, I want to create a new repository with name {repository} " +
+                      f"and import source code from an external location {repository_url_import} so that I can quickly initialize the project — automatically handled by NexusDesk Copilot.",
+                description=f"Request to create a repository {repository} and import source code from an external source",
+                priority=2,
+                state="Done"
+            )
+            '''
 
-
-                # ===== 4. Importar código desde la URL =====
-                import_body = {
-                    "parameters": {
-                        "deleteServiceEndpointAfterImport": True,
-                        "gitSource": { 
-                            "url": repository_url_import
-                        }
-                    }
-                }
-
-                import_url = f"{get_base_url()}/{project}/_apis/git/repositories/{repo_id}/importRequests?api-version={AZURE_DEVOPS_API_VERSION}"
-                
-                print(f'import_url: {import_url}')
-
-                resp = await client.post(import_url, headers=headers, json=import_body)
-                resp.raise_for_status()
-
-                import_result = resp.json()
-                repo_url = import_result["repository"]["remoteUrl"]                
-                '''
-                workitem_id, workitem_url = await create_work_item(
-                    client=client,
-                    project=project,
-                    type="Task",
-                    title=f"As a development team member, I want to create a new repository with name {repository} " +
-                          f"and import source code from an external location {repository_url_import} so that I can quickly initialize the project — automatically handled by NexusDesk Copilot.",
-                    description=f"Request to create a repository {repository} and import source code from an external source",
-                    priority=2,
-                    state="Done"
-                )
-                '''
-
-                # ===== 5. Éxito =====
-                result = (
-                    "✅ REPOSITORIO CREADO E IMPORTADO EXITOSAMENTE\n"
-                    + "=" * 80 + "\n\n"
-                    + f"📁 Proyecto: {project}\n"
-                    + f"📦 Repositorio: {repository}\n"
-                    + f"🆔 Project ID: {project_id}\n"
-                    + f"🆔 Repo ID: {repo_id}\n"
-                    + f"🔗 URL Remota: {repo_url}\n"
-                    + f"🔗 PBI Remota: {repo_url}\n"
-                )
-
-                return result
+            # ===== 5. Éxito =====
+            data = {
+                "project": project,
+                "repository": repository,
+                "project_id": project_id,
+                "repository_id": repo_id,
+                "remote_url": repo_url,
+                "job_id": job.id,
+            }
+            return render(data, _import_text, output_format, fields)
 
         # ===== Manejo de Errores =====
         except httpx.HTTPStatusError as e:
@@ -501,3 +993,60 @@ def register_repository_tools(mcp: FastMCP) -> None:
 
         except Exception as e:
             return f"❌ Error inesperado: {str(e)}"
+
+    @mcp.tool()
+    async def create_and_import_bulk(
+        project: str,
+        imports: list[ImportSpec],
+        output_format: Optional[OutputFormat] = None,
+        fields: Optional[list[str]] = None
+    ) -> str:
+        """
+        Crea varios repositorios e importa en cada uno un repositorio Git externo.
+
+        Retorna de inmediato un job por repositorio; las importaciones se
+        ejecutan en segundo plano (como máximo AZURE_DEVOPS_REPOSITORY_IMPORT_CONCURRENCY
+        a la vez) y su progreso se consulta con get_job_status.
+
+        Args:
+            project: Nombre del proyecto en Azure DevOps.
+            imports: Lista de {repository, url} (nombre del repositorio a crear y URL Git origen).
+            output_format: compact (JSON mínimo, por defecto), json o text
+            fields: Campos de cada job a incluir (p. ej. ["job_id"])
+        """
+        try:
+            if not imports:
+                return "❌ Error: La lista de importaciones está vacía."
+
+            project_id = await resolver.project_id(project)
+            if not project_id:
+                return f"❌ Error: Proyecto '{project}' no encontrado."
+
+            semaphore = asyncio.Semaphore(REPOSITORY_IMPORT_CONCURRENCY)
+
+            async def run_import(job: Job, spec: ImportSpec) -> None:
+                if await resolver.repository_id(project, spec.repository):
+                    raise ValueError(f"El repositorio '{spec.repository}' ya existe")
+                job.update("creando repositorio")
+                repo = await create_repository(client, project, spec.repository)
+                resolver.remember_repository(project, spec.repository, repo["id"])
+                import_request = await start_import(client, project, repo["id"], spec.url)
+                await _track_import(job, project, repo["id"], import_request)
+
+            queued = []
+            for spec in imports:
+                job = jobs.submit(
+                    "import",
+                    f"Importar {spec.url} en {project}/{spec.repository}",
+                    lambda job, spec=spec: run_import(job, spec),
+                    semaphore=semaphore,
+                )
+                queued.append({"repository": spec.repository, "job_id": job.id})
+
+            data = {"project": project, "jobs": queued}
+            return render(data, _import_bulk_text, output_format, fields)
+
+        except httpx.HTTPStatusError as e:
+            return f"❌ Error HTTP {e.response.status_code}: {e.response.text}"
+        except Exception as e:
+            return f"❌ Error inesperado: {str(e)}"
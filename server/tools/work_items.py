@@ -1,6 +1,7 @@
 # tools/work_items.py
 import httpx
 from fastmcp import FastMCP
+from pydantic import BaseModel
 from typing import Optional
 
 from azure_devops_config import (
@@ -8,8 +9,121 @@ from azure_devops_config import (
     get_auth_header,
     AZURE_DEVOPS_API_VERSION,
 )
+from core.http_client import AzureDevOpsClient
+from core.mirror import WorkItemMirror
+from core.output import OutputFormat, render
+from core.resolver import NameResolver
+from core.wiql import WiqlQuery, run_wiql
+from core.work_items import create_work_items_batch, fetch_work_items, work_item_web_url
+
+
+class WorkItemSpec(BaseModel):
+    """Work item a crear con create_work_items_bulk."""
+    type: str
+    title: str
+    description: Optional[str] = None
+    priority: Optional[int] = None
+    # ID de un work item existente que será el padre
+    parent_id: Optional[int] = None
+    # Posición (desde 0) de otro elemento de la misma lista que será el padre
+    parent_index: Optional[int] = None
+
+
+def _work_item_summary(item: dict, project: str) -> dict:
+    fields = item.get("fields", {})
+    return {
+        "id": item["id"],
+        "project": project,
+        "type": fields.get("System.WorkItemType"),
+        "title": fields.get("System.Title"),
+        "state": fields.get("System.State"),
+        "assigned_to": (fields.get("System.AssignedTo") or {}).get("displayName"),
+        "tags": fields.get("System.Tags"),
+        "snippet": item.get("snippet"),
+        "url": work_item_web_url(project, item["id"]),
+    }
+
+
+def _work_items_text(data: dict) -> str:
+    if not data["work_items"]:
+        return "No se encontraron work items con los criterios especificados."
+
+    lines = [f"Work Items encontrados ({len(data['work_items'])}):"]
+    if data["mirror_age_seconds"] is not None:
+        lines.append(f"Fuente: espejo local (antigüedad: {data['mirror_age_seconds']:.0f} s)")
+    lines.append("")
+    for item in data["work_items"]:
+        lines.append(f"ID: {item['id']}")
+        lines.append(f"Tipo: {item['type'] or 'N/A'}")
+        lines.append(f"Título: {item['title'] or 'N/A'}")
+        lines.append(f"Estado: {item['state'] or 'N/A'}")
+        lines.append(f"Asignado a: {item['assigned_to'] or 'Sin asignar'}")
+        lines.append(f"URL: {item['url']}")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def _search_text(data: dict) -> str:
+    if not data["work_items"]:
+        return f"No se encontraron work items que coincidan con '{data['text']}'."
+
+    lines = [f"Work Items encontrados ({len(data['work_items'])}):"]
+    for source in data["sources"]:
+        age = source["age_seconds"]
+        age_text = f"{age:.0f} s" if age is not None else "sin sincronizar"
+        lines.append(f"Fuente: espejo local de '{source['project']}' (antigüedad: {age_text})")
+    lines.append("")
+    for item in data["work_items"]:
+        lines.append(f"ID: {item['id']} ({item['project']})")
+        lines.append(f"Tipo: {item['type'] or 'N/A'}")
+        lines.append(f"Título: {item['title'] or 'N/A'}")
+        lines.append(f"Estado: {item['state'] or 'N/A'}")
+        if item["tags"]:
+            lines.append(f"Etiquetas: {item['tags']}")
+        if item["snippet"]:
+            lines.append(f"Extracto: {item['snippet']}")
+        lines.append(f"URL: {item['url']}")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def _created_text(data: dict) -> str:
+    result = "✅ WORK ITEM CREADO EXITOSAMENTE\n"
+    result += "=" * 80 + "\n\n"
+    result += f"📁 Proyecto: {data['project']}\n"
+    result += f"📝 Tipo: {data['type']}\n"
+    result += f"🆔 Project ID: {data['project_id']}\n"
+    result += f"🆔 Work Item ID: {data['id']}\n"
+    result += f"🔗 URL Work Item: {data['url']}\n"
+    return result
+
+
+def _created_bulk_text(data: dict) -> str:
+    lines = [
+        "✅ WORK ITEMS CREADOS" if not data["failed"] else "⚠️ WORK ITEMS CREADOS PARCIALMENTE",
+        "=" * 80,
+        "",
+        f"📁 Proyecto: {data['project']}",
+        f"✅ Creados: {data['created']}",
+        f"❌ Fallidos: {data['failed']}",
+        "",
+    ]
+    for result in data["results"]:
+        if result["ok"]:
+            lines.append(
+                f"[{result['index']}] ✅ #{result['id']} {result['type']}: {result['title']} ({result['url']})"
+            )
+        else:
+            lines.append(f"[{result['index']}] ❌ {result['type']}: {result['title']} — {result['error']}")
+    return "\n".join(lines) + "\n"
+
 
-def register_work_item_tools(mcp: FastMCP) -> None:
+def register_work_item_tools(
+    mcp: FastMCP,
+    client: AzureDevOpsClient,
+    resolver: NameResolver,
+    mirror: WorkItemMirror,
+) -> None:
     
     @mcp.tool()
     async def get_work_items(
@@ -17,7 +131,13 @@ def register_work_item_tools(mcp: FastMCP) -> None:
             work_item_type: Optional[str] = None,
             state: Optional[str] = None,
             assigned_to: Optional[str] = None,
-            max_results: int = 50
+            area_path: Optional[str] = None,
+            iteration_path: Optional[str] = None,
+            tags: Optional[list[str]] = None,
+            changed_since: Optional[str] = None,
+            max_results: int = 50,
+            output_format: Optional[OutputFormat] = None,
+            fields: Optional[list[str]] = None
     ) -> str:
         """
         Busca work items en un proyecto de Azure DevOps.
@@ -27,65 +147,120 @@ def register_work_item_tools(mcp: FastMCP) -> None:
             work_item_type: Tipo de work item (Bug, Task, User Story, etc.)
             state: Estado del work item (New, Active, Resolved, Closed, etc.)
             assigned_to: Email o nombre del asignado
+            area_path: Área (incluye sub-áreas), ej: "Proyecto\\Equipo"
+            iteration_path: Iteración (incluye sub-iteraciones), ej: "Proyecto\\Sprint 1"
+            tags: Etiquetas que deben estar presentes todas
+            changed_since: Fecha ISO (YYYY-MM-DD o con hora) de última modificación mínima
             max_results: Número máximo de resultados a retornar
+            output_format: compact (JSON mínimo, por defecto), json o text
+            fields: Campos de cada work item a incluir (p. ej. ["id", "title", "state"])
 
         Returns:
-            JSON string con los work items encontrados
+            Work items encontrados
         """
-        # Construir la consulta WIQL (Work Item Query Language)
-        query = f"SELECT [System.Id], [System.Title], [System.State], [System.AssignedTo] FROM WorkItems WHERE [System.TeamProject] = '{project}'"
+        # ===== Responder desde el espejo local si está al día =====
+        mirror_age = await mirror.fresh_age(project)
+
+        if mirror_age is not None:
+            items = await mirror.query(
+                project,
+                work_item_type=work_item_type,
+                state=state,
+                assigned_to=assigned_to,
+                area_path=area_path,
+                iteration_path=iteration_path,
+                tags=tags,
+                changed_since=changed_since,
+                limit=max_results
+            )
+        else:
+            # Construir la consulta WIQL (Work Item Query Language)
+            query = WiqlQuery().project(project)
 
-        if work_item_type:
-            query += f" AND [System.WorkItemType] = '{work_item_type}'"
+            if work_item_type:
+                query.where("System.WorkItemType", "=", work_item_type)
 
-        if state:
-            query += f" AND [System.State] = '{state}'"
+            if state:
+                query.where("System.State", "=", state)
 
-        if assigned_to:
-            query += f" AND [System.AssignedTo] = '{assigned_to}'"
+            if assigned_to:
+                query.where("System.AssignedTo", "=", assigned_to)
 
-        url = f"{get_base_url()}/{project}/_apis/wit/wiql?api-version={AZURE_DEVOPS_API_VERSION}"
+            if area_path:
+                query.under("System.AreaPath", area_path)
 
-        async with httpx.AsyncClient() as client:
-            # Ejecutar la consulta
-            response = await client.post(
-                url,
-                headers={
-                    "Authorization": get_auth_header(),
-                    "Content-Type": "application/json"
-                },
-                json={"query": query}
-            )
-            response.raise_for_status()
-            data = response.json()
+            if iteration_path:
+                query.under("System.IterationPath", iteration_path)
+
+            if tags:
+                query.tags(tags)
+
+            if changed_since:
+                query.changed_since(changed_since)
+
+            query.order_by("System.ChangedDate", descending=True)
 
-            work_items = data.get("workItems", [])[:max_results]
+            # Ejecutar la consulta; $top limita los IDs en el servidor
+            ids = await run_wiql(client, project, query, top=max_results)
 
-            if not work_items:
-                return "No se encontraron work items con los criterios especificados."
+            # Obtener detalles de los work items (en lotes, conservando el orden WIQL)
+            items = await fetch_work_items(client, project, ids)
 
-            # Obtener detalles de los work items
-            ids = [str(wi["id"]) for wi in work_items]
-            details_url = f"{get_base_url()}/{project}/_apis/wit/workitems?ids={','.join(ids)}&api-version={AZURE_DEVOPS_API_VERSION}"
+        data = {
+            "source": "mirror" if mirror_age is not None else "api",
+            "mirror_age_seconds": mirror_age,
+            "work_items": [_work_item_summary(item, project) for item in items],
+        }
+        return render(data, _work_items_text, output_format, fields)
+
+    @mcp.tool()
+    async def search_work_items(
+            text: str,
+            project: Optional[str] = None,
+            max_results: int = 20,
+            output_format: Optional[OutputFormat] = None,
+            fields: Optional[list[str]] = None
+    ) -> str:
+        """
+        Busca work items por palabras en el título, la descripción o las etiquetas.
+
+        Usa el índice local de texto completo del espejo de work items, por lo
+        que responde sin consultar Azure DevOps. Solo cubre los proyectos
+        configurados en AZURE_DEVOPS_MIRROR_PROJECTS.
+
+        Args:
+            text: Palabras a buscar (todas deben aparecer; la última admite prefijo)
+            project: Nombre del proyecto (opcional, por defecto todos los del espejo)
+            max_results: Número máximo de resultados a retornar
+            output_format: compact (JSON mínimo, por defecto), json o text
+            fields: Campos de cada work item a incluir (p. ej. ["id", "title", "snippet"])
 
-            details_response = await client.get(
-                details_url,
-                headers={"Authorization": get_auth_header()}
+        Returns:
+            Lista de work items ordenada por relevancia
+        """
+        if not mirror.enabled or not mirror.search_available:
+            return (
+                "❌ Error: La búsqueda requiere el espejo local de work items con FTS5. "
+                "Configura AZURE_DEVOPS_MIRROR_PROJECTS."
             )
-            details_response.raise_for_status()
-            details_data = details_response.json()
 
-            result = f"Work Items encontrados ({len(work_items)}):\n\n"
-            for item in details_data.get("value", []):
-                fields = item.get("fields", {})
-                result += f"ID: {item['id']}\n"
-                result += f"Tipo: {fields.get('System.WorkItemType', 'N/A')}\n"
-                result += f"Título: {fields.get('System.Title', 'N/A')}\n"
-                result += f"Estado: {fields.get('System.State', 'N/A')}\n"
-                result += f"Asignado a: {fields.get('System.AssignedTo', {}).get('displayName', 'Sin asignar')}\n"
-                result += f"URL: {item.get('_links', {}).get('html', {}).get('href', 'N/A')}\n\n"
+        if project and project.lower() not in mirror.projects:
+            return f"❌ Error: El proyecto '{project}' no está incluido en el espejo local."
+
+        items = await mirror.search(text, project=project, limit=max_results)
 
-            return result
+        data = {
+            "text": text,
+            "sources": [
+                {"project": name, "age_seconds": await mirror.age(name)}
+                for name in ([project] if project else mirror.projects.values())
+            ],
+            "work_items": [
+                _work_item_summary(item, mirror.projects.get(item["project"], item["project"]))
+                for item in items
+            ],
+        }
+        return render(data, _search_text, output_format, fields)
 
     
     @mcp.tool()
@@ -94,7 +269,9 @@ def register_work_item_tools(mcp: FastMCP) -> None:
         type: str,
         title: str,
         description: str,
-        priority: int
+        priority: int,
+        output_format: Optional[OutputFormat] = None,
+        fields: Optional[list[str]] = None
     ) -> str:
         """
         Crear un Work Item en Azure DevOps.
@@ -106,80 +283,71 @@ def register_work_item_tools(mcp: FastMCP) -> None:
             description: Descripción del Work Item. Debes especificar quién solicita la creación (nombre y correo),
             y quién debe aprobar (nombre y cargo).
             priority: Prioridad (1-4)
+            output_format: compact (JSON mínimo, por defecto), json o text
+            fields: Campos a incluir (p. ej. ["id", "url"])
 
         Returns:
             Mensaje indicando el resultado de la operación
 
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-
-                headers = {
-                    "Authorization": get_auth_header(),
-                    "Content-Type": "application/json-patch+json"
+            headers = {
+                "Authorization": get_auth_header(),
+                "Content-Type": "application/json-patch+json"
+            }
+
+            # ===== Obtener Project ID =====
+            project_id = await resolver.project_id(project)
+
+            if not project_id:
+                return f"❌ Error: No se encontró el proyecto '{project}'."
+
+            # ===== Body del Work Item =====
+            body = [
+                {
+                    "op": "add",
+                    "path": "/fields/System.Title",
+                    "from": None,
+                    "value": title
+                },
+                {
+                    "op": "add",
+                    "path": "/fields/System.Description",
+                    "from": None,
+                    "value": description
+                },
+                {
+                    "op": "add",
+                    "path": "/fields/Microsoft.VSTS.Common.Priority",
+                    "value": priority
                 }
+            ]
 
-                # ===== Obtener Project ID =====
-                projects_url = f"{get_base_url()}/_apis/projects?api-version={AZURE_DEVOPS_API_VERSION}"
-                projects_response = await client.get(projects_url, headers=headers)
-                projects_response.raise_for_status()
-                projects = projects_response.json()
-
-                project_id = next(
-                    (p["id"] for p in projects.get("value", []) if p["name"] == project),
-                    None
-                )
-
-                if not project_id:
-                    return f"❌ Error: No se encontró el proyecto '{project}'."
+            work_item_url = (
+                f"{get_base_url()}/{project}/_apis/wit/workitems/${type}"
+                f"?api-version=7.1"
+            )
 
-                # ===== Body del Work Item =====
-                body = [
-                    {
-                        "op": "add",
-                        "path": "/fields/System.Title",
-                        "from": None,
-                        "value": title
-                    },
-                    {
-                        "op": "add",
-                        "path": "/fields/System.Description",
-                        "from": None,
-                        "value": description
-                    },
-                    {
-                        "op": "add",
-                        "path": "/fields/Microsoft.VSTS.Common.Priority",
-                        "value": priority
-                    }
-                ]
-
-                work_item_url = (
-                    f"{get_base_url()}/{project}/_apis/wit/workitems/${type}"
-                    f"?api-version=7.1"
-                )
-
-                workitem_response = await client.post(
-                    work_item_url,
-                    headers=headers,
-                    json=body
-                )
-                workitem_response.raise_for_status()
-                workitem = workitem_response.json()
-
-                workitem_id = workitem.get("id")
-                workitem_url = workitem.get("url")
-
-                # ===== Resultado =====
-                result = "✅ WORK ITEM CREADO EXITOSAMENTE\n"
-                result += "=" * 80 + "\n\n"
-                result += f"📁 Proyecto: {project}\n"
-                result += f"📝 Tipo: {type}\n"
-                result += f"🆔 Project ID: {project_id}\n"
-                result += f"🆔 Work Item ID: {workitem_id}\n"
-                result += f"🔗 URL Work Item: {workitem_url}\n"
-
-                return result
+            workitem_response = await client.post(
+                work_item_url,
+                headers=headers,
+                json=body
+            )
+            workitem_response.raise_for_status()
+            workitem = workitem_response.json()
+
+            workitem_id = workitem.get("id")
+            workitem_url = workitem.get("url")
+
+            # ===== Resultado =====
+            data = {
+                "project": project,
+                "type": type,
+                "project_id": project_id,
+                "id": workitem_id,
+                "url": workitem_url,
+            }
+            return render(data, _created_text, output_format, fields)
 
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 404:
@@ -196,3 +364,72 @@ def register_work_item_tools(mcp: FastMCP) -> None:
 
         except Exception as e:
             return f"❌ Error inesperado: {str(e)}"
+
+    @mcp.tool()
+    async def create_work_items_bulk(
+        project: str,
+        items: list[WorkItemSpec],
+        output_format: Optional[OutputFormat] = None,
+        fields: Optional[list[str]] = None
+    ) -> str:
+        """
+        Crea varios Work Items en Azure DevOps en una sola llamada.
+
+        Usar en lugar de llamar create_work_items repetidamente, por ejemplo al
+        desglosar una épica en tareas. Los elementos se envían por lotes y un
+        fallo en uno no impide crear los demás.
+
+        Args:
+            project: Nombre del proyecto
+            items: Lista de work items. Cada uno con type, title y opcionalmente
+                description, priority (1-4), parent_id (work item existente) o
+                parent_index (posición de otro elemento de la lista que será su padre)
+            output_format: compact (JSON mínimo, por defecto), json o text
+            fields: Campos de cada resultado a incluir (p. ej. ["index", "id", "ok"])
+
+        Returns:
+            Resultado por elemento (ID creado o error)
+        """
+        try:
+            # ===== Obtener Project ID =====
+            project_id = await resolver.project_id(project)
+
+            if not project_id:
+                return f"❌ Error: No se encontró el proyecto '{project}'."
+
+            results = await create_work_items_batch(
+                client, project, [item.model_dump() for item in items]
+            )
+
+            created = sum(1 for r in results if r["ok"])
+
+            # ===== Resultado =====
+            data = {
+                "project": project,
+                "created": created,
+                "failed": len(items) - created,
+                "results": [
+                    {
+                        "index": result["index"],
+                        "ok": result["ok"],
+                        "id": result.get("id"),
+                        "type": item.type,
+                        "title": item.title,
+                        "url": work_item_web_url(project, result["id"]) if result["ok"] else None,
+                        "error": result.get("error"),
+                    }
+                    for item, result in zip(items, results)
+                ],
+            }
+            return render(data, _created_bulk_text, output_format, fields)
+
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 401:
+                return "❌ Error 401: No autorizado. Revisa tu PAT."
+            return f"❌ Error HTTP {e.response.status_code}: {e.response.text}"
+
+        except httpx.TimeoutException:
+            return "❌ Error: Tiempo de espera agotado al conectar con Azure DevOps."
+
+        except Exception as e:
+            return f"❌ Error inesperado: {str(e)}"